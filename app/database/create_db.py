@@ -1,38 +1,15 @@
-import sqlite3
+import os
+import sys
 
-def create_database():
-    # Veritabanı bağlantısını oluştur
-    conn = sqlite3.connect('muhasebe.db')
-    cursor = conn.cursor()
+# Şema, bağlantı ayarları ve geçişler MCP server ile ortak: own_mcp/ledger.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "own_mcp"))
+from ledger import DB_PATH, open_ledger
 
-    # Gelirler tablosunu oluştur
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS gelirler (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        tarih DATE NOT NULL,
-        aciklama TEXT NOT NULL,
-        miktar REAL NOT NULL,
-        kategori TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-
-    # Giderler tablosunu oluştur
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS giderler (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        tarih DATE NOT NULL,
-        aciklama TEXT NOT NULL,
-        miktar REAL NOT NULL,
-        kategori TEXT NOT NULL,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    ''')
-
-    # Değişiklikleri kaydet ve bağlantıyı kapat
-    conn.commit()
+def create_database(db_path=DB_PATH):
+    # Tabloları, indeksleri ve özet tablolarını oluştur (bekleyen geçişler uygulanır)
+    conn = open_ledger(db_path)
     conn.close()
 
 if __name__ == "__main__":
-    create_database()
-    print("Veritabanı ve tablolar başarıyla oluşturuldu.") 
\ No newline at end of file
+    create_database(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
+    print("Veritabanı ve tablolar başarıyla oluşturuldu.")
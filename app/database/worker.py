@@ -0,0 +1,148 @@
+import itertools
+import os
+import sqlite3
+import sys
+import threading
+import time
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+# Bağlantı ayarları MCP server ile ortak: own_mcp/db.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "own_mcp"))
+from db import connect
+
+# Başka bir bağlantı (ör. MCP server) yazma kilidini tutarken beklenecek süre (sn)
+BUSY_TIMEOUT = 5
+# Kilit süresi dolarsa arka planda yeniden deneme sayısı
+LOCK_RETRIES = 3
+
+
+class _TaskSignals(QObject):
+    """QRunnable sinyal gönderemediği için sonuçları taşıyan yardımcı nesne"""
+    sonuc = Signal(str, int, object)
+    hata = Signal(str, int, str)
+
+
+class _DbTask(QRunnable):
+    def __init__(self, isleyici, anahtar, nesil, fn):
+        super().__init__()
+        self.isleyici = isleyici
+        self.anahtar = anahtar
+        self.nesil = nesil
+        self.fn = fn
+        self.signals = _TaskSignals()
+
+    def run(self):
+        if self.isleyici.eski_mi(self.anahtar, self.nesil):
+            return
+        conn = self.isleyici.baglanti()
+        self.isleyici.aktif_olarak_isaretle(self.anahtar, self.nesil, conn)
+        try:
+            for deneme in range(LOCK_RETRIES):
+                try:
+                    with conn:
+                        result = self.fn(conn)
+                    break
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e) or deneme == LOCK_RETRIES - 1:
+                        raise
+                    time.sleep(0.2 * (deneme + 1))
+            self.signals.sonuc.emit(self.anahtar, self.nesil, result)
+        except sqlite3.OperationalError as e:
+            # iptal() ile kesilen sorgular sessizce bırakılır
+            if "interrupted" not in str(e):
+                self.signals.hata.emit(self.anahtar, self.nesil, str(e))
+        except Exception as e:
+            self.signals.hata.emit(self.anahtar, self.nesil, str(e))
+        finally:
+            self.isleyici.aktif_olarak_isaretle(self.anahtar, self.nesil, None)
+
+
+class VeritabaniIsleyici(QObject):
+    """Masaüstü uygulamasının tüm SQL işlerini arka plan thread'lerinde çalıştırır.
+
+    Her iş bir anahtarla gönderilir (ör. "gelirler.fetch", "rapor"). Aynı anahtarla
+    yeni bir iş gönderildiğinde önceki iş eskimiş sayılır: hâlâ çalışıyorsa
+    sqlite3 interrupt() ile kesilir, sonucu gelse bile geri çağrılmaz. Sonuçlar
+    Qt sinyalleriyle GUI thread'ine teslim edilir.
+    """
+
+    def __init__(self, db_path, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        # Thread'ler (ve her birinin kalıcı bağlantısı) boşta kalınca sonlandırılmasın
+        self.pool.setExpiryTimeout(-1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._nesiller = {}
+        self._aktif = {}
+        self._callbacks = {}
+        self._yazma_sayaci = itertools.count()
+
+    def baglanti(self):
+        """Çalışan thread'e ait kalıcı bağlantıyı döndür (yoksa aç)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Ortak PRAGMA ayarları (WAL, busy_timeout, önbellek) own_mcp/db.py'den gelir
+            conn = connect(self.db_path)
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT * 1000}")
+            self._local.conn = conn
+        return conn
+
+    def calistir(self, anahtar, fn, on_result=None, on_error=None):
+        """fn(conn) fonksiyonunu arka planda çalıştır; sonucu on_result(sonuc) ile GUI thread'inde ver.
+
+        anahtar None ise (yazma işleri) iş benzersizdir ve hiçbir zaman iptal edilmez.
+        """
+        if anahtar is None:
+            anahtar = f"yazma.{next(self._yazma_sayaci)}"
+        nesil = self.iptal(anahtar)
+        self._callbacks[anahtar] = (nesil, on_result, on_error)
+        task = _DbTask(self, anahtar, nesil, fn)
+        task.signals.sonuc.connect(self._sonuc_geldi)
+        task.signals.hata.connect(self._hata_geldi)
+        self.pool.start(task)
+
+    def iptal(self, anahtar):
+        """Anahtardaki işi eskimiş say, çalışıyorsa kes ve yeni nesil numarasını döndür"""
+        with self._lock:
+            nesil = self._nesiller.get(anahtar, 0) + 1
+            self._nesiller[anahtar] = nesil
+            aktif = self._aktif.get(anahtar)
+            if aktif is not None:
+                # Kilit altında: bağlantı bu sırada başka bir işe geçemez
+                aktif[1].interrupt()
+        self._callbacks.pop(anahtar, None)
+        return nesil
+
+    def eski_mi(self, anahtar, nesil):
+        with self._lock:
+            return self._nesiller.get(anahtar) != nesil
+
+    def aktif_olarak_isaretle(self, anahtar, nesil, conn):
+        with self._lock:
+            if conn is not None:
+                self._aktif[anahtar] = (nesil, conn)
+            elif self._aktif.get(anahtar, (None,))[0] == nesil:
+                del self._aktif[anahtar]
+
+    def _sonuc_geldi(self, anahtar, nesil, result):
+        callback = self._callbacks.get(anahtar)
+        if callback is None or callback[0] != nesil:
+            return
+        del self._callbacks[anahtar]
+        if callback[1] is not None:
+            callback[1](result)
+
+    def _hata_geldi(self, anahtar, nesil, mesaj):
+        callback = self._callbacks.get(anahtar)
+        if callback is None or callback[0] != nesil:
+            return
+        del self._callbacks[anahtar]
+        if callback[2] is not None:
+            callback[2](mesaj)
+
+    def kapat(self):
+        """Bekleyen işlerin bitmesini bekle"""
+        self.pool.waitForDone(BUSY_TIMEOUT * 1000)
@@ -1,14 +1,23 @@
+import os
 import sys
 import sqlite3
 from datetime import datetime
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QLineEdit, 
-                             QTableWidget, QTableWidgetItem, QTabWidget,
+                             QTableView, QAbstractItemView, QTabWidget,
                              QMessageBox, QComboBox, QFrame, QHeaderView,
                              QSplitter, QToolBar, QStatusBar)
-from PySide6.QtCore import Qt, QTimer, QSize
+from PySide6.QtCore import Qt, QTimer, QSize, QAbstractTableModel, QModelIndex, Signal
 from PySide6.QtGui import QColor, QPalette, QFont, QIcon, QPixmap
 
+# Şema, bağlantı ayarları ve sorgular MCP server ile ortak: own_mcp/ledger.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "own_mcp"))
+from amounts import from_kurus
+from ledger import DB_PATH, add_entry, open_ledger, report
+from tool_cache import ledger_version
+
+from database.worker import VeritabaniIsleyici
+
 class MacStyleFrame(QFrame):
     """Mac tarzında bir çerçeve"""
     def __init__(self, parent=None):
@@ -101,6 +110,196 @@ class ModernComboBox(QComboBox):
             }
         """)
 
+class LedgerTableModel(QAbstractTableModel):
+    """gelirler/giderler tablosu için tembel (lazy) yüklenen tablo modeli.
+
+    Satırlar FETCH_BATCH'lik pencereler halinde, yalnızca görünüm kaydırıldıkça
+    (canFetchMore/fetchMore) keyset sorgularıyla çekilir. Sıralama ve filtreleme
+    SQL tarafında yapılır; bellekte sadece şimdiye kadar görüntülenen satırlar tutulur.
+    Sorgular VeritabaniIsleyici ile arka planda çalışır, GUI thread'i beklemez.
+    """
+    COLUMNS = ("id", "tarih", "aciklama", "miktar_kurus", "kategori")
+    HEADERS = ("ID", "Tarih", "Açıklama", "Miktar", "Kategori")
+    MIKTAR_COLUMN = 3
+    FETCH_BATCH = 200
+
+    hata = Signal(str)
+
+    def __init__(self, isleyici, tablo_adi, parent=None):
+        super().__init__(parent)
+        self.isleyici = isleyici
+        self.tablo_adi = tablo_adi
+        self.sort_column = 1  # tarih
+        self.descending = True
+        self.filtre = ""
+        self._rows = []
+        self._has_more = True
+        self._fetching = False
+        self._son_id = 0
+
+    # --- Qt model arayüzü ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            if index.column() == self.MIKTAR_COLUMN:
+                return f"{from_kurus(value):,.2f}"
+            return str(value)
+        if role == Qt.TextAlignmentRole and index.column() == self.MIKTAR_COLUMN:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._fetching:
+            return
+        after = self._anahtar(self._rows[-1]) if self._rows else None
+        sql, params = self._sorgu(after=after, limit=self.FETCH_BATCH)
+        self._fetching = True
+        self.isleyici.calistir(f"{self.tablo_adi}.fetch",
+                               lambda conn: conn.execute(sql, params).fetchall(),
+                               self._pencere_geldi, self._hata_geldi)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.descending = order == Qt.DescendingOrder
+        self.yenile()
+
+    # --- Veri yükleme ---
+    def filtrele(self, metin):
+        """Açıklama veya kategoride metni içeren kayıtları göster"""
+        self.filtre = metin.strip()
+        self.yenile()
+
+    def yenile(self):
+        """Yüklenmiş satırları bırak ve ilk pencereyi yeniden çek.
+
+        Önceki sıralama/filtre için hâlâ çalışan sorgular iptal edilir.
+        """
+        self.isleyici.iptal(f"{self.tablo_adi}.yeni")
+        self.beginResetModel()
+        self._rows = []
+        self._has_more = True
+        self._fetching = True
+        self.endResetModel()
+
+        sql, params = self._sorgu(limit=self.FETCH_BATCH)
+        tablo_adi = self.tablo_adi
+
+        def ilk_pencere(conn):
+            son_id = conn.execute(f"SELECT MAX(id) FROM {tablo_adi}").fetchone()[0] or 0
+            return son_id, conn.execute(sql, params).fetchall()
+
+        self.isleyici.calistir(f"{self.tablo_adi}.fetch", ilk_pencere,
+                               self._ilk_pencere_geldi, self._hata_geldi)
+
+    def yeni_satirlari_ekle(self, tablo_son_id):
+        """Son görülen id'den tablo_son_id'ye kadar eklenen satırları yüklenmiş penceredeki yerlerine ekle.
+
+        Yüklenmiş son satırdan sonra gelen kayıtlar eklenmez; kaydırıldığında fetchMore ile gelir.
+        Bir pencereden fazla yeni kayıt varsa (toplu içe aktarım) tablo baştan yüklenir.
+        Filtreye uymayan yeni kayıtlar da görülmüş sayılır; _son_id her durumda tablo_son_id'ye ilerler.
+        """
+        sql, params = self._sorgu(min_id=self._son_id, max_id=tablo_son_id, limit=self.FETCH_BATCH + 1)
+        self.isleyici.calistir(f"{self.tablo_adi}.yeni",
+                               lambda conn: conn.execute(sql, params).fetchall(),
+                               lambda rows: self._yeni_satirlar_geldi(rows, tablo_son_id),
+                               self._hata_geldi)
+
+    # --- Arka plan sonuçları (GUI thread'inde çağrılır) ---
+    def _ilk_pencere_geldi(self, result):
+        son_id, rows = result
+        self._son_id = son_id
+        self._pencere_geldi(rows)
+
+    def _pencere_geldi(self, rows):
+        self._fetching = False
+        self._has_more = len(rows) == self.FETCH_BATCH
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(rows)
+        self._son_id = max(self._son_id, max(row[0] for row in rows))
+        self.endInsertRows()
+
+    def _yeni_satirlar_geldi(self, rows, tablo_son_id):
+        if len(rows) > self.FETCH_BATCH:
+            # Satırları GUI thread'inde tek tek eklemek yerine ilk pencereyi yeniden çek
+            self.yenile()
+            return
+        for row in rows:
+            # Sorgu gönderildikten sonra fetchMore ile zaten yüklenmiş/görülmüş olabilir
+            if row[0] <= self._son_id:
+                continue
+            self._son_id = max(self._son_id, row[0])
+            pos = self._konum(self._anahtar(row))
+            if pos == len(self._rows) and self._has_more:
+                continue
+            self.beginInsertRows(QModelIndex(), pos, pos)
+            self._rows.insert(pos, row)
+            self.endInsertRows()
+        self._son_id = max(self._son_id, tablo_son_id)
+
+    def _hata_geldi(self, mesaj):
+        self._fetching = False
+        self.hata.emit(mesaj)
+
+    def _anahtar(self, row):
+        return (row[self.sort_column], row[0])
+
+    def _konum(self, anahtar):
+        """Sıralı _rows listesinde anahtarın ekleneceği konumu ikili arama ile bul"""
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mevcut = self._anahtar(self._rows[mid])
+            once = anahtar > mevcut if self.descending else anahtar < mevcut
+            if once:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _sorgu(self, after=None, limit=None, min_id=None, max_id=None):
+        """Geçerli sıralama ve filtreye göre SQL ve parametreleri hazırla"""
+        column = self.COLUMNS[self.sort_column]
+        direction = "DESC" if self.descending else "ASC"
+        conditions, params = [], []
+        if self.filtre:
+            conditions.append("(aciklama LIKE ? OR kategori LIKE ?)")
+            params += [f"%{self.filtre}%"] * 2
+        if after is not None:
+            # Keyset: bir önceki pencerenin son satırından sonrası
+            conditions.append(f"({column}, id) {'<' if self.descending else '>'} (?, ?)")
+            params += list(after)
+        if min_id is not None:
+            conditions.append("id > ?")
+            params.append(min_id)
+        if max_id is not None:
+            conditions.append("id <= ?")
+            params.append(max_id)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f'''SELECT {", ".join(self.COLUMNS)} FROM {self.tablo_adi} {where}
+                  ORDER BY {column} {direction}, id {direction}'''
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return sql, params
+
 class MuhasebeProgrami(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -112,16 +311,16 @@ class MuhasebeProgrami(QMainWindow):
             QMainWindow {
                 background-color: #F5F5F7;
             }
-            QTableWidget {
+            QTableView {
                 border: none;
                 gridline-color: #E0E0E0;
                 background-color: white;
                 border-radius: 10px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #007AFF20;
                 color: black;
             }
@@ -152,9 +351,13 @@ class MuhasebeProgrami(QMainWindow):
             }
         """)
         
-        # Veritabanı bağlantısını oluştur
-        self.conn = sqlite3.connect('muhasebe.db')
-        self.create_tables()
+        # Şemayı oluştur ve bekleyen geçişleri uygula. Bu bağlantı bundan sonra yalnızca değişiklik takibinde
+        # (PRAGMA data_version) kullanılır; kısa busy_timeout GUI thread'inin kilitte beklemesini önler.
+        self.conn = open_ledger(DB_PATH)
+        self.conn.execute('PRAGMA busy_timeout=50')
+        
+        # Diğer tüm SQL işleri arka plan thread'lerinde çalışır
+        self.isleyici = VeritabaniIsleyici(DB_PATH, self)
         
         # Ana widget'ı oluştur
         self.central_widget = QWidget()
@@ -182,10 +385,15 @@ class MuhasebeProgrami(QMainWindow):
         self.status_bar.setStyleSheet("QStatusBar{background-color: white; padding: 5px;}")
         self.status_bar.showMessage("Hazır")
 
-        # Otomatik güncelleme için zamanlayıcı oluştur
+        # Değişiklik takibi: PRAGMA data_version başka bir bağlantı (ör. MCP server)
+        # veritabanına yazdığında artar. Sorgu çok ucuz olduğu için sık kontrol edilebilir;
+        # tablolar ve rapor yalnızca gerçekten değişiklik olduğunda güncellenir. Hangi değişikliklerin
+        # ekrana yansıtıldığı defter_surumu sayacıyla izlenir (her eklemede/güncellemede/silmede artar).
+        self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        self.defter_surumu = ledger_version(self.conn)
         self.timer = QTimer()
-        self.timer.timeout.connect(self.update_all)
-        self.timer.start(1000)  # Her 1 saniyede bir güncelle
+        self.timer.timeout.connect(self.degisiklikleri_kontrol_et)
+        self.timer.start(500)
     
     def setup_header(self):
         """Üst bilgi alanını oluştur"""
@@ -206,37 +414,77 @@ class MuhasebeProgrami(QMainWindow):
         self.layout.addWidget(header_frame)
     
     def update_all(self):
-        """Tüm verileri güncelle"""
+        """Tüm verileri baştan yükle"""
+        self.defter_surumu = ledger_version(self.conn)
         self.gelir_listele()
         self.gider_listele()
         self.rapor_guncelle()
     
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        
-        # Gelirler tablosu
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS gelirler (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tarih TEXT NOT NULL,
-            aciklama TEXT NOT NULL,
-            miktar REAL NOT NULL,
-            kategori TEXT NOT NULL
-        )
-        ''')
-        
-        # Giderler tablosu
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS giderler (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tarih TEXT NOT NULL,
-            aciklama TEXT NOT NULL,
-            miktar REAL NOT NULL,
-            kategori TEXT NOT NULL
-        )
-        ''')
-        
-        self.conn.commit()
+    def degisiklikleri_kontrol_et(self):
+        """Veritabanı başka bir bağlantı tarafından değiştirildiyse ekranı güncelle"""
+        try:
+            version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.OperationalError:
+            # Veritabanı meşgul; bir sonraki kontrolde tekrar denenir
+            return
+        if version == self.data_version:
+            return
+        self.data_version = version
+        self.degisiklikleri_uygula()
+    
+    def yerel_yazma_bitti(self):
+        """Bu pencerenin yaptığı yazmayı hemen yansıt; zamanlayıcı aynı değişikliği tekrar işlemez"""
+        try:
+            self.data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.OperationalError:
+            pass
+        self.degisiklikleri_uygula()
+    
+    def degisiklikleri_uygula(self):
+        """Yalnızca yeni eklenen satırları tablolara ekle ve raporu güncelle.
+
+        Son uygulanan sürümden bu yana sayaç, görülen son id'lerden sonra eklenen satır sayısı
+        kadar arttıysa yalnızca ekleme olmuştur; fazlası güncelleme veya silme demektir ve
+        tüm veriler yeniden yüklenir. Sayaç değişmediyse (ör. kendi yazmamız zaten uygulandı)
+        hiçbir şey yapılmaz.
+        """
+        son_idler = (self.gelirler_model._son_id, self.giderler_model._son_id)
+
+        def durum(conn):
+            # Tek sorgu: sayaç, son id'ler ve yeni satır sayıları aynı anlık görüntüden okunur
+            return conn.execute('''SELECT (SELECT surum FROM defter_surumu WHERE id = 1),
+                                           (SELECT COALESCE(MAX(id), 0) FROM gelirler),
+                                           (SELECT COUNT(*) FROM gelirler WHERE id > ?),
+                                           (SELECT COALESCE(MAX(id), 0) FROM giderler),
+                                           (SELECT COUNT(*) FROM giderler WHERE id > ?)''',
+                                son_idler).fetchone()
+
+        self.isleyici.calistir('degisiklik', durum, self._durum_geldi, self.veritabani_hatasi)
+
+    def _durum_geldi(self, result):
+        surum, gelir_son_id, yeni_gelir, gider_son_id, yeni_gider = result
+        degisiklik = surum - self.defter_surumu
+        if degisiklik == 0:
+            return
+        self.defter_surumu = surum
+
+        if degisiklik != yeni_gelir + yeni_gider:
+            # Eklemelerin dışında güncelleme/silme de olmuş
+            self.update_all()
+            return
+        if yeni_gelir:
+            self.gelirler_model.yeni_satirlari_ekle(gelir_son_id)
+        if yeni_gider:
+            self.giderler_model.yeni_satirlari_ekle(gider_son_id)
+        self.rapor_guncelle()
+
+    def veritabani_hatasi(self, mesaj):
+        self.status_bar.showMessage(f"Veritabanı hatası: {mesaj}", 5000)
+    
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.isleyici.kapat()
+        super().closeEvent(event)
     
     def setup_gelir_tab(self):
         gelir_tab = QWidget()
@@ -307,12 +555,27 @@ class MuhasebeProgrami(QMainWindow):
         table_title.setStyleSheet("color: #333333; margin-bottom: 10px;")
         table_layout.addWidget(table_title)
         
-        self.gelirler_tablo = QTableWidget()
-        self.gelirler_tablo.setColumnCount(5)
-        self.gelirler_tablo.setHorizontalHeaderLabels(["ID", "Tarih", "Açıklama", "Miktar", "Kategori"])
+        # Arama alanı (filtre SQL'de uygulanır)
+        self.gelir_filtre = ModernLineEdit()
+        self.gelir_filtre.setPlaceholderText("Açıklama veya kategoride ara...")
+        table_layout.addWidget(self.gelir_filtre)
+        
+        # Satırlar kaydırıldıkça pencere pencere yüklenir
+        self.gelirler_model = LedgerTableModel(self.isleyici, 'gelirler', self)
+        self.gelir_filtre.textChanged.connect(self.gelirler_model.filtrele)
+        self.gelirler_model.hata.connect(self.veritabani_hatasi)
+        
+        self.gelirler_tablo = QTableView()
+        self.gelirler_tablo.setModel(self.gelirler_model)
         self.gelirler_tablo.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.gelirler_tablo.setAlternatingRowColors(True)
-        self.gelirler_tablo.setSelectionBehavior(QTableWidget.SelectRows)
+        self.gelirler_tablo.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # Sıralamayı açmak modelin sort() metodunu çağırır ve ilk pencereyi yükler
+        self.gelirler_tablo.horizontalHeader().setSortIndicator(1, Qt.DescendingOrder)
+        self.gelirler_tablo.setSortingEnabled(True)
+        # Sabit satır yüksekliği: görünüm satır boyutlarını tek tek hesaplamaz
+        self.gelirler_tablo.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.gelirler_tablo.verticalHeader().setDefaultSectionSize(32)
         
         # Sütun genişliklerini ayarla
         self.gelirler_tablo.setColumnWidth(0, 50)  # ID
@@ -325,7 +588,6 @@ class MuhasebeProgrami(QMainWindow):
         layout.addWidget(table_frame)
         
         self.tabs.addTab(gelir_tab, "Gelirler")
-        self.gelir_listele()
     
     def setup_gider_tab(self):
         gider_tab = QWidget()
@@ -396,12 +658,27 @@ class MuhasebeProgrami(QMainWindow):
         table_title.setStyleSheet("color: #333333; margin-bottom: 10px;")
         table_layout.addWidget(table_title)
         
-        self.giderler_tablo = QTableWidget()
-        self.giderler_tablo.setColumnCount(5)
-        self.giderler_tablo.setHorizontalHeaderLabels(["ID", "Tarih", "Açıklama", "Miktar", "Kategori"])
+        # Arama alanı (filtre SQL'de uygulanır)
+        self.gider_filtre = ModernLineEdit()
+        self.gider_filtre.setPlaceholderText("Açıklama veya kategoride ara...")
+        table_layout.addWidget(self.gider_filtre)
+        
+        # Satırlar kaydırıldıkça pencere pencere yüklenir
+        self.giderler_model = LedgerTableModel(self.isleyici, 'giderler', self)
+        self.gider_filtre.textChanged.connect(self.giderler_model.filtrele)
+        self.giderler_model.hata.connect(self.veritabani_hatasi)
+        
+        self.giderler_tablo = QTableView()
+        self.giderler_tablo.setModel(self.giderler_model)
         self.giderler_tablo.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.giderler_tablo.setAlternatingRowColors(True)
-        self.giderler_tablo.setSelectionBehavior(QTableWidget.SelectRows)
+        self.giderler_tablo.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # Sıralamayı açmak modelin sort() metodunu çağırır ve ilk pencereyi yükler
+        self.giderler_tablo.horizontalHeader().setSortIndicator(1, Qt.DescendingOrder)
+        self.giderler_tablo.setSortingEnabled(True)
+        # Sabit satır yüksekliği: görünüm satır boyutlarını tek tek hesaplamaz
+        self.giderler_tablo.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.giderler_tablo.verticalHeader().setDefaultSectionSize(32)
         
         # Sütun genişliklerini ayarla
         self.giderler_tablo.setColumnWidth(0, 50)  # ID
@@ -414,7 +691,6 @@ class MuhasebeProgrami(QMainWindow):
         layout.addWidget(table_frame)
         
         self.tabs.addTab(gider_tab, "Giderler")
-        self.gider_listele()
     
     def setup_rapor_tab(self):
         rapor_tab = QWidget()
@@ -473,26 +749,27 @@ class MuhasebeProgrami(QMainWindow):
             if miktar <= 0:
                 raise ValueError("Miktar 0'dan büyük olmalıdır!")
             
-            cursor = self.conn.cursor()
-            cursor.execute('''
-            INSERT INTO gelirler (tarih, aciklama, miktar, kategori)
-            VALUES (?, ?, ?, ?)
-            ''', (tarih, aciklama, miktar, kategori))
+            def ekle(conn):
+                add_entry(conn, "gelir", aciklama, miktar, kategori, tarih)
             
-            self.conn.commit()
-            
-            # Formu temizle
-            self.gelir_aciklama.clear()
-            self.gelir_miktar.clear()
+            def eklendi(_):
+                # Formu temizle
+                self.gelir_aciklama.clear()
+                self.gelir_miktar.clear()
+                
+                # Yeni satırı tabloya ekle ve raporu güncelle
+                self.yerel_yazma_bitti()
+                
+                self.status_bar.showMessage(f"{aciklama} geliri başarıyla eklendi!", 3000)
             
-            # Tabloları ve raporu güncelle
-            self.update_all()
+            def hata(mesaj):
+                QMessageBox.warning(self, "Hata", f"Gelir eklenirken bir hata oluştu: {mesaj}")
             
-            self.status_bar.showMessage(f"{aciklama} geliri başarıyla eklendi!", 3000)
+            # Yazma arka planda yapılır; MCP server kilidi tutsa bile pencere donmaz
+            self.status_bar.showMessage("Kaydediliyor...")
+            self.isleyici.calistir(None, ekle, eklendi, hata)
         except ValueError as ve:
             QMessageBox.warning(self, "Hata", str(ve))
-        except Exception as e:
-            QMessageBox.warning(self, "Hata", f"Gelir eklenirken bir hata oluştu: {str(e)}")
     
     def gider_ekle(self):
         try:
@@ -507,87 +784,52 @@ class MuhasebeProgrami(QMainWindow):
             if miktar <= 0:
                 raise ValueError("Miktar 0'dan büyük olmalıdır!")
             
-            cursor = self.conn.cursor()
-            cursor.execute('''
-            INSERT INTO giderler (tarih, aciklama, miktar, kategori)
-            VALUES (?, ?, ?, ?)
-            ''', (tarih, aciklama, miktar, kategori))
+            def ekle(conn):
+                add_entry(conn, "gider", aciklama, miktar, kategori, tarih)
             
-            self.conn.commit()
-            
-            # Formu temizle
-            self.gider_aciklama.clear()
-            self.gider_miktar.clear()
+            def eklendi(_):
+                # Formu temizle
+                self.gider_aciklama.clear()
+                self.gider_miktar.clear()
+                
+                # Yeni satırı tabloya ekle ve raporu güncelle
+                self.yerel_yazma_bitti()
+                
+                self.status_bar.showMessage(f"{aciklama} gideri başarıyla eklendi!", 3000)
             
-            # Tabloları ve raporu güncelle
-            self.update_all()
+            def hata(mesaj):
+                QMessageBox.warning(self, "Hata", f"Gider eklenirken bir hata oluştu: {mesaj}")
             
-            self.status_bar.showMessage(f"{aciklama} gideri başarıyla eklendi!", 3000)
+            # Yazma arka planda yapılır; MCP server kilidi tutsa bile pencere donmaz
+            self.status_bar.showMessage("Kaydediliyor...")
+            self.isleyici.calistir(None, ekle, eklendi, hata)
         except ValueError as ve:
             QMessageBox.warning(self, "Hata", str(ve))
-        except Exception as e:
-            QMessageBox.warning(self, "Hata", f"Gider eklenirken bir hata oluştu: {str(e)}")
     
     def gelir_listele(self):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM gelirler ORDER BY tarih DESC')
-        self.gelirler_tablo.setRowCount(0)
-        
-        for row_number, row_data in enumerate(cursor):
-            self.gelirler_tablo.insertRow(row_number)
-            for column_number, data in enumerate(row_data):
-                item = QTableWidgetItem(str(data))
-                if column_number == 3:  # Miktar sütunu
-                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                    item.setText(f"{float(data):,.2f}")
-                self.gelirler_tablo.setItem(row_number, column_number, item)
+        self.gelirler_model.yenile()
     
     def gider_listele(self):
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM giderler ORDER BY tarih DESC')
-        self.giderler_tablo.setRowCount(0)
-        
-        for row_number, row_data in enumerate(cursor):
-            self.giderler_tablo.insertRow(row_number)
-            for column_number, data in enumerate(row_data):
-                item = QTableWidgetItem(str(data))
-                if column_number == 3:  # Miktar sütunu
-                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-                    item.setText(f"{float(data):,.2f}")
-                self.giderler_tablo.setItem(row_number, column_number, item)
+        self.giderler_model.yenile()
     
     def rapor_guncelle(self):
-        cursor = self.conn.cursor()
-        
-        # Toplam gelir
-        cursor.execute('SELECT SUM(miktar) FROM gelirler')
-        toplam_gelir = cursor.fetchone()[0] or 0
+        self.isleyici.calistir('rapor', self._rapor_verisi, self._raporu_yaz, self.veritabani_hatasi)
+    
+    @staticmethod
+    def _rapor_verisi(conn):
+        """Rapor toplamlarını hesapla (arka plan thread'inde çalışır, özet tablolarından okunur)"""
+        rapor = report(conn)
         
-        # Toplam gider
-        cursor.execute('SELECT SUM(miktar) FROM giderler')
-        toplam_gider = cursor.fetchone()[0] or 0
+        # Kategoriler tutara göre büyükten küçüğe
+        gelir_kategorileri = sorted(rapor["gelir_kategorileri"].items(), key=lambda x: x[1], reverse=True)
+        gider_kategorileri = sorted(rapor["gider_kategorileri"].items(), key=lambda x: x[1], reverse=True)
         
-        # Net durum
+        return rapor["toplam_gelir"], rapor["toplam_gider"], gelir_kategorileri, gider_kategorileri
+    
+    def _raporu_yaz(self, result):
+        toplam_gelir, toplam_gider, gelir_kategorileri, gider_kategorileri = result
         net_durum = toplam_gelir - toplam_gider
         
-        # Kategori bazlı gelirler
-        cursor.execute('''
-            SELECT kategori, SUM(miktar) 
-            FROM gelirler 
-            GROUP BY kategori 
-            ORDER BY SUM(miktar) DESC
-        ''')
-        gelir_kategorileri = cursor.fetchall()
-        
-        # Kategori bazlı giderler
-        cursor.execute('''
-            SELECT kategori, SUM(miktar) 
-            FROM giderler 
-            GROUP BY kategori 
-            ORDER BY SUM(miktar) DESC
-        ''')
-        gider_kategorileri = cursor.fetchall()
-        
         # Rapor metnini güncelle
         rapor_text = f"""
         <div style='padding: 20px; background-color: white; border-radius: 10px;'>
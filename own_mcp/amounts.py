@@ -0,0 +1,43 @@
+"""Tutarların tam sayı kuruş olarak temsili.
+
+Veritabanında tutarlar miktar_kurus INTEGER sütununda kuruş cinsinden saklanır;
+böylece SUM() kayan nokta hatası biriktirmez ve toplamlar tam sayı toplamıdır.
+TL <-> kuruş dönüşümü yalnızca API sınırında (tool argümanları ve yanıtları,
+masaüstü formları, içe/dışa aktarım) yapılır; iç katmanlar hep kuruşla çalışır.
+"""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import NewType, Union
+
+Kurus = NewType("Kurus", int)
+
+# SQLite INTEGER 64 bittir
+_MAX_KURUS = 2 ** 63 - 1
+
+
+def to_kurus(value: Union[int, float, str, Decimal]) -> Kurus:
+    """TL tutarını kuruşa çevir (1250.5 veya "1250,50" -> 125050).
+
+    Kuruşun altındaki kısım yarım yukarı yuvarlanır. float değerler önce kısa
+    ondalık gösterimine çevrilir; böylece 1.005 gibi girdiler 100.49999... değil 1.005 olarak yuvarlanır.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Geçersiz miktar: {value!r}")
+    if isinstance(value, int):
+        tl = Decimal(value)
+    else:
+        text = value.strip().replace(",", ".") if isinstance(value, str) else str(value)
+        try:
+            tl = Decimal(text)
+        except (InvalidOperation, TypeError, ValueError):
+            raise ValueError(f"Geçersiz miktar: {value!r}")
+    if not tl.is_finite():
+        raise ValueError(f"Geçersiz miktar: {value!r}")
+    kurus = int((tl * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    if abs(kurus) > _MAX_KURUS:
+        raise ValueError(f"Miktar çok büyük: {value!r}")
+    return Kurus(kurus)
+
+
+def from_kurus(kurus: int) -> float:
+    """Kuruşu API yanıtlarında kullanılan TL değerine çevir (125050 -> 1250.5)"""
+    return kurus / 100
@@ -0,0 +1,407 @@
+"""Muhasebe veritabanı katmanı için basit mikro-benchmark'lar.
+
+Kullanım:
+    python own_mcp/benchmark.py connections [--calls 2000]
+    python own_mcp/benchmark.py report [--rows 200000]
+    python own_mcp/benchmark.py plans
+    python own_mcp/benchmark.py bulk [--rows 100000]
+    python own_mcp/benchmark.py toolcache [--rows 200000]
+    python own_mcp/benchmark.py kurus [--rows 1000000]
+    python own_mcp/benchmark.py search [--rows 1000000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from amounts import from_kurus, to_kurus
+from bulk import insert_rows
+from listing import list_page
+from db import ConnectionManager, date_range_filter
+from ledger import create_schema, create_tables, report
+from migrations import migrate
+from rollups import ensure_rollups, report_from_rollups
+from search import search
+from tool_cache import ToolCache
+
+KATEGORILER = ["Satış", "Hizmet", "Kira", "Elektrik", "Su", "Personel", "Diğer"]
+
+
+def _random_rows(count: int):
+    """Son ~3 yıla yayılmış rastgele kayıtlar üret (tutar kuruş)"""
+    for i in range(count):
+        gun = datetime.fromordinal(738000 + random.randrange(1100))
+        yield (f"kayıt {i}", random.randrange(100, 500000),
+               random.choice(KATEGORILER), gun.strftime("%Y-%m-%d 12:00:00"))
+
+
+def _timeit(fn, repeat: int) -> float:
+    """fn'i repeat kez çalıştır, çağrı başına ortalama süreyi ms olarak döndür"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _tool_call(conn):
+    """Tipik bir tool çağrısını taklit et: bir ekleme ve bir toplam sorgusu"""
+    tarih = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.execute('INSERT INTO gelirler (aciklama, miktar_kurus, kategori, tarih) VALUES (?, ?, ?, ?)',
+                 ("benchmark", 1000, "Genel", tarih))
+    conn.execute('SELECT SUM(miktar_kurus) FROM gelirler WHERE kategori = ?', ("Genel",)).fetchone()
+
+
+def bench_connections(calls: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(db_path)
+        create_tables(conn)
+        conn.commit()
+        conn.close()
+
+        # Önce: her çağrıda yeni bağlantı aç ve kapat
+        start = time.perf_counter()
+        for _ in range(calls):
+            conn = sqlite3.connect(db_path)
+            _tool_call(conn)
+            conn.commit()
+            conn.close()
+        before = calls / (time.perf_counter() - start)
+
+        # Sonra: ConnectionManager ile kalıcı bağlantılar
+        results = {"önce (connect/close)": before}
+        for mode in ("thread", "pool"):
+            manager = ConnectionManager(db_path, mode=mode)
+            start = time.perf_counter()
+            for _ in range(calls):
+                with manager.connection() as conn:
+                    _tool_call(conn)
+            results[f"sonra ({mode})"] = calls / (time.perf_counter() - start)
+            manager.close_all()
+
+    for name, rate in results.items():
+        print(f"{name:<22} {rate:>10.0f} çağrı/sn")
+
+
+def bench_report(rows: int, repeat: int = 20):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(db_path)
+        create_tables(conn)
+        ensure_rollups(conn)
+        for table in ("gelirler", "giderler"):
+            conn.executemany(f'INSERT INTO {table} (aciklama, miktar_kurus, kategori, tarih) VALUES (?, ?, ?, ?)',
+                             _random_rows(rows // 2))
+        conn.commit()
+
+        def raw_report(start=None, end=None):
+            date_filter, params = "", []
+            if start and end:
+                date_filter, params = "WHERE date(tarih) BETWEEN ? AND ?", [start, end]
+            for table in ("gelirler", "giderler"):
+                conn.execute(f'SELECT SUM(miktar_kurus) FROM {table} {date_filter}', params).fetchone()
+                conn.execute(f'SELECT kategori, SUM(miktar_kurus) FROM {table} {date_filter} GROUP BY kategori',
+                             params).fetchall()
+
+        araliklar = [("tüm zamanlar", None, None), ("90 gün", "2022-01-01", "2022-03-31")]
+        for name, start, end in araliklar:
+            raw = _timeit(lambda: raw_report(start, end), repeat)
+            rollup = _timeit(lambda: report_from_rollups(conn, start, end), repeat)
+            print(f"{name:<14} ham tablolar: {raw:8.2f} ms   özetler: {rollup:6.2f} ms")
+        conn.close()
+
+
+def bench_bulk(rows: int, single_rows: int = 2000):
+    kayitlar = [{"aciklama": a, "miktar": from_kurus(m), "kategori": k, "tarih": t[:10]}
+                for a, m, k, t in _random_rows(rows)]
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        manager = ConnectionManager(db_path)
+        with manager.connection() as conn:
+            create_tables(conn)
+            migrate(conn)
+            ensure_rollups(conn)
+
+        # Önce: kayıt başına bir işlem (gider_ekle'nin tekrar tekrar çağrılması)
+        sql = 'INSERT INTO giderler (aciklama, miktar_kurus, kategori, tarih) VALUES (?, ?, ?, ?)'
+        start = time.perf_counter()
+        for a, m, k, t in _random_rows(single_rows):
+            with manager.connection() as conn:
+                conn.execute(sql, (a, m, k, t))
+        single = single_rows / (time.perf_counter() - start)
+
+        # Sonra: tek işlemde doğrulama + executemany
+        start = time.perf_counter()
+        with manager.connection() as conn:
+            sonuc = insert_rows(conn, "gider", kayitlar)
+        elapsed = time.perf_counter() - start
+        manager.close_all()
+
+    print(f"tek tek ({single_rows} kayıt)    {single:>10.0f} kayıt/sn")
+    print(f"toplu ({sonuc['eklenen']} kayıt)   {sonuc['eklenen'] / elapsed:>10.0f} kayıt/sn  ({elapsed:.2f} sn)")
+
+
+def bench_tool_cache(rows: int, repeat: int = 2000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        manager = ConnectionManager(db_path)
+        with manager.connection() as conn:
+            create_tables(conn)
+            migrate(conn)
+            ensure_rollups(conn)
+            conn.executemany('INSERT INTO gelirler (aciklama, miktar_kurus, kategori, tarih) VALUES (?, ?, ?, ?)',
+                             _random_rows(rows))
+
+        cache = ToolCache()
+        calls = {
+            "rapor_getir": (("2023-01-01", "2023-12-31"),
+                            lambda conn: report_from_rollups(conn, "2023-01-01", "2023-12-31")),
+            "gelirleri_listele": (("Satış", 50, None, None),
+                                  lambda conn: list_page(conn, "gelirler", "Satış", 50)),
+        }
+        with manager.connection() as conn:
+            for tool, (args, fn) in calls.items():
+                direct = _timeit(lambda: fn(conn), repeat)
+                cached = _timeit(lambda: cache.get_or_compute(conn, tool, args, lambda: fn(conn)), repeat)
+                print(f"{tool:<18} önbelleksiz {direct * 1000:>9.1f} µs   önbellekli {cached * 1000:>7.1f} µs")
+
+            # Bir yazma sonrası önbellek geçersiz olmalı
+            onceki = cache.get_or_compute(conn, "rapor_getir", ("x",), lambda: report_from_rollups(conn))
+            conn.execute('INSERT INTO gelirler (aciklama, miktar_kurus, kategori, tarih) VALUES (?, ?, ?, ?)',
+                         ("benchmark", 1000, "Satış", "2024-01-01 12:00:00"))
+            sonraki = cache.get_or_compute(conn, "rapor_getir", ("x",), lambda: report_from_rollups(conn))
+            gecersiz = sonraki["toplam_gelir"] - onceki["toplam_gelir"] == 1000
+        manager.close_all()
+    print(f"yazma sonrası geçersiz kılma: {'OK' if gecersiz else 'HATA'}")
+    print(cache.stats())
+    return gecersiz
+
+
+# (sorgu, parametreler, plan içinde beklenen ifade)
+PLAN_CHECKS = [
+    ('SELECT * FROM gelirler WHERE kategori = ? ORDER BY tarih DESC', ("Satış",),
+     "USING INDEX idx_gelirler_kategori_tarih"),
+    ('SELECT * FROM giderler WHERE kategori = ? ORDER BY tarih DESC', ("Kira",),
+     "USING INDEX idx_giderler_kategori_tarih"),
+    ('SELECT * FROM gelirler ORDER BY tarih DESC', (),
+     "USING INDEX idx_gelirler_tarih"),
+    ('SELECT * FROM giderler ORDER BY tarih DESC', (),
+     "USING INDEX idx_giderler_tarih"),
+    # Masaüstü tablosunun sütun sıralaması (app/main.py LedgerTableModel)
+    ('SELECT * FROM giderler WHERE (aciklama, id) < (?, ?) ORDER BY aciklama DESC, id DESC LIMIT 200', ("x", 1),
+     "USING INDEX idx_giderler_aciklama"),
+    ('SELECT * FROM gelirler WHERE (miktar_kurus, id) > (?, ?) ORDER BY miktar_kurus, id LIMIT 200', (100, 1),
+     "USING INDEX idx_gelirler_miktar"),
+]
+
+
+def check_plans() -> bool:
+    """EXPLAIN QUERY PLAN ile liste ve tarih aralığı sorgularının indeks kullandığını doğrula"""
+    conn = sqlite3.connect(":memory:")
+    create_tables(conn)
+    migrate(conn)
+
+    checks = list(PLAN_CHECKS)
+    conditions, params = date_range_filter("tarih", "2024-01-01", "2024-01-31")
+    for table in ("gelirler", "giderler"):
+        checks.append((f'SELECT SUM(miktar_kurus) FROM {table} WHERE {" AND ".join(conditions)}', params,
+                       f"USING INDEX idx_{table}_tarih"))
+
+    ok = True
+    for sql, sql_params, expected in checks:
+        plan = " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", sql_params))
+        passed = expected in plan and "USE TEMP B-TREE" not in plan
+        ok = ok and passed
+        print(f"{'OK  ' if passed else 'HATA'} {sql}\n     {plan}")
+    conn.close()
+    return ok
+
+
+def bench_kurus(rows: int, repeat: int = 5) -> bool:
+    """REAL (TL) ile tam sayı kuruş saklamanın toplama hızı ve doğruluğu.
+
+    Eski şemada (miktar REAL) rows kayıtlık bir defter oluşturulur, toplamlar
+    ölçülür, ardından kuruş geçişi uygulanır ve aynı toplamlar tekrar ölçülür.
+    Her satırın kuruş değeri ve tüm toplamlar kesin (Python int) toplamla karşılaştırılır.
+    """
+    kuruslar = [random.randrange(1, 10_000_000) for _ in range(rows)]
+    kategoriler = [random.choice(KATEGORILER) for _ in range(rows)]
+    beklenen = sum(kuruslar)
+    beklenen_kategori = {}
+    for kurus, kategori in zip(kuruslar, kategoriler):
+        beklenen_kategori[kategori] = beklenen_kategori.get(kategori, 0) + kurus
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        # Geçiş öncesi şema: tutar TL olarak REAL sütunda
+        for table in ("gelirler", "giderler"):
+            conn.execute(f'''CREATE TABLE {table}
+                            (id INTEGER PRIMARY KEY AUTOINCREMENT, aciklama TEXT NOT NULL,
+                             miktar REAL NOT NULL, kategori TEXT NOT NULL, tarih TEXT NOT NULL)''')
+        conn.executemany('INSERT INTO gelirler (aciklama, miktar, kategori, tarih) VALUES (?, ?, ?, ?)',
+                         ((f"kayıt {i}", kurus / 100, kategori, "2024-01-01 12:00:00")
+                          for i, (kurus, kategori) in enumerate(zip(kuruslar, kategoriler))))
+        conn.commit()
+
+        real_sum = conn.execute('SELECT SUM(miktar) FROM gelirler').fetchone()[0]
+        real_ms = _timeit(lambda: conn.execute('SELECT SUM(miktar) FROM gelirler').fetchone(), repeat)
+        real_group_ms = _timeit(lambda: conn.execute(
+            'SELECT kategori, SUM(miktar) FROM gelirler GROUP BY kategori').fetchall(), repeat)
+
+        start = time.perf_counter()
+        create_schema(conn)
+        migrate_s = time.perf_counter() - start
+
+        int_sum = conn.execute('SELECT SUM(miktar_kurus) FROM gelirler').fetchone()[0]
+        int_ms = _timeit(lambda: conn.execute('SELECT SUM(miktar_kurus) FROM gelirler').fetchone(), repeat)
+        int_group_ms = _timeit(lambda: conn.execute(
+            'SELECT kategori, SUM(miktar_kurus) FROM gelirler GROUP BY kategori').fetchall(), repeat)
+
+        # Satır bazında: geçiş her kaydı kesin kuruş değerine çevirmiş olmalı
+        hatali_satir = sum(1 for (kurus,), beklenen_kurus
+                           in zip(conn.execute('SELECT miktar_kurus FROM gelirler ORDER BY id'), kuruslar)
+                           if kurus != beklenen_kurus)
+        grup = dict(conn.execute('SELECT kategori, SUM(miktar_kurus) FROM gelirler GROUP BY kategori'))
+        rapor = report(conn)
+        conn.close()
+
+    # API sınırındaki dönüşüm her kuruş değerini kayıpsız geri vermeli
+    donusum_hatasi = sum(1 for kurus in kuruslar if to_kurus(from_kurus(kurus)) != kurus)
+    checks = [
+        ("satır bazında geçiş", hatali_satir == 0, f"{hatali_satir} hatalı satır"),
+        ("SUM(miktar_kurus) kesin", int_sum == beklenen, f"fark {int_sum - beklenen} kuruş"),
+        ("kategori toplamları kesin", grup == beklenen_kategori, ""),
+        ("rapor toplamı", rapor["toplam_gelir"] == from_kurus(beklenen), f"{rapor['toplam_gelir']}"),
+        ("TL <-> kuruş dönüşümü", donusum_hatasi == 0, f"{donusum_hatasi} hatalı değer"),
+    ]
+    print(f"{rows} kayıt, kesin toplam {from_kurus(beklenen):,.2f} TL")
+    print(f"REAL SUM    {real_ms:8.2f} ms  GROUP BY {real_group_ms:8.2f} ms  "
+          f"hata {real_sum * 100 - beklenen:+.6f} kuruş")
+    print(f"INTEGER SUM {int_ms:8.2f} ms  GROUP BY {int_group_ms:8.2f} ms  "
+          f"hata {int_sum - beklenen:+d} kuruş")
+    print(f"geçiş süresi {migrate_s:.2f} sn")
+    for name, passed, detail in checks:
+        ok = ok and passed
+        print(f"{'OK  ' if passed else 'HATA'} {name} {'' if passed else detail}")
+    return ok
+
+
+# Rastgele açıklamalar için kelimeler (aramada bulunacak nadir kelime: "kırtasiye")
+ACIKLAMA_KELIMELERI = ["market", "alışveriş", "fatura", "ödeme", "elektrik", "su", "doğalgaz", "kira",
+                       "maaş", "danışmanlık", "yakıt", "otopark", "yemek", "kargo", "sigorta", "vergi"]
+
+
+def bench_search(rows: int, repeat: int = 20) -> bool:
+    """FTS5 arama dizini vs. LIKE taraması; tetikleyicilerin ekleme maliyeti"""
+    def kayitlar(count: int, offset: int = 0):
+        for i in range(count):
+            kelimeler = random.sample(ACIKLAMA_KELIMELERI, 3)
+            if (offset + i) % 1000 == 0:
+                kelimeler.append("Kırtasiye")
+            # Tarihler ekleme sırasından bağımsız (geçmiş tarihli kayıtlar, içe aktarımlar)
+            gun = datetime.fromordinal(738000 + random.randrange(1100))
+            yield (" ".join(kelimeler).capitalize(), random.randrange(100, 500000),
+                   random.choice(KATEGORILER), gun.strftime("%Y-%m-%d 12:00:00"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        create_schema(conn)
+        sql = 'INSERT INTO giderler (aciklama, miktar_kurus, kategori, tarih) VALUES (?, ?, ?, ?)'
+        start = time.perf_counter()
+        with conn:
+            conn.executemany(sql, kayitlar(rows))
+        insert_s = time.perf_counter() - start
+
+        sorgular = [("nadir kelime", "kirtasiye"), ("yaygın kelime", "market"),
+                    ("iki kelime", "elektrik faturası"), ("üç kelime", "market kira yakıt"),
+                    ("önek", "danış")]
+        ok = True
+        print(f"{rows} kayıt eklendi: {rows / insert_s:.0f} kayıt/sn (arama dizini dahil)")
+        for name, sorgu in sorgular:
+            fts = _timeit(lambda: search(conn, sorgu), repeat)
+            like = _timeit(lambda: conn.execute(
+                'SELECT id FROM giderler WHERE aciklama LIKE ? ORDER BY tarih DESC, id DESC LIMIT 20',
+                (f"%{sorgu.split()[0]}%",)).fetchall(), 3)
+            siralama = search(conn, sorgu)["siralama"]
+            print(f"{name:<14} {sorgu!r:<22} FTS5 ({siralama:<7}): {fts:8.2f} ms   LIKE: {like:8.2f} ms")
+
+        # Doğruluk: nadir kelimenin tüm eşleşmeleri sayfalama ile eksiksiz ve tekrarsız gelmeli
+        bulunan, after = [], None
+        while True:
+            sayfa = search(conn, "KIRTASİYE", limit=200, after=after)
+            bulunan += [k["id"] for k in sayfa["kayitlar"]]
+            after = sayfa["sonraki"]
+            if after is None:
+                break
+        beklenen = conn.execute("SELECT COUNT(*) FROM giderler WHERE aciklama LIKE '%Kırtasiye%'").fetchone()[0]
+        passed = len(bulunan) == len(set(bulunan)) == beklenen
+        ok = ok and passed
+        print(f"{'OK  ' if passed else 'HATA'} sayfalama: {len(bulunan)} / {beklenen} kayıt")
+
+        # Yaygın kelimede sonuçlar tarih indeksinden, en yeni kayıt önce gelmeli
+        ilk_sayfa = search(conn, "market", limit=20)
+        beklenen_ids = [row[0] for row in conn.execute(
+            "SELECT id FROM giderler WHERE aciklama LIKE '%market%' ORDER BY tarih DESC, id DESC LIMIT 20")]
+        passed = ilk_sayfa["siralama"] == "en_yeni" and [k["id"] for k in ilk_sayfa["kayitlar"]] == beklenen_ids
+        ok = ok and passed
+        print(f"{'OK  ' if passed else 'HATA'} en_yeni sıralaması tarihe göre")
+
+        # Silinen kayıt dizinden de çıkmalı
+        silinecek = bulunan[0]
+        with conn:
+            conn.execute("DELETE FROM giderler WHERE id = ?", (silinecek,))
+        passed = silinecek not in [k["id"] for k in search(conn, "kirtasiye", limit=200)["kayitlar"]]
+        ok = ok and passed
+        print(f"{'OK  ' if passed else 'HATA'} silme sonrası dizin güncel")
+        conn.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muhasebe veritabanı benchmark'ları")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("connections", help="Bağlantı başına maliyet: connect/close vs. kalıcı bağlantı")
+    p.add_argument("--calls", type=int, default=2000)
+
+    p = sub.add_parser("report", help="rapor_getir: ham tablo taraması vs. özet tabloları")
+    p.add_argument("--rows", type=int, default=200000)
+
+    p = sub.add_parser("bulk", help="Kayıt başına işlem vs. tek işlemde toplu ekleme")
+    p.add_argument("--rows", type=int, default=100000)
+
+    p = sub.add_parser("toolcache", help="Okuma tool'ları: önbelleksiz vs. defter sürümlü önbellek")
+    p.add_argument("--rows", type=int, default=200000)
+
+    p = sub.add_parser("kurus", help="REAL vs. tam sayı kuruş toplamları: hız ve doğruluk kontrolü")
+    p.add_argument("--rows", type=int, default=1000000)
+
+    p = sub.add_parser("search", help="FTS5 arama dizini vs. LIKE taraması ve sayfalama kontrolü")
+    p.add_argument("--rows", type=int, default=1000000)
+
+    sub.add_parser("plans", help="EXPLAIN QUERY PLAN regresyon kontrolü (indeks kullanımı)")
+
+    args = parser.parse_args()
+    if args.command == "connections":
+        bench_connections(args.calls)
+    elif args.command == "report":
+        bench_report(args.rows)
+    elif args.command == "bulk":
+        bench_bulk(args.rows)
+    elif args.command == "toolcache":
+        sys.exit(0 if bench_tool_cache(args.rows) else 1)
+    elif args.command == "kurus":
+        sys.exit(0 if bench_kurus(args.rows) else 1)
+    elif args.command == "search":
+        sys.exit(0 if bench_search(args.rows) else 1)
+    elif args.command == "plans":
+        sys.exit(0 if check_plans() else 1)
+
+
+if __name__ == "__main__":
+    main()
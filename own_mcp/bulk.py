@@ -0,0 +1,195 @@
+"""Çok sayıda gelir/gider kaydını tek bir işlemde (transaction) toplu ekleme.
+
+Satırlar önce doğrulanır, geçerli olanlar executemany ile parça parça yazılır;
+geçersiz satırlar satır numarası ve hata mesajıyla raporlanır. Hata mesajları
+alan değerlerini içermez; yalnızca ilk MAX_REPORTED_ERRORS hata listelenir,
+toplam hata sayısı ayrıca verilir.
+
+Kullanım:
+    python own_mcp/bulk.py <db_yolu> gelir|gider <dosya.csv|dosya.jsonl> [--atomik]
+
+CSV dosyasında başlık satırı olmalıdır: aciklama,miktar,kategori,tarih
+(kategori ve tarih opsiyoneldir). Ayırıcı (virgül, noktalı virgül veya sekme)
+dosyanın başından tespit edilir.
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from amounts import to_kurus
+from ledger import TABLES, open_ledger
+
+# Geçerli satırlar bu büyüklükte parçalar halinde executemany'ye verilir
+BULK_CHUNK_SIZE = 5000
+
+# Tek bir tool çağrısında kabul edilen en fazla kayıt (dosyadan içe aktarımda sınır yok)
+MAX_TOOL_ROWS = 10000
+
+# Yanıtta listelenen en fazla hatalı satır (geri kalanı yalnızca hata_sayisi'na yansır)
+MAX_REPORTED_ERRORS = 20
+
+# Ayırıcı tespiti için okunan dosya başı (karakter)
+SNIFF_SIZE = 64 * 1024
+
+IMPORT_EXTENSIONS = (".csv", ".jsonl", ".ndjson", ".json")
+
+
+def validate_row(row: Dict, simdi: str) -> Tuple:
+    """Tek bir satırı doğrula ve INSERT parametrelerine çevir; hatalıysa ValueError fırlat"""
+    if not isinstance(row, dict):
+        raise ValueError("Kayıt bir nesne (dict) olmalı")
+
+    aciklama = str(row.get("aciklama") or "").strip()
+    if not aciklama:
+        raise ValueError("Açıklama boş olamaz")
+
+    # Tutar TL olarak gelir, kuruş olarak saklanır
+    try:
+        kurus = to_kurus(row.get("miktar"))
+    except ValueError:
+        raise ValueError("Geçersiz miktar (TL cinsinden sayı olmalı)") from None
+    if kurus <= 0:
+        raise ValueError("Miktar 0'dan büyük olmalıdır")
+
+    kategori = str(row.get("kategori") or "Genel").strip() or "Genel"
+
+    tarih = str(row.get("tarih") or "").strip()
+    if tarih:
+        # fromisoformat, strptime'a göre çok daha hızlıdır (büyük içe aktarımlarda önemli)
+        try:
+            if len(tarih) not in (10, 19):
+                raise ValueError
+            parsed = datetime.fromisoformat(tarih)
+            # fromisoformat "2024-W01-1" gibi ISO hafta tarihlerini de kabul eder; saklanan metin
+            # tarih aralığı filtreleri ve özetler için her zaman YYYY-MM-DD[ HH:MM:SS] olmalı
+            if len(tarih) == 10:
+                if parsed.date().isoformat() != tarih:
+                    raise ValueError
+            elif tarih not in (parsed.isoformat(" "), parsed.isoformat("T")):
+                raise ValueError
+        except ValueError:
+            raise ValueError("Geçersiz tarih (YYYY-MM-DD veya YYYY-MM-DD HH:MM:SS olmalı)") from None
+        tarih = parsed.isoformat(" ")
+    else:
+        tarih = simdi
+
+    return (aciklama, kurus, kategori, tarih)
+
+
+def insert_rows(conn: sqlite3.Connection, tur: str, rows: Iterable[Dict], atomik: bool = False) -> Dict:
+    """Satırları doğrula ve tek işlem içinde ekle.
+
+    Args:
+        tur: "gelir" veya "gider"
+        rows: Kayıtlar (sözlük); sırası satır numarası olarak raporlanır (1'den başlar)
+        atomik: True ise tek bir hatalı satır bile varsa hiçbir kayıt eklenmez
+
+    Returns:
+        {"eklenen": eklenen kayıt sayısı, "hata_sayisi": toplam hatalı satır,
+         "hatalar": ilk MAX_REPORTED_ERRORS hata, [{"satir": n, "hata": mesaj}, ...]}
+    """
+    if tur not in TABLES:
+        raise ValueError("Geçersiz tür, 'gelir' veya 'gider' olmalı")
+    sql = f'INSERT INTO {TABLES[tur]} (aciklama, miktar_kurus, kategori, tarih) VALUES (?, ?, ?, ?)'
+    simdi = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    hatalar: List[Dict] = []
+    hata_sayisi = eklenen = 0
+    numbered = enumerate(rows, start=1)
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    while True:
+        chunk = list(islice(numbered, BULK_CHUNK_SIZE))
+        if not chunk:
+            break
+        valid = []
+        for satir, row in chunk:
+            try:
+                valid.append(validate_row(row, simdi))
+            except ValueError as e:
+                hata_sayisi += 1
+                if len(hatalar) < MAX_REPORTED_ERRORS:
+                    hatalar.append({"satir": satir, "hata": str(e)})
+        if atomik and hata_sayisi:
+            # Hata sayısını raporlamaya devam et ama artık yazma
+            continue
+        conn.executemany(sql, valid)
+        eklenen += len(valid)
+
+    if atomik and hata_sayisi:
+        conn.rollback()
+        eklenen = 0
+    return {"eklenen": eklenen, "hata_sayisi": hata_sayisi, "hatalar": hatalar}
+
+
+def _sniff_dialect(f) -> type:
+    """CSV ayırıcısını (virgül, noktalı virgül, sekme) dosyanın başından tespit et ve başa dön"""
+    sample = f.read(SNIFF_SIZE)
+    f.seek(0)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        # Tek sütunlu veya boş dosya: varsayılan virgül
+        return csv.excel
+
+
+def read_records(path: str) -> Iterator[Dict]:
+    """CSV veya JSON Lines dosyasındaki kayıtları sırayla oku"""
+    if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # validate_row satırı "nesne değil" diye raporlar
+                    yield line
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f, dialect=_sniff_dialect(f))
+
+
+def resolve_import_path(directory: str, path: str) -> str:
+    """İçe aktarılacak dosyanın yolunu directory altında çöz; dışındaysa ValueError fırlat.
+
+    Göreli yollar directory'ye göre yorumlanır; sembolik bağlar ve ".." çözüldükten
+    sonra dosya hâlâ directory altında olmalıdır.
+    """
+    root = os.path.realpath(directory)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise ValueError(f"Yalnızca içe aktarma klasöründeki dosyalar okunabilir: {root}")
+    if not resolved.lower().endswith(IMPORT_EXTENSIONS):
+        raise ValueError(f"Desteklenen dosya türleri: {', '.join(IMPORT_EXTENSIONS)}")
+    return resolved
+
+
+def import_file(conn: sqlite3.Connection, tur: str, path: str, atomik: bool = False) -> Dict:
+    """CSV/JSON Lines dosyasını tek işlemde içe aktar"""
+    return insert_rows(conn, tur, read_records(path), atomik=atomik)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV/JSON Lines dosyasından toplu gelir/gider ekle")
+    parser.add_argument("db_path")
+    parser.add_argument("tur", choices=sorted(TABLES))
+    parser.add_argument("dosya")
+    parser.add_argument("--atomik", action="store_true", help="Hatalı satır varsa hiçbir kaydı ekleme")
+    args = parser.parse_args()
+
+    conn = open_ledger(args.db_path)
+    with conn:
+        sonuc = import_file(conn, args.tur, args.dosya, atomik=args.atomik)
+    conn.close()
+    for hata in sonuc["hatalar"]:
+        print(f"Satır {hata['satir']}: {hata['hata']}")
+    if sonuc["hata_sayisi"] > len(sonuc["hatalar"]):
+        print(f"... ilk {len(sonuc['hatalar'])} hata gösterildi")
+    print(f"{sonuc['eklenen']} kayıt eklendi, {sonuc['hata_sayisi']} hatalı satır")
@@ -0,0 +1,136 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+# Bağlantı modu: "thread" (her thread için tek kalıcı bağlantı) veya "pool" (ortak havuz)
+DB_MODE = os.environ.get("MUHASEBE_DB_MODE", "thread")
+DB_POOL_SIZE = int(os.environ.get("MUHASEBE_DB_POOL_SIZE", "4"))
+
+# Her bağlantıda uygulanacak PRAGMA ayarları
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -20000,       # ~20 MB sayfa önbelleği
+    "mmap_size": 268435456,     # 256 MB bellek eşlemeli okuma
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+# sqlite3 modülünün bağlantı başına sakladığı hazırlanmış ifade sayısı
+STATEMENT_CACHE_SIZE = 256
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Ayarlanmış PRAGMA'larla yeni bir SQLite bağlantısı aç"""
+    conn = sqlite3.connect(
+        db_path,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+    )
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def date_range_filter(column: str,
+                      baslangic_tarih: Optional[str] = None,
+                      bitis_tarih: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """Kapsayıcı bir YYYY-MM-DD tarih aralığını indekslenebilir koşullara çevir.
+
+    date(tarih) BETWEEN ? AND ? yerine ham sütun üzerinde yarı açık aralık
+    (tarih >= başlangıç AND tarih < bitişten sonraki gün) kullanılır; böylece
+    tarih indeksleri kullanılabilir. Koşullar ve parametreler ayrı listeler olarak döner.
+    """
+    conditions, params = [], []
+    if baslangic_tarih:
+        conditions.append(f"{column} >= ?")
+        params.append(baslangic_tarih[:10])
+    if bitis_tarih:
+        ertesi_gun = datetime.strptime(bitis_tarih[:10], "%Y-%m-%d") + timedelta(days=1)
+        conditions.append(f"{column} < ?")
+        params.append(ertesi_gun.strftime("%Y-%m-%d"))
+    return conditions, params
+
+
+class ConnectionManager:
+    """Uzun ömürlü SQLite bağlantılarını yöneten sınıf.
+
+    "thread" modunda her thread kendi bağlantısını bir kez açar ve tekrar kullanır.
+    "pool" modunda en fazla pool_size bağlantı açılır ve thread'ler arasında paylaşılır.
+    """
+
+    def __init__(self, db_path: str, mode: str = DB_MODE, pool_size: int = DB_POOL_SIZE):
+        if mode not in ("thread", "pool"):
+            raise ValueError(f"Geçersiz bağlantı modu: {mode}")
+        self.db_path = db_path
+        self.mode = mode
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._all = []
+
+    def _open(self) -> sqlite3.Connection:
+        conn = connect(self.db_path)
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.pool_size
+            if can_create:
+                self._created += 1
+        if can_create:
+            return self._open()
+        return self._pool.get()
+
+    @contextmanager
+    def connection(self):
+        """Tekrar kullanılabilir bir bağlantı ver.
+
+        Blok hatasız biterse bekleyen işlem commit edilir, hata olursa geri alınır.
+        """
+        if self.mode == "thread":
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = self._open()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            return
+
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.put(conn)
+
+    def close_all(self):
+        """Açılmış tüm bağlantıları kapat"""
+        with self._lock:
+            conns, self._all = self._all, []
+            self._created = 0
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
@@ -0,0 +1,216 @@
+"""Analiz (BI) için defterin tamamını sütunlu dosyalara akışlı olarak dışa aktarma.
+
+Kayıtlar id sırasıyla, EXPORT_BATCH_SIZE'lık keyset parçaları halinde okunur ve
+her parça doğrudan dosyaya yazılır; bellek kullanımı kayıt sayısına değil parça
+boyutuna bağlıdır. Biçimler:
+    parquet: Apache Parquet (zstd), her parça bir row group   (pyarrow gerekir)
+    arrow:   Arrow IPC dosyası, her parça bir record batch     (pyarrow gerekir)
+    csv:     gzip sıkıştırılmış CSV                             (ek bağımlılık yok)
+Biçim verilmezse pyarrow kuruluysa parquet, değilse csv kullanılır.
+
+Artımlı dışa aktarım: id_sonrasi verilirse yalnızca id'si bundan büyük kayıtlar,
+tarih_sonrasi verilirse tarihi bundan sonra olan kayıtlar yazılır. Dönen
+"filigran" her tür için yazılan son id'yi ve en büyük tarihi içerir; bir sonraki
+çalıştırmada id_sonrasi olarak verilir. Geçmiş tarihli eklemeleri de kaçırmamak
+için id filigranı tercih edilmelidir; düzenlenen veya silinen kayıtlar artımlı
+dışa aktarıma yansımaz, bunlar için tam dışa aktarım gerekir.
+
+Kullanım:
+    python own_mcp/export.py <db_yolu> [--bicim parquet|arrow|csv] [--tur gider]
+                             [--id-sonrasi 1200] [--tarih-sonrasi 2024-06-01] [--cikti klasor]
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from amounts import from_kurus
+from ledger import TABLES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv.gz"}
+
+# Dosyadaki sütunlar; miktar_kurus tam sayı (kesin), miktar TL
+EXPORT_COLUMNS = ("tur", "id", "tarih", "aciklama", "kategori", "miktar_kurus", "miktar")
+
+# Tek seferde okunup yazılan satır sayısı (parquet'te aynı zamanda row group boyutu)
+EXPORT_BATCH_SIZE = 10_000
+
+
+def default_format() -> str:
+    return "parquet" if pa is not None else "csv"
+
+
+def _batches(conn: sqlite3.Connection, tur: str, id_sonrasi: Optional[int],
+             tarih_sonrasi: Optional[str], batch_size: int) -> Iterator[List[tuple]]:
+    """(id, tarih, aciklama, kategori, miktar_kurus) satırlarını id sırasıyla parça parça üret.
+
+    Her parça ayrı bir sorgudur; uzun bir okuma işlemi açık tutulmadığı için
+    dışa aktarım sırasında yazıcılar ve WAL checkpoint bloklanmaz.
+    """
+    conditions, params = ["id > ?"], [id_sonrasi or 0]
+    if tarih_sonrasi:
+        conditions.append("tarih > ?")
+        params.append(tarih_sonrasi)
+    sql = f'''SELECT id, tarih, aciklama, kategori, miktar_kurus FROM {TABLES[tur]}
+              WHERE {" AND ".join(conditions)} ORDER BY id LIMIT ?'''
+    while True:
+        rows = conn.execute(sql, params + [batch_size]).fetchall()
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        params[0] = rows[-1][0]
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self._file = gzip.open(path, "wt", compresslevel=6, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write(self, tur: str, rows: List[tuple]):
+        self._writer.writerows((tur, *row, from_kurus(row[4])) for row in rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowWriter:
+    def __init__(self, path: str, bicim: str):
+        # Arrow IPC dosyası alan başına tek sözlüğe izin verir; tüm parçalar aynı sözlüğü kullanır
+        self._turler = list(TABLES)
+        self._schema = pa.schema([
+            ("tur", pa.dictionary(pa.int8(), pa.string())),
+            ("id", pa.int64()),
+            ("tarih", pa.string()),
+            ("aciklama", pa.string()),
+            ("kategori", pa.string()),
+            ("miktar_kurus", pa.int64()),
+            ("miktar", pa.float64()),
+        ])
+        if bicim == "parquet":
+            self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(path, self._schema)
+
+    def write(self, tur: str, rows: List[tuple]):
+        ids, tarihler, aciklamalar, kategoriler, kuruslar = zip(*rows)
+        self._writer.write_batch(pa.record_batch([
+            pa.DictionaryArray.from_arrays(pa.array([self._turler.index(tur)] * len(rows), pa.int8()),
+                                           self._turler),
+            pa.array(ids, pa.int64()),
+            pa.array(tarihler, pa.string()),
+            pa.array(aciklamalar, pa.string()),
+            pa.array(kategoriler, pa.string()),
+            pa.array(kuruslar, pa.int64()),
+            pa.array([from_kurus(k) for k in kuruslar], pa.float64()),
+        ], schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def _export_path(directory: str, bicim: str, tur: Optional[str] = None) -> str:
+    """Zaman damgalı dışa aktarım dosyası yolu (örn. defter_20240601_120000_123456.parquet)"""
+    name = TABLES[tur] if tur else "defter"
+    return os.path.join(directory, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{FORMATS[bicim]}")
+
+
+def _reserve_export_path(directory: str, bicim: str, tur: Optional[str] = None) -> str:
+    """Kullanılmayan bir dosya yolu seç ve geçici dosyasını O_EXCL ile oluşturarak ayır.
+
+    Aynı anda çalışan iki dışa aktarım aynı geçici dosyayı oluşturamaz; ad alınmışsa
+    veya hedef dosya zaten varsa yeni bir zaman damgasıyla tekrar denenir.
+    """
+    while True:
+        path = _export_path(directory, bicim, tur)
+        if os.path.exists(path):
+            continue
+        try:
+            os.close(os.open(f"{path}.tmp", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            continue
+        return path
+
+
+def export_ledger(conn: sqlite3.Connection, directory: str, bicim: Optional[str] = None,
+                  tur: Optional[str] = None, id_sonrasi: Optional[int] = None,
+                  tarih_sonrasi: Optional[str] = None,
+                  batch_size: int = EXPORT_BATCH_SIZE) -> Dict:
+    """Gelir ve/veya gider kayıtlarını directory altında zaman damgalı tek bir dosyaya yaz.
+
+    Dosya önce geçici adla yazılır ve yalnızca başarıyla bittiğinde asıl adına taşınır;
+    eşzamanlı dışa aktarımlar birbirinin dosyasının üzerine yazmaz.
+
+    Returns:
+        {"dosya", "bicim", "kayit_sayisi", "filigran": {tur: {"son_id", "son_tarih"}}}
+    """
+    bicim = bicim or default_format()
+    if bicim not in FORMATS:
+        raise ValueError(f"Geçersiz biçim: {bicim}. Geçerli biçimler: {', '.join(FORMATS)}")
+    if bicim != "csv" and pa is None:
+        raise ValueError(f"{bicim} için pyarrow kurulu olmalı (pip install pyarrow) veya bicim='csv' kullanın")
+    if tur is not None and tur not in TABLES:
+        raise ValueError("Geçersiz tür, 'gelir' veya 'gider' olmalı")
+    if id_sonrasi and tur is None:
+        # id'ler tablo başına ayrı sayılır, tek bir id filigranı iki tabloya uygulanamaz
+        raise ValueError("id_sonrasi yalnızca tek bir tür (gelir veya gider) ile kullanılabilir")
+
+    os.makedirs(directory, exist_ok=True)
+    path = _reserve_export_path(directory, bicim, tur)
+    tmp_path = f"{path}.tmp"
+    try:
+        writer = _CsvWriter(tmp_path) if bicim == "csv" else _ArrowWriter(tmp_path, bicim)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    count, filigran = 0, {}
+    try:
+        for tur_adi in ([tur] if tur else TABLES):
+            son_id, son_tarih = id_sonrasi or 0, None
+            for rows in _batches(conn, tur_adi, id_sonrasi, tarih_sonrasi, batch_size):
+                writer.write(tur_adi, rows)
+                count += len(rows)
+                son_id = rows[-1][0]
+                son_tarih = max(son_tarih or "", max(row[1] for row in rows))
+            filigran[tur_adi] = {"son_id": son_id, "son_tarih": son_tarih}
+        writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        writer.close()
+        os.remove(tmp_path)
+        raise
+    return {"dosya": path, "bicim": bicim, "kayit_sayisi": count, "filigran": filigran}
+
+
+if __name__ == "__main__":
+    from ledger import open_ledger
+
+    parser = argparse.ArgumentParser(description="Defteri Parquet/Arrow/CSV olarak dışa aktar")
+    parser.add_argument("db_path")
+    parser.add_argument("--bicim", choices=sorted(FORMATS), default=None)
+    parser.add_argument("--tur", choices=sorted(TABLES))
+    parser.add_argument("--id-sonrasi", type=int, help="Yalnızca bu id'den sonraki kayıtlar (--tur ile)")
+    parser.add_argument("--tarih-sonrasi", help="Yalnızca bu tarihten sonraki kayıtlar")
+    parser.add_argument("--cikti", default=".", help="Dosyanın yazılacağı klasör")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    conn = open_ledger(args.db_path)
+    try:
+        sonuc = export_ledger(conn, args.cikti, args.bicim, args.tur,
+                              args.id_sonrasi, args.tarih_sonrasi, args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+    print(json.dumps(sonuc, ensure_ascii=False))
+    conn.close()
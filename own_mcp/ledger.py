@@ -0,0 +1,108 @@
+"""Muhasebe defteri (gelirler/giderler) için ortak veri erişim katmanı.
+
+MCP server, masaüstü uygulama (app/main.py) ve app/database/create_db.py şemayı,
+bağlantı ayarlarını ve temel sorguları buradan alır. Böylece indeksler, PRAGMA
+ayarları, özet tabloları ve şema geçişleri her giriş noktasında aynı anda geçerli olur.
+
+Veritabanı yolu MUHASEBE_DB_PATH ortam değişkeniyle ayarlanır; verilmezse
+projedeki app/muhasebe.db kullanılır.
+
+Kullanım (şemayı oluştur/güncelle ve sürümü yazdır):
+    python own_mcp/ledger.py [db_yolu]
+"""
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+from amounts import from_kurus, to_kurus
+from db import connect
+from migrations import migrate
+from rollups import ensure_rollups, report_from_rollups
+
+DB_PATH = os.environ.get("MUHASEBE_DB_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "muhasebe.db")
+
+# Kayıt türü -> tablo adı
+TABLES = {"gelir": "gelirler", "gider": "giderler"}
+
+# tarih her zaman metin olarak "YYYY-MM-DD" veya "YYYY-MM-DD HH:MM:SS" biçiminde,
+# tutar tam sayı kuruş olarak saklanır (bkz. amounts.py)
+TABLE_SQL = '''CREATE TABLE IF NOT EXISTS {table}
+               (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                aciklama TEXT NOT NULL,
+                miktar_kurus INTEGER NOT NULL,
+                kategori TEXT NOT NULL,
+                tarih TEXT NOT NULL)'''
+
+TARIH_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def create_tables(conn: sqlite3.Connection):
+    """Yalnızca gelirler ve giderler tablolarını oluştur (geçişler olmadan)"""
+    for table in TABLES.values():
+        conn.execute(TABLE_SQL.format(table=table))
+
+
+def create_schema(conn: sqlite3.Connection) -> int:
+    """Tabloları oluştur, bekleyen geçişleri ve özet tablolarını uygula; şema sürümünü döndür"""
+    with conn:
+        create_tables(conn)
+    version = migrate(conn)
+    with conn:
+        ensure_rollups(conn)
+    return version
+
+
+def open_ledger(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Ortak PRAGMA ayarlarıyla bağlan ve şemanın güncel olduğundan emin ol"""
+    conn = connect(db_path or DB_PATH)
+    create_schema(conn)
+    return conn
+
+
+def add_entry(conn: sqlite3.Connection, tur: str, aciklama: str, miktar: Union[float, str],
+              kategori: str = "Genel", tarih: Optional[str] = None) -> Dict:
+    """Tek bir gelir/gider kaydı ekle ve eklenen kaydı döndür (miktar TL, tarih verilmezse şimdi)"""
+    if tur not in TABLES:
+        raise ValueError("Geçersiz tür, 'gelir' veya 'gider' olmalı")
+    kurus = to_kurus(miktar)
+    if kurus <= 0:
+        raise ValueError("Miktar 0'dan büyük olmalıdır")
+    tarih = tarih or datetime.now().strftime(TARIH_FORMAT)
+    cursor = conn.execute(f'''INSERT INTO {TABLES[tur]} (aciklama, miktar_kurus, kategori, tarih)
+                              VALUES (?, ?, ?, ?)''', (aciklama, kurus, kategori, tarih))
+    return {
+        "id": cursor.lastrowid,
+        "aciklama": aciklama,
+        "miktar": from_kurus(kurus),
+        "kategori": kategori,
+        "tarih": tarih,
+    }
+
+
+def report(conn: sqlite3.Connection,
+           baslangic_tarih: Optional[str] = None,
+           bitis_tarih: Optional[str] = None) -> Dict:
+    """Toplam gelir/gider, net durum ve kategori dağılımı (TL, özet tablolarından)"""
+    rapor = report_from_rollups(conn, baslangic_tarih, bitis_tarih)
+    # Net durum kuruş cinsinden hesaplanır, TL'ye yalnızca yanıtta çevrilir
+    return {
+        "toplam_gelir": from_kurus(rapor["toplam_gelir"]),
+        "toplam_gider": from_kurus(rapor["toplam_gider"]),
+        "net_durum": from_kurus(rapor["toplam_gelir"] - rapor["toplam_gider"]),
+        "gelir_kategorileri": {k: from_kurus(v) for k, v in rapor["gelir_kategorileri"].items()},
+        "gider_kategorileri": {k: from_kurus(v) for k, v in rapor["gider_kategorileri"].items()},
+        "tarih_araligi": {
+            "baslangic": baslangic_tarih or "Tüm zamanlar",
+            "bitis": bitis_tarih or "Tüm zamanlar"
+        }
+    }
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    conn = open_ledger(path)
+    print(f"{path}: şema sürümü {conn.execute('PRAGMA user_version').fetchone()[0]}")
+    conn.close()
@@ -0,0 +1,119 @@
+"""Gelir/gider listeleri için keyset (tarih, id) sayfalama ve akışlı okuma.
+
+Kayıtlar her zaman tarih DESC, id DESC sırasıyla döner. Sayfa imleci ("after")
+bir önceki sayfanın son kaydının (tarih, id) değeridir; OFFSET kullanılmadığı
+için her sayfa, kaçıncı sayfa olursa olsun indeks üzerinden sabit maliyetle okunur.
+"""
+import base64
+import json
+import sqlite3
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from amounts import from_kurus
+
+LIST_COLUMNS = ("id", "aciklama", "miktar", "kategori", "tarih")
+
+# Yanıttaki kolon adı -> tablodaki sütun (miktar kuruş olarak saklanır, TL olarak döner)
+SQL_COLUMNS = {"miktar": "miktar_kurus"}
+
+# Tool yanıtlarının MCP mesajını ve LLM bağlamını şişirmemesi için üst sınırlar
+DEFAULT_LIST_LIMIT = 50
+MAX_LIST_LIMIT = 500
+
+# Akışlı okumada tek seferde çekilen satır sayısı
+STREAM_BATCH_SIZE = 1000
+
+
+def encode_cursor(tarih: str, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{tarih}|{row_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    tarih, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+    return tarih, int(row_id)
+
+
+def _columns(kolonlar: Optional[Sequence[str]]) -> List[str]:
+    if not kolonlar:
+        return list(LIST_COLUMNS)
+    gecersiz = [k for k in kolonlar if k not in LIST_COLUMNS]
+    if gecersiz:
+        raise ValueError(f"Geçersiz kolon(lar): {', '.join(gecersiz)}. Geçerli kolonlar: {', '.join(LIST_COLUMNS)}")
+    return list(dict.fromkeys(kolonlar))
+
+
+def _fetch(conn: sqlite3.Connection, table: str, columns: List[str],
+           kategori: Optional[str], after, limit: int) -> List[tuple]:
+    # Sayfa imleci için tarih ve id her zaman seçilir (son iki sütun)
+    conditions, params = [], []
+    if kategori:
+        conditions.append("kategori = ?")
+        params.append(kategori)
+    if after:
+        conditions.append("(tarih, id) < (?, ?)")
+        params.extend(after)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    select = ", ".join(SQL_COLUMNS.get(c, c) for c in columns)
+    sql = f'''SELECT {select}, tarih, id FROM {table} {where}
+              ORDER BY tarih DESC, id DESC LIMIT ?'''
+    return conn.execute(sql, params + [limit]).fetchall()
+
+
+def _record(columns: List[str], row: tuple) -> Dict:
+    kayit = dict(zip(columns, row[:-2]))
+    if "miktar" in kayit:
+        kayit["miktar"] = from_kurus(kayit["miktar"])
+    return kayit
+
+
+def list_page(conn: sqlite3.Connection, table: str, kategori: Optional[str] = None,
+              limit: int = DEFAULT_LIST_LIMIT, after: Optional[str] = None,
+              kolonlar: Optional[Sequence[str]] = None) -> Dict:
+    """Tek bir sayfa kayıt döndür.
+
+    Returns:
+        {"kayitlar": [...], "sonraki": sonraki sayfanın imleci veya None}
+    """
+    columns = _columns(kolonlar)
+    limit = max(1, min(int(limit or DEFAULT_LIST_LIMIT), MAX_LIST_LIMIT))
+    after_key = decode_cursor(after) if after else None
+
+    # Bir fazla satır çekerek sonraki sayfanın olup olmadığını anla
+    rows = _fetch(conn, table, columns, kategori, after_key, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    kayitlar = [_record(columns, row) for row in rows]
+    sonraki = encode_cursor(rows[-1][-2], rows[-1][-1]) if has_more else None
+    return {"kayitlar": kayitlar, "sonraki": sonraki}
+
+
+def iter_rows(conn: sqlite3.Connection, table: str, kategori: Optional[str] = None,
+              kolonlar: Optional[Sequence[str]] = None,
+              batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Dict]:
+    """Tüm kayıtları sabit bellekle, batch_size'lık keyset parçaları halinde üret.
+
+    Her parça ayrı bir sorgudur; uzun bir okuma işlemi açık tutulmadığı için
+    dışa aktarım sırasında yazıcılar bloklanmaz.
+    """
+    columns = _columns(kolonlar)
+    after_key = None
+    while True:
+        rows = _fetch(conn, table, columns, kategori, after_key, batch_size)
+        for row in rows:
+            yield _record(columns, row)
+        if len(rows) < batch_size:
+            return
+        after_key = (rows[-1][-2], rows[-1][-1])
+
+
+def export_jsonl(conn: sqlite3.Connection, table: str, path: str, kategori: Optional[str] = None,
+                 kolonlar: Optional[Sequence[str]] = None) -> int:
+    """Kayıtları satır satır JSON (JSON Lines) olarak dosyaya yaz, yazılan kayıt sayısını döndür"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for kayit in iter_rows(conn, table, kategori, kolonlar):
+            f.write(json.dumps(kayit, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
@@ -1,46 +1,67 @@
 from mcp.server.fastmcp import FastMCP
-import sqlite3
+import argparse
+import asyncio
+import functools
 import time
 import signal
 import sys
 import os
+import atexit
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional
 
-# Get the absolute path for the database
-DB_PATH = "D:/cursor_project/app/muhasebe.db"
+from db import ConnectionManager
+from export import export_ledger
+from bulk import MAX_TOOL_ROWS, import_file, insert_rows, resolve_import_path
+from ledger import DB_PATH, TABLES, add_entry, create_schema, report
+from listing import DEFAULT_LIST_LIMIT, export_jsonl, list_page
+from search import DEFAULT_SEARCH_LIMIT, search
+from tool_cache import ToolCache
+from trends import trend_report
+
+# Büyük dışa aktarımların yazılacağı klasör
+EXPORT_DIR = os.environ.get("MUHASEBE_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "muhasebe_exports"))
+
+# dosyadan_ice_aktar yalnızca bu klasördeki dosyaları okur
+IMPORT_DIR = os.environ.get("MUHASEBE_IMPORT_DIR", os.path.join(tempfile.gettempdir(), "muhasebe_imports"))
+
+# Tool gövdelerinin (bloklayan SQLite işleri) çalıştırıldığı thread sayısı.
+# 0 ise tool'lar eskisi gibi olay döngüsünde senkron çalışır ve çağrılar sıralanır.
+TOOL_WORKERS = int(os.environ.get("MUHASEBE_MCP_WORKERS", "4"))
+
+# Sunucunun varsayılan taşıma katmanı: stdio veya sse
+TRANSPORT = os.environ.get("MUHASEBE_MCP_TRANSPORT", "stdio")
+
+# Tool çağrıları arasında tekrar kullanılan bağlantılar
+db_manager = ConnectionManager(DB_PATH)
+atexit.register(db_manager.close_all)
+
+# Okuma tool'larının sonuçları, defter değişmediği sürece tekrar hesaplanmaz
+tool_cache = ToolCache()
 
 # Handle SIGINT (Ctrl+C) gracefully
 def signal_handler(sig, frame):
-    print("Shutting down server gracefully...")
+    print("Shutting down server gracefully...", file=sys.stderr)
     sys.exit(0)
 
 signal.signal(signal.SIGINT, signal_handler)
 
+# Database helper functions
+def get_db():
+    """Havuzdan/thread'den tekrar kullanılan bir bağlantı döndürür (context manager)"""
+    return db_manager.connection()
+
 # Database initialization
 def init_db():
-    print(f"Initializing database at: {DB_PATH}")
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    # Create tables if they don't exist
-    c.execute('''CREATE TABLE IF NOT EXISTS gelirler
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  aciklama TEXT NOT NULL,
-                  miktar REAL NOT NULL,
-                  kategori TEXT NOT NULL,
-                  tarih TEXT NOT NULL)''')
-                  
-    c.execute('''CREATE TABLE IF NOT EXISTS giderler
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  aciklama TEXT NOT NULL,
-                  miktar REAL NOT NULL,
-                  kategori TEXT NOT NULL,
-                  tarih TEXT NOT NULL)''')
+    # stdio modunda stdout protokol kanalıdır, bilgi mesajları stderr'e yazılır
+    print(f"Initializing database at: {DB_PATH}", file=sys.stderr)
+    with get_db() as conn:
+        # Tablolar, bekleyen şema geçişleri ve rapor özet tabloları (ortak defter katmanı)
+        create_schema(conn)
                   
-    conn.commit()
-    conn.close()
-    print("Database initialized successfully")
+    print("Database initialized successfully", file=sys.stderr)
 
 # Initialize database on startup
 init_db()
@@ -53,11 +74,30 @@ mcp = FastMCP(
     timeout=30
 )
 
-# Database helper functions
-def get_db():
-    return sqlite3.connect(DB_PATH)
+tool_executor = (ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="muhasebe-tool")
+                 if TOOL_WORKERS > 0 else None)
+
+def tool():
+    """mcp.tool() yerine kullanılır: tool gövdesini sınırlı thread havuzunda çalıştırır.
 
-@mcp.tool()
+    Böylece yavaş bir rapor diğer tool çağrılarını bekletmez; her thread
+    ConnectionManager'dan kendi bağlantısını alır.
+    """
+    def decorator(fn):
+        if tool_executor is None:
+            return mcp.tool()(fn)
+
+        # wraps: FastMCP parametre şemasını ve açıklamayı orijinal fonksiyondan okur
+        @functools.wraps(fn)
+        async def async_tool(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(tool_executor, functools.partial(fn, *args, **kwargs))
+
+        mcp.tool()(async_tool)
+        return fn
+    return decorator
+
+@tool()
 def gelir_ekle(aciklama: str, miktar: float, kategori: str = "Genel") -> Dict:
     """Yeni bir gelir kaydı ekle. Eğer kategori girilmezse varsayılan olarak Genel kategorisi seçilir.
     
@@ -73,28 +113,12 @@ def gelir_ekle(aciklama: str, miktar: float, kategori: str = "Genel") -> Dict:
         if not isinstance(miktar, (int, float)) or miktar <= 0:
             return {"error": "Geçersiz miktar"}
             
-        conn = get_db()
-        c = conn.cursor()
-        tarih = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        c.execute('''INSERT INTO gelirler (aciklama, miktar, kategori, tarih)
-                    VALUES (?, ?, ?, ?)''', (aciklama, miktar, kategori, tarih))
-        
-        gelir_id = c.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return {
-            "id": gelir_id,
-            "aciklama": aciklama,
-            "miktar": miktar,
-            "kategori": kategori,
-            "tarih": tarih
-        }
+        with get_db() as conn:
+            return add_entry(conn, "gelir", aciklama, miktar, kategori)
     except Exception as e:
         return {"error": str(e)}
 
-@mcp.tool()
+@tool()
 def gider_ekle(aciklama: str, miktar: float, kategori: str = "Genel") -> Dict:
     """Yeni bir gider kaydı ekle. Eğer kategori girilmezse varsayılan olarak Genel kategorisi seçilir.
     
@@ -110,96 +134,190 @@ def gider_ekle(aciklama: str, miktar: float, kategori: str = "Genel") -> Dict:
         if not isinstance(miktar, (int, float)) or miktar <= 0:
             return {"error": "Geçersiz miktar"}
             
-        conn = get_db()
-        c = conn.cursor()
-        tarih = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        c.execute('''INSERT INTO giderler (aciklama, miktar, kategori, tarih)
-                    VALUES (?, ?, ?, ?)''', (aciklama, miktar, kategori, tarih))
-        
-        gider_id = c.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return {
-            "id": gider_id,
-            "aciklama": aciklama,
-            "miktar": miktar,
-            "kategori": kategori,
-            "tarih": tarih
-        }
+        with get_db() as conn:
+            return add_entry(conn, "gider", aciklama, miktar, kategori)
     except Exception as e:
         return {"error": str(e)}
 
-@mcp.tool()
-def gelirleri_listele(kategori: Optional[str] = None) -> List[Dict]:
-    """Gelir kayıtlarını listeler. İsteğe bağlı olarak kategoriye göre filtreleme yapılabilir.
+def _toplu_ekle(tur: str, kayitlar: List[Dict], atomik: bool) -> Dict:
+    if len(kayitlar) > MAX_TOOL_ROWS:
+        return {"error": f"Tek seferde en fazla {MAX_TOOL_ROWS} kayıt eklenebilir, dosyadan_ice_aktar kullanın"}
+    with get_db() as conn:
+        return insert_rows(conn, tur, kayitlar, atomik=atomik)
+
+@tool()
+def gelir_toplu_ekle(kayitlar: List[Dict], atomik: bool = False) -> Dict:
+    """Birden çok gelir kaydını tek seferde ekle. Çok sayıda kayıt eklenecekse gelir_ekle'yi tekrar tekrar çağırmak yerine bu tool kullanılmalıdır.
+    
+    Args:
+        kayitlar: Kayıt listesi, her biri {"aciklama": ..., "miktar": ..., "kategori": ... (opsiyonel), "tarih": "YYYY-MM-DD" (opsiyonel)}
+        atomik: True ise hatalı bir kayıt varsa hiçbir kayıt eklenmez (varsayılan: False)
+    
+    Returns:
+        Eklenen kayıt sayısı, toplam hatalı satır sayısı (hata_sayisi) ve ilk 20 hata
+    """
+    try:
+        return _toplu_ekle("gelir", kayitlar, atomik)
+    except Exception as e:
+        return {"error": str(e)}
+
+@tool()
+def gider_toplu_ekle(kayitlar: List[Dict], atomik: bool = False) -> Dict:
+    """Birden çok gider kaydını tek seferde ekle. Çok sayıda kayıt eklenecekse gider_ekle'yi tekrar tekrar çağırmak yerine bu tool kullanılmalıdır.
+    
+    Args:
+        kayitlar: Kayıt listesi, her biri {"aciklama": ..., "miktar": ..., "kategori": ... (opsiyonel), "tarih": "YYYY-MM-DD" (opsiyonel)}
+        atomik: True ise hatalı bir kayıt varsa hiçbir kayıt eklenmez (varsayılan: False)
+    
+    Returns:
+        Eklenen kayıt sayısı, toplam hatalı satır sayısı (hata_sayisi) ve ilk 20 hata
+    """
+    try:
+        return _toplu_ekle("gider", kayitlar, atomik)
+    except Exception as e:
+        return {"error": str(e)}
+
+@tool()
+def dosyadan_ice_aktar(dosya_yolu: str, tur: str = "gider", atomik: bool = False) -> Dict:
+    """CSV veya JSON Lines dosyasındaki gelir/gider kayıtlarını (ör. banka ekstresi) tek işlemde içe aktar.
+    CSV başlığı: aciklama,miktar,kategori,tarih (kategori ve tarih opsiyonel); ayırıcı virgül, noktalı virgül veya sekme olabilir.
+    Yalnızca içe aktarma klasöründeki (MUHASEBE_IMPORT_DIR) dosyalar okunabilir.
+    
+    Args:
+        dosya_yolu: İçe aktarma klasöründeki .csv veya .jsonl dosyasının adı (veya bu klasör altındaki yolu)
+        tur: "gelir" veya "gider" (varsayılan: gider)
+        atomik: True ise hatalı bir satır varsa hiçbir kayıt eklenmez (varsayılan: False)
+    
+    Returns:
+        Eklenen kayıt sayısı, toplam hatalı satır sayısı (hata_sayisi) ve ilk 20 hata
+    """
+    try:
+        path = resolve_import_path(IMPORT_DIR, dosya_yolu)
+        with get_db() as conn:
+            return import_file(conn, tur, path, atomik=atomik)
+    except Exception as e:
+        return {"error": str(e)}
+
+@tool()
+def gelirleri_listele(kategori: Optional[str] = None, limit: int = DEFAULT_LIST_LIMIT,
+                      after: Optional[str] = None, kolonlar: Optional[List[str]] = None) -> Dict:
+    """Gelir kayıtlarını en yeniden eskiye sayfa sayfa listeler. İsteğe bağlı olarak kategoriye göre filtreleme yapılabilir.
+    Yanıttaki "sonraki" değeri doluysa, sonraki sayfa için after parametresine verilir.
     
     Args:
         kategori: Filtrelemek için kategori (opsiyonel)
+        limit: Sayfa başına kayıt sayısı (varsayılan: 50, en fazla: 500)
+        after: Önceki yanıttaki "sonraki" imleci (opsiyonel)
+        kolonlar: Sadece istenen kolonlar, örn. ["tarih", "miktar"] (opsiyonel, varsayılan: hepsi)
     
     Returns:
-        Gelir kayıtları listesi
+        {"kayitlar": gelir kayıtları listesi, "sonraki": sonraki sayfa imleci veya None}
     """
     try:
-        conn = get_db()
-        c = conn.cursor()
-        
-        if kategori:
-            c.execute('SELECT * FROM gelirler WHERE kategori = ? ORDER BY tarih DESC', (kategori,))
-        else:
-            c.execute('SELECT * FROM gelirler ORDER BY tarih DESC')
-            
-        gelirler = []
-        for row in c.fetchall():
-            gelirler.append({
-                "id": row[0],
-                "aciklama": row[1],
-                "miktar": row[2],
-                "kategori": row[3],
-                "tarih": row[4]
-            })
-            
-        conn.close()
-        return gelirler
+        with get_db() as conn:
+            return tool_cache.get_or_compute(
+                conn, "gelirleri_listele", (kategori, limit, after, kolonlar),
+                lambda: list_page(conn, "gelirler", kategori, limit, after, kolonlar))
+    except Exception as e:
+        return {"error": str(e)}
+
+@tool()
+def giderleri_listele(kategori: Optional[str] = None, limit: int = DEFAULT_LIST_LIMIT,
+                      after: Optional[str] = None, kolonlar: Optional[List[str]] = None) -> Dict:
+    """Gider kayıtlarını en yeniden eskiye sayfa sayfa listeler. İsteğe bağlı olarak kategoriye göre filtreleme yapılabilir.
+    Yanıttaki "sonraki" değeri doluysa, sonraki sayfa için after parametresine verilir.
+    
+    Args:
+        kategori: Filtrelemek için kategori (opsiyonel)
+        limit: Sayfa başına kayıt sayısı (varsayılan: 50, en fazla: 500)
+        after: Önceki yanıttaki "sonraki" imleci (opsiyonel)
+        kolonlar: Sadece istenen kolonlar, örn. ["tarih", "miktar"] (opsiyonel, varsayılan: hepsi)
+    
+    Returns:
+        {"kayitlar": gider kayıtları listesi, "sonraki": sonraki sayfa imleci veya None}
+    """
+    try:
+        with get_db() as conn:
+            return tool_cache.get_or_compute(
+                conn, "giderleri_listele", (kategori, limit, after, kolonlar),
+                lambda: list_page(conn, "giderler", kategori, limit, after, kolonlar))
+    except Exception as e:
+        return {"error": str(e)}
+
+@tool()
+def kayitlarda_ara(sorgu: str, tur: Optional[str] = None, limit: int = DEFAULT_SEARCH_LIMIT,
+                   after: Optional[str] = None) -> Dict:
+    """Gelir ve gider kayıtlarını açıklama veya kategori metnine göre arar ("kırtasiye ödemeleri", "Migros" gibi), en alakalı kayıtlar önce gelir.
+    Belirli bir kaydı bulmak için tüm kayıtları listelemek yerine bu tool kullanılmalıdır. Türkçe karakter ve büyük/küçük harf farkı gözetilmez, kelimeler önek olarak aranır.
+    Yanıttaki "sonraki" değeri doluysa, sonraki sayfa için after parametresine verilir.
+    
+    Args:
+        sorgu: Aranacak kelimeler (hepsi geçmeli)
+        tur: "gelir" veya "gider" (opsiyonel, varsayılan: ikisi de)
+        limit: Sayfa başına kayıt sayısı (varsayılan: 20, en fazla: 200)
+        after: Önceki yanıttaki "sonraki" imleci (opsiyonel)
+    
+    Returns:
+        {"kayitlar": eşleşen kayıtlar (tur, id, aciklama, miktar, kategori, tarih), "sonraki": sonraki sayfa imleci veya None}
+    """
+    try:
+        with get_db() as conn:
+            return tool_cache.get_or_compute(
+                conn, "kayitlarda_ara", (sorgu, tur, limit, after),
+                lambda: search(conn, sorgu, tur, limit, after))
     except Exception as e:
         return {"error": str(e)}
 
-@mcp.tool()
-def giderleri_listele(kategori: Optional[str] = None) -> List[Dict]:
-    """Gelir kayıtlarını listeler. İsteğe bağlı olarak kategoriye göre filtreleme yapılabilir.Gider kayıtlarını listele.
+@tool()
+def kayitlari_disa_aktar(tur: str = "gider", kategori: Optional[str] = None,
+                         kolonlar: Optional[List[str]] = None) -> Dict:
+    """Tüm gelir veya gider kayıtlarını JSON Lines dosyasına parça parça yazar ve dosya yolunu döndürür.
+    Çok sayıda kaydın tamamı gerektiğinde listeleme yerine bu tool kullanılmalıdır.
     
     Args:
+        tur: "gelir" veya "gider" (varsayılan: gider)
         kategori: Filtrelemek için kategori (opsiyonel)
+        kolonlar: Sadece istenen kolonlar (opsiyonel, varsayılan: hepsi)
     
     Returns:
-        Gider kayıtları listesi
+        Dosya yolu ve yazılan kayıt sayısı
     """
     try:
-        conn = get_db()
-        c = conn.cursor()
+        if tur not in TABLES:
+            return {"error": "Geçersiz tür, 'gelir' veya 'gider' olmalı"}
         
-        if kategori:
-            c.execute('SELECT * FROM giderler WHERE kategori = ? ORDER BY tarih DESC', (kategori,))
-        else:
-            c.execute('SELECT * FROM giderler ORDER BY tarih DESC')
-            
-        giderler = []
-        for row in c.fetchall():
-            giderler.append({
-                "id": row[0],
-                "aciklama": row[1],
-                "miktar": row[2],
-                "kategori": row[3],
-                "tarih": row[4]
-            })
-            
-        conn.close()
-        return giderler
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        dosya = os.path.join(EXPORT_DIR, f"{TABLES[tur]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        with get_db() as conn:
+            kayit_sayisi = export_jsonl(conn, TABLES[tur], dosya, kategori, kolonlar)
+        
+        return {"dosya": dosya, "kayit_sayisi": kayit_sayisi}
+    except Exception as e:
+        return {"error": str(e)}
+
+@tool()
+def defteri_analiz_icin_disa_aktar(bicim: Optional[str] = None, tur: Optional[str] = None,
+                                   id_sonrasi: Optional[int] = None,
+                                   tarih_sonrasi: Optional[str] = None) -> Dict:
+    """Gelir ve giderleri analiz/BI araçları için Parquet, Arrow veya sıkıştırılmış CSV dosyasına yazar ve dosya yolunu döndürür.
+    Artımlı dışa aktarım için bir önceki yanıttaki filigran id'si id_sonrasi olarak verilir.
+    
+    Args:
+        bicim: "parquet", "arrow" veya "csv" (opsiyonel, varsayılan: pyarrow kuruluysa parquet, değilse csv)
+        tur: "gelir" veya "gider" (opsiyonel, varsayılan: ikisi birlikte)
+        id_sonrasi: Sadece bu id'den sonraki kayıtlar, tur ile birlikte (opsiyonel)
+        tarih_sonrasi: Sadece bu tarihten sonraki kayıtlar (opsiyonel)
+    
+    Returns:
+        Dosya yolu, biçim, yazılan kayıt sayısı ve tür başına son id/tarih (filigran)
+    """
+    try:
+        with get_db() as conn:
+            return export_ledger(conn, EXPORT_DIR, bicim, tur, id_sonrasi, tarih_sonrasi)
     except Exception as e:
         return {"error": str(e)}
 
-@mcp.tool()
+@tool()
 def rapor_getir(baslangic_tarih: Optional[str] = None, bitis_tarih: Optional[str] = None) -> Dict:
     """Finansal raporu getir. İsteğe bağlı baslangic_tarih ve bitis_tarih girebilir. Girilmez ise tüm zamanlar için rapor getirir.
     
@@ -211,56 +329,53 @@ def rapor_getir(baslangic_tarih: Optional[str] = None, bitis_tarih: Optional[str
         Toplam gelir, gider ve bakiye bilgileri
     """
     try:
-        conn = get_db()
-        c = conn.cursor()
-        
-        # Tarih filtreleri için SQL sorguları
-        date_filter = ""
-        params = []
-        if baslangic_tarih and bitis_tarih:
-            date_filter = "WHERE date(tarih) BETWEEN ? AND ?"
-            params = [baslangic_tarih, bitis_tarih]
-        
-        # Toplam gelir
-        c.execute(f'SELECT SUM(miktar) FROM gelirler {date_filter}', params)
-        toplam_gelir = c.fetchone()[0] or 0
-        
-        # Toplam gider
-        c.execute(f'SELECT SUM(miktar) FROM giderler {date_filter}', params)
-        toplam_gider = c.fetchone()[0] or 0
-        
-        # Kategori bazlı gelirler
-        c.execute(f'''SELECT kategori, SUM(miktar) 
-                     FROM gelirler {date_filter}
-                     GROUP BY kategori''', params)
-        gelir_kategorileri = {row[0]: row[1] for row in c.fetchall()}
-        
-        # Kategori bazlı giderler
-        c.execute(f'''SELECT kategori, SUM(miktar) 
-                     FROM giderler {date_filter}
-                     GROUP BY kategori''', params)
-        gider_kategorileri = {row[0]: row[1] for row in c.fetchall()}
-        
-        conn.close()
-        
-        return {
-            "toplam_gelir": toplam_gelir,
-            "toplam_gider": toplam_gider,
-            "net_durum": toplam_gelir - toplam_gider,
-            "gelir_kategorileri": gelir_kategorileri,
-            "gider_kategorileri": gider_kategorileri,
-            "tarih_araligi": {
-                "baslangic": baslangic_tarih or "Tüm zamanlar",
-                "bitis": bitis_tarih or "Tüm zamanlar"
-            }
-        }
+        # Toplamlar ham tablolar yerine günlük/kategori özetlerinden okunur
+        with get_db() as conn:
+            return tool_cache.get_or_compute(
+                conn, "rapor_getir", (baslangic_tarih, bitis_tarih),
+                lambda: report(conn, baslangic_tarih, bitis_tarih))
     except Exception as e:
         return {"error": str(e)}
 
+@tool()
+def trend_raporu(periyot: str = "ay", baslangic_tarih: Optional[str] = None, bitis_tarih: Optional[str] = None,
+                 kategori: Optional[str] = None, kategori_bazinda: bool = False) -> Dict:
+    """Gelir ve giderlerin dönem dönem zaman serisini getir ("son 12 ayın gider trendi" gibi sorular için). Kayıtları listelemek yerine bu tool kullanılmalıdır.
+    Yanıt sütun biçimindedir: "donem" listesindeki her dönem için gelir, gider, net, kümülatif bakiye ve bir önceki döneme göre değişim aynı sıradaki listelerde yer alır.
+    
+    Args:
+        periyot: "gun", "hafta", "ay" veya "yil" (varsayılan: ay)
+        baslangic_tarih: Başlangıç tarihi (YYYY-MM-DD formatında, opsiyonel)
+        bitis_tarih: Bitiş tarihi (YYYY-MM-DD formatında, opsiyonel)
+        kategori: Sadece bu kategorinin serisi (opsiyonel)
+        kategori_bazinda: True ise her kategorinin ayrı serisi de döner (varsayılan: False)
+    
+    Returns:
+        {"donem": [...], "gelir": [...], "gider": [...], "net": [...], "bakiye": [...], "gelir_degisim": [...], ...}
+    """
+    try:
+        with get_db() as conn:
+            return tool_cache.get_or_compute(
+                conn, "trend_raporu", (periyot, baslangic_tarih, bitis_tarih, kategori, kategori_bazinda),
+                lambda: trend_report(conn, periyot, baslangic_tarih, bitis_tarih, kategori, kategori_bazinda))
+    except Exception as e:
+        return {"error": str(e)}
+
+@mcp.resource("muhasebe://onbellek")
+def onbellek_istatistikleri() -> Dict:
+    """Tool sonuç önbelleğinin tool bazlı isabet/ıskalama sayaçları"""
+    return tool_cache.stats()
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Muhasebe MCP sunucusu")
+    parser.add_argument("--transport", choices=["stdio", "sse"], default=TRANSPORT,
+                        help="stdio: tek istemci (alt süreç); sse: 127.0.0.1:5000 üzerinden paylaşılan sunucu")
+    args = parser.parse_args()
     try:
-        print("Starting MCP server 'muhasebe-r' on 127.0.0.1:5000")
-        mcp.run()
+        # stdio modunda stdout protokol kanalıdır, bilgi mesajları stderr'e yazılır
+        print(f"Starting MCP server 'muhasebe-r' ({args.transport}, {TOOL_WORKERS} tool threads) on 127.0.0.1:5000",
+              file=sys.stderr)
+        mcp.run(transport=args.transport)
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=sys.stderr)
         time.sleep(5)
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""Muhasebe veritabanı için sürümlü şema geçişleri (migration).
+
+Uygulanan son geçişin numarası PRAGMA user_version içinde tutulur. Yeni bir şema
+değişikliği için MIGRATIONS listesinin sonuna bir sonraki numarayla ekleme yapın;
+mevcut girdileri değiştirmeyin. Bir adım SQL metni ya da mevcut şemaya bakması
+gereken durumlar için conn alan bir fonksiyon olabilir.
+"""
+import sqlite3
+from typing import Callable, List, Tuple, Union
+
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def _miktari_kurusa_cevir(conn: sqlite3.Connection):
+    """miktar REAL (TL) sütununu miktar_kurus INTEGER (kuruş) sütunuyla değiştir.
+
+    Yeni oluşturulan tablolarda zaten miktar_kurus vardır ve bir şey yapılmaz.
+    Özet tabloları toplamları REAL tuttuğu için silinir; ensure_rollups bunları
+    kuruş cinsinden yeniden oluşturup ham tablolardan doldurur.
+    """
+    for table in ("gelirler", "giderler"):
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if "miktar" not in columns:
+            continue
+        # miktar'a başvuran özet tetikleyicileri DROP COLUMN'dan önce kaldırılmalı
+        for ad in ("ekle", "sil", "guncelle"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {table}_ozet_{ad}")
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN miktar_kurus INTEGER NOT NULL DEFAULT 0")
+        conn.execute(f"UPDATE {table} SET miktar_kurus = CAST(ROUND(miktar * 100) AS INTEGER)")
+        conn.execute(f"ALTER TABLE {table} DROP COLUMN miktar")
+    conn.execute("DROP TABLE IF EXISTS gunluk_ozet")
+    conn.execute("DROP TABLE IF EXISTS kategori_ozet")
+
+
+def _tr_fold(expr: str) -> str:
+    """Türkçe ı/I/İ harflerini i'ye indiren SQL ifadesi (diğer aksanları FTS5 tokenizer'ı siler)"""
+    return f"replace(replace(replace({expr}, 'ı', 'i'), 'I', 'i'), 'İ', 'i')"
+
+
+def _arama_tetikleyicileri(table: str, tur_bit: int) -> List[str]:
+    """kayit_arama dizinini tabloyla eşzamanlı tutan tetikleyiciler.
+
+    Dizin içeriksizdir (content=''); silmede FTS5 'delete' komutuna eklenen
+    değerlerin aynısı verilmelidir. rowid = id * 2 + tür biti (gelir 0, gider 1).
+    """
+    def ekle(row: str) -> str:
+        return f'''INSERT INTO kayit_arama (rowid, aciklama, kategori)
+                   VALUES ({row}.id * 2 + {tur_bit}, {_tr_fold(f"{row}.aciklama")}, {_tr_fold(f"{row}.kategori")});'''
+
+    def sil(row: str) -> str:
+        return f'''INSERT INTO kayit_arama (kayit_arama, rowid, aciklama, kategori)
+                   VALUES ('delete', {row}.id * 2 + {tur_bit}, {_tr_fold(f"{row}.aciklama")}, {_tr_fold(f"{row}.kategori")});'''
+
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_arama_ekle AFTER INSERT ON {table} BEGIN {ekle('NEW')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_arama_sil AFTER DELETE ON {table} BEGIN {sil('OLD')} END",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_arama_guncelle AFTER UPDATE OF aciklama, kategori ON {table}
+            BEGIN {sil('OLD')} {ekle('NEW')} END""",
+        f"""INSERT INTO kayit_arama (rowid, aciklama, kategori)
+            SELECT id * 2 + {tur_bit}, {_tr_fold("aciklama")}, {_tr_fold("kategori")} FROM {table}""",
+    ]
+
+
+MIGRATIONS: List[Tuple[int, List[Step]]] = [
+    (1, [
+        # kategori filtresi + tarih sıralaması (gelirleri_listele / giderleri_listele)
+        "CREATE INDEX IF NOT EXISTS idx_gelirler_kategori_tarih ON gelirler (kategori, tarih)",
+        "CREATE INDEX IF NOT EXISTS idx_giderler_kategori_tarih ON giderler (kategori, tarih)",
+        # tarih aralığı filtreleri ve filtresiz tarih sıralaması
+        "CREATE INDEX IF NOT EXISTS idx_gelirler_tarih ON gelirler (tarih)",
+        "CREATE INDEX IF NOT EXISTS idx_giderler_tarih ON giderler (tarih)",
+    ]),
+    (2, [
+        # Defter sürümü: her yazmada artan sayaç (tool sonuç önbelleğinin anahtarı)
+        "CREATE TABLE IF NOT EXISTS defter_surumu (id INTEGER PRIMARY KEY CHECK (id = 1), surum INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO defter_surumu (id, surum) VALUES (1, 0)",
+    ] + [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_surum_{ad} AFTER {olay} ON {table}
+            BEGIN UPDATE defter_surumu SET surum = surum + 1 WHERE id = 1; END"""
+        for table in ("gelirler", "giderler")
+        for olay, ad in (("INSERT", "ekle"), ("DELETE", "sil"), ("UPDATE", "guncelle"))
+    ]),
+    (3, [
+        # Tutarlar tam sayı kuruş olarak saklanır (toplamlar kayan nokta hatası biriktirmez)
+        _miktari_kurusa_cevir,
+    ]),
+    (4, [
+        # Açıklama ve kategori üzerinde tam metin arama (aksanlar ve büyük/küçük harf katlanır)
+        """CREATE VIRTUAL TABLE IF NOT EXISTS kayit_arama USING fts5(
+               aciklama, kategori, content='', tokenize='unicode61 remove_diacritics 2')""",
+    ] + _arama_tetikleyicileri("gelirler", 0) + _arama_tetikleyicileri("giderler", 1)),
+    (5, [
+        # Masaüstü tablosunda açıklama ve miktar sütunlarına göre sıralama (keyset pencereleri)
+        "CREATE INDEX IF NOT EXISTS idx_gelirler_aciklama ON gelirler (aciklama)",
+        "CREATE INDEX IF NOT EXISTS idx_giderler_aciklama ON giderler (aciklama)",
+        "CREATE INDEX IF NOT EXISTS idx_gelirler_miktar ON gelirler (miktar_kurus)",
+        "CREATE INDEX IF NOT EXISTS idx_giderler_miktar ON giderler (miktar_kurus)",
+    ]),
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Bekleyen geçişleri sırayla uygula ve yeni şema sürümünü döndür.
+
+    gelirler ve giderler tablolarının önceden oluşturulmuş olması gerekir.
+    Her geçiş kendi işlemi (transaction) içinde uygulanır.
+    """
+    current = schema_version(conn)
+    for version, statements in MIGRATIONS:
+        if version <= current:
+            continue
+        with conn:
+            # DDL ifadeleri sqlite3 modülünde örtük işlem başlatmaz
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for step in statements:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {version}")
+        current = version
+    return current
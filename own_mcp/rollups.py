@@ -0,0 +1,197 @@
+"""Gelir/gider tabloları için önceden toplanmış özet (rollup) tabloları.
+
+gunluk_ozet: (tur, gun, kategori) başına toplam (kuruş) ve kayıt sayısı
+kategori_ozet: (tur, kategori) başına tüm zamanların toplamı (kuruş) ve kayıt sayısı
+
+Özetler gelirler/giderler tablolarındaki tetikleyicilerle aynı işlem (transaction)
+içinde güncellenir; böylece kaydı kim eklerse eklesin (MCP server, masaüstü uygulama)
+özetler tutarlı kalır. Raporlar ham tabloları taramak yerine bu tablolardan okunur.
+
+Kullanım:
+    python own_mcp/rollups.py <db_yolu> --check
+    python own_mcp/rollups.py <db_yolu> --rebuild
+"""
+import argparse
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+from amounts import from_kurus
+from db import date_range_filter
+
+# Ham tablo -> özet tablolarındaki "tur" değeri
+LEDGER_TABLES = {"gelirler": "gelir", "giderler": "gider"}
+
+
+def _trigger_sql(table: str, tur: str) -> List[str]:
+    def add(row: str, sign: str) -> str:
+        return f'''
+            INSERT INTO gunluk_ozet (tur, gun, kategori, toplam_kurus, adet)
+            VALUES ('{tur}', substr({row}.tarih, 1, 10), {row}.kategori, {sign}{row}.miktar_kurus, {sign}1)
+            ON CONFLICT(tur, gun, kategori) DO UPDATE SET
+                toplam_kurus = toplam_kurus + excluded.toplam_kurus,
+                adet = adet + excluded.adet;
+            INSERT INTO kategori_ozet (tur, kategori, toplam_kurus, adet)
+            VALUES ('{tur}', {row}.kategori, {sign}{row}.miktar_kurus, {sign}1)
+            ON CONFLICT(tur, kategori) DO UPDATE SET
+                toplam_kurus = toplam_kurus + excluded.toplam_kurus,
+                adet = adet + excluded.adet;'''
+
+    return [
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_ozet_ekle AFTER INSERT ON {table}
+            BEGIN {add("NEW", "")} END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_ozet_sil AFTER DELETE ON {table}
+            BEGIN {add("OLD", "-")} END''',
+        f'''CREATE TRIGGER IF NOT EXISTS {table}_ozet_guncelle
+            AFTER UPDATE OF miktar_kurus, kategori, tarih ON {table}
+            BEGIN {add("OLD", "-")} {add("NEW", "")} END''',
+    ]
+
+
+def ensure_rollups(conn: sqlite3.Connection):
+    """Özet tablolarını ve tetikleyicileri oluştur; yeni oluşturulduysa ham veriden doldur"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'gunluk_ozet'"
+    ).fetchone()
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS gunluk_ozet
+                    (tur TEXT NOT NULL,
+                     gun TEXT NOT NULL,
+                     kategori TEXT NOT NULL,
+                     toplam_kurus INTEGER NOT NULL DEFAULT 0,
+                     adet INTEGER NOT NULL DEFAULT 0,
+                     PRIMARY KEY (tur, gun, kategori)) WITHOUT ROWID''')
+    conn.execute('''CREATE TABLE IF NOT EXISTS kategori_ozet
+                    (tur TEXT NOT NULL,
+                     kategori TEXT NOT NULL,
+                     toplam_kurus INTEGER NOT NULL DEFAULT 0,
+                     adet INTEGER NOT NULL DEFAULT 0,
+                     PRIMARY KEY (tur, kategori)) WITHOUT ROWID''')
+    for table, tur in LEDGER_TABLES.items():
+        for sql in _trigger_sql(table, tur):
+            conn.execute(sql)
+
+    if not exists:
+        rebuild_rollups(conn)
+
+
+def rebuild_rollups(conn: sqlite3.Connection):
+    """Özet tablolarını ham gelirler/giderler tablolarından yeniden hesapla"""
+    conn.execute("DELETE FROM gunluk_ozet")
+    conn.execute("DELETE FROM kategori_ozet")
+    for table, tur in LEDGER_TABLES.items():
+        conn.execute(f'''INSERT INTO gunluk_ozet (tur, gun, kategori, toplam_kurus, adet)
+                         SELECT ?, substr(tarih, 1, 10), kategori, SUM(miktar_kurus), COUNT(*)
+                         FROM {table}
+                         GROUP BY substr(tarih, 1, 10), kategori''', (tur,))
+        conn.execute(f'''INSERT INTO kategori_ozet (tur, kategori, toplam_kurus, adet)
+                         SELECT ?, kategori, SUM(miktar_kurus), COUNT(*)
+                         FROM {table}
+                         GROUP BY kategori''', (tur,))
+
+
+def _farklari_ekle(farklar: List[Dict], ozet: str, tur: str, alanlar: Tuple[str, ...],
+                   beklenen: Dict[tuple, tuple], mevcut: Dict[tuple, tuple]):
+    """Anahtar başına (toplam_kurus, adet) değerlerini karşılaştır, farklı olanları farklar'a ekle"""
+    for key in beklenen.keys() | mevcut.keys():
+        b_toplam, b_adet = beklenen.get(key, (0, 0))
+        m_toplam, m_adet = mevcut.get(key, (0, 0))
+        # Kuruş toplamları tam sayıdır; tolerans gerekmez
+        if b_adet != m_adet or b_toplam != m_toplam:
+            farklar.append({
+                "ozet": ozet,
+                "tur": tur,
+                **dict(zip(alanlar, key)),
+                "beklenen": from_kurus(b_toplam),
+                "mevcut": from_kurus(m_toplam),
+                "beklenen_adet": b_adet,
+                "mevcut_adet": m_adet,
+            })
+
+
+def check_rollups(conn: sqlite3.Connection) -> List[Dict]:
+    """Her iki özet tablosunu da ham tablolarla karşılaştır ve tutarsız satırları döndür"""
+    farklar = []
+    for table, tur in LEDGER_TABLES.items():
+        beklenen = {
+            (row[0], row[1]): (row[2], row[3])
+            for row in conn.execute(f'''SELECT substr(tarih, 1, 10), kategori, SUM(miktar_kurus), COUNT(*)
+                                        FROM {table}
+                                        GROUP BY substr(tarih, 1, 10), kategori''')
+        }
+        mevcut = {
+            (row[0], row[1]): (row[2], row[3])
+            for row in conn.execute('''SELECT gun, kategori, toplam_kurus, adet
+                                       FROM gunluk_ozet WHERE tur = ? AND adet != 0''', (tur,))
+        }
+        _farklari_ekle(farklar, "gunluk_ozet", tur, ("gun", "kategori"), beklenen, mevcut)
+
+        beklenen = {
+            (row[0],): (row[1], row[2])
+            for row in conn.execute(f'''SELECT kategori, SUM(miktar_kurus), COUNT(*)
+                                        FROM {table}
+                                        GROUP BY kategori''')
+        }
+        mevcut = {
+            (row[0],): (row[1], row[2])
+            for row in conn.execute('''SELECT kategori, toplam_kurus, adet
+                                       FROM kategori_ozet WHERE tur = ? AND adet != 0''', (tur,))
+        }
+        _farklari_ekle(farklar, "kategori_ozet", tur, ("kategori",), beklenen, mevcut)
+    return farklar
+
+
+def report_from_rollups(conn: sqlite3.Connection,
+                        baslangic_tarih: Optional[str] = None,
+                        bitis_tarih: Optional[str] = None) -> Dict:
+    """Toplam ve kategori bazlı tutarları (kuruş) özet tablolarından hesapla.
+
+    Toplamlar tam sayı olarak toplanır; TL'ye çevirme çağıranın işidir (ledger.report).
+    Tarih verilmezse kategori_ozet (kategori sayısı kadar satır), verilirse
+    gunluk_ozet (gün x kategori sayısı kadar satır) okunur.
+    """
+    if baslangic_tarih or bitis_tarih:
+        # tur IN (...) sayesinde (tur, gun) birincil anahtar öneki aralık taramasında kullanılır
+        conditions, params = date_range_filter("gun", baslangic_tarih, bitis_tarih)
+        conditions.insert(0, "tur IN ('gelir', 'gider')")
+        rows = conn.execute(f'''SELECT tur, kategori, SUM(toplam_kurus)
+                                FROM gunluk_ozet
+                                WHERE {" AND ".join(conditions)}
+                                GROUP BY tur, kategori
+                                HAVING SUM(adet) > 0''', params)
+    else:
+        rows = conn.execute('SELECT tur, kategori, toplam_kurus FROM kategori_ozet WHERE adet > 0')
+
+    kategoriler = {"gelir": {}, "gider": {}}
+    for tur, kategori, toplam in rows:
+        kategoriler[tur][kategori] = toplam
+
+    return {
+        "toplam_gelir": sum(kategoriler["gelir"].values()),
+        "toplam_gider": sum(kategoriler["gider"].values()),
+        "gelir_kategorileri": kategoriler["gelir"],
+        "gider_kategorileri": kategoriler["gider"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Özet tablolarını kontrol et veya yeniden oluştur")
+    parser.add_argument("db_path")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--check", action="store_true", help="Tutarsızlıkları listele")
+    group.add_argument("--rebuild", action="store_true", help="Özetleri ham tablolardan yeniden oluştur")
+    args = parser.parse_args()
+
+    # Eski bir veritabanında özetlerden önce şema geçişleri (ör. kuruş sütunu) uygulanmalı
+    from ledger import open_ledger
+
+    conn = open_ledger(args.db_path)
+    with conn:
+        if args.rebuild:
+            rebuild_rollups(conn)
+            print("Özet tabloları yeniden oluşturuldu")
+        else:
+            farklar = check_rollups(conn)
+            for fark in farklar:
+                print(fark)
+            print(f"{len(farklar)} tutarsızlık bulundu")
+    conn.close()
@@ -0,0 +1,158 @@
+"""Gelir/gider açıklamalarında FTS5 tam metin arama.
+
+kayit_arama dizini (migrations.py, geçiş 4) gelirler ve giderler tablolarındaki
+tetikleyicilerle güncel tutulur. Türkçe için ı/I/İ harfleri i'ye indirilir, diğer
+aksanlar (ç, ğ, ö, ş, ü) tokenizer tarafından silinir; böylece "odeme" araması
+"Ödeme" kaydını bulur. Her kelime önek olarak aranır ("market" -> "marketten").
+
+Sonuçlar bm25 puanına göre sıralanır. bm25 tüm eşleşmeler için hesaplandığından
+çok yaygın kelimelerde (RANK_LIMIT'ten fazla eşleşme) sorgu yüzlerce ms sürer; bu
+durumda sonuçlar tarihe göre, en yeni kayıt önce döner (yanıtta "siralama"). En
+yeni kayıtlar tarih indeksinden okunur ve eşleşme kümesiyle süzülür; eşleşme
+yoğun olduğundan tarama kısa sürer.
+
+Kullanım:
+    python own_mcp/search.py <db_yolu> "market alışveriş" [--tur gider]
+    python own_mcp/search.py <db_yolu> --rebuild
+"""
+import argparse
+import base64
+import json
+import re
+import sqlite3
+from typing import Dict, Optional
+
+from amounts import from_kurus
+from ledger import TABLES
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 200
+
+# bm25 sütun ağırlıkları: açıklama, kategori
+BM25_WEIGHTS = (2.0, 1.0)
+
+# Bundan fazla eşleşmede alaka sıralaması yerine en yeni kayıtlar önce döner
+RANK_LIMIT = 1000
+
+# rowid'deki tür biti (migrations._arama_tetikleyicileri ile aynı)
+_TUR_BIT = {"gelir": 0, "gider": 1}
+_WORD = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Sorguyu dizindeki metinle aynı biçime getir (ı/I/İ -> i)"""
+    return text.replace("ı", "i").replace("I", "i").replace("İ", "i")
+
+
+def fts_query(sorgu: str) -> str:
+    """Serbest metni güvenli bir FTS5 sorgusuna çevir: her kelime tırnaklı önek, hepsi VE ile"""
+    words = _WORD.findall(fold(sorgu))
+    if not words:
+        raise ValueError("Arama metni en az bir kelime içermeli")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _encode_cursor(siralama: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{siralama}|{offset}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    siralama, offset = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+    return siralama, int(offset)
+
+
+def search(conn: sqlite3.Connection, sorgu: str, tur: Optional[str] = None,
+           limit: int = DEFAULT_SEARCH_LIMIT, after: Optional[str] = None) -> Dict:
+    """Açıklama/kategoride sorguyla eşleşen kayıtları en alakalıdan başlayarak döndür.
+
+    Returns:
+        {"kayitlar": [...], "sonraki": sonraki sayfanın imleci veya None,
+         "siralama": "alaka" veya "en_yeni"}
+    """
+    if tur is not None and tur not in TABLES:
+        raise ValueError("Geçersiz tür, 'gelir' veya 'gider' olmalı")
+    limit = max(1, min(int(limit or DEFAULT_SEARCH_LIMIT), MAX_SEARCH_LIMIT))
+
+    where, params = "kayit_arama MATCH ?", [fts_query(sorgu)]
+    if tur is not None:
+        where += " AND (rowid & 1) = ?"
+        params.append(_TUR_BIT[tur])
+
+    # Sıralama ilk sayfada seçilir ve imleçle taşınır; böylece sayfalar arasında değişmez
+    if after:
+        siralama, offset = _decode_cursor(after)
+    else:
+        offset = 0
+        eslesen = conn.execute(f"SELECT COUNT(*) FROM (SELECT rowid FROM kayit_arama WHERE {where} LIMIT ?)",
+                               params + [RANK_LIMIT + 1]).fetchone()[0]
+        siralama = "alaka" if eslesen <= RANK_LIMIT else "en_yeni"
+    # Sayfalama OFFSET ile yapılır: alaka sıralamasında zaten tüm eşleşmeler puanlanır
+    if siralama == "alaka":
+        rows = conn.execute(f'''SELECT rowid FROM kayit_arama WHERE {where}
+                                ORDER BY bm25(kayit_arama, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}), rowid
+                                LIMIT ? OFFSET ?''', params + [limit + 1, offset]).fetchall()
+    else:
+        # Her tablodan en yeni offset + limit + 1 eşleşme, sonra ikisi birlikte tarihe göre
+        depth = offset + limit + 1
+        parts = [f'''SELECT * FROM (SELECT id * 2 + {bit} AS kayit, tarih FROM {TABLES[tur_adi]}
+                                   WHERE id * 2 + {bit} IN eslesen
+                                   ORDER BY tarih DESC, id DESC LIMIT {depth})'''
+                 for tur_adi, bit in _TUR_BIT.items() if tur in (None, tur_adi)]
+        rows = conn.execute(f'''WITH eslesen AS MATERIALIZED (SELECT rowid FROM kayit_arama WHERE {where})
+                                {" UNION ALL ".join(parts)}
+                                ORDER BY tarih DESC, kayit DESC LIMIT ? OFFSET ?''',
+                            params + [limit + 1, offset]).fetchall()
+    has_more = len(rows) > limit
+    rowids = [row[0] for row in rows[:limit]]
+
+    # Eşleşen kayıtların kendisi id ile (birincil anahtar) okunur
+    kayitlar: Dict[int, Dict] = {}
+    for tur_adi, bit in _TUR_BIT.items():
+        ids = [rowid >> 1 for rowid in rowids if rowid & 1 == bit]
+        if not ids:
+            continue
+        placeholders = ", ".join("?" * len(ids))
+        for row_id, aciklama, kurus, kategori, tarih in conn.execute(
+                f'''SELECT id, aciklama, miktar_kurus, kategori, tarih FROM {TABLES[tur_adi]}
+                    WHERE id IN ({placeholders})''', ids):
+            kayitlar[row_id * 2 + bit] = {"tur": tur_adi, "id": row_id, "aciklama": aciklama,
+                                          "miktar": from_kurus(kurus), "kategori": kategori, "tarih": tarih}
+
+    return {
+        "kayitlar": [kayitlar[rowid] for rowid in rowids if rowid in kayitlar],
+        "sonraki": _encode_cursor(siralama, offset + limit) if has_more else None,
+        "siralama": siralama,
+    }
+
+
+def rebuild_index(conn: sqlite3.Connection):
+    """Arama dizinini ham tablolardan yeniden oluştur (dizin bozulursa veya elle düzenleme sonrası)"""
+    conn.execute("INSERT INTO kayit_arama (kayit_arama) VALUES ('delete-all')")
+    for tur, table in TABLES.items():
+        rows = conn.execute(f"SELECT id, aciklama, kategori FROM {table}")
+        conn.executemany("INSERT INTO kayit_arama (rowid, aciklama, kategori) VALUES (?, ?, ?)",
+                         ((row_id * 2 + _TUR_BIT[tur], fold(aciklama), fold(kategori))
+                          for row_id, aciklama, kategori in rows))
+
+
+if __name__ == "__main__":
+    from ledger import open_ledger
+
+    parser = argparse.ArgumentParser(description="Gelir/gider kayıtlarında tam metin arama")
+    parser.add_argument("db_path")
+    parser.add_argument("sorgu", nargs="?")
+    parser.add_argument("--tur", choices=sorted(TABLES))
+    parser.add_argument("--limit", type=int, default=DEFAULT_SEARCH_LIMIT)
+    parser.add_argument("--rebuild", action="store_true", help="Arama dizinini ham tablolardan yeniden oluştur")
+    args = parser.parse_args()
+
+    conn = open_ledger(args.db_path)
+    if args.rebuild:
+        with conn:
+            rebuild_index(conn)
+        print("Arama dizini yeniden oluşturuldu")
+    elif args.sorgu:
+        print(json.dumps(search(conn, args.sorgu, args.tur, args.limit), ensure_ascii=False, indent=2))
+    else:
+        parser.error("sorgu veya --rebuild gerekli")
+    conn.close()
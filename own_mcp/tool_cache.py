@@ -0,0 +1,73 @@
+"""Okuma tool'ları (rapor_getir, listeleme) için defter sürümüne bağlı sonuç önbelleği.
+
+Agent aynı ReAct döngüsü içinde aynı tool'u aynı argümanlarla sık sık tekrar
+çağırır. Sonuçlar (tool adı, argümanlar) anahtarıyla saklanır ve yalnızca
+defter_surumu tablosundaki sayaç değişmediyse geri verilir. Sayaç gelirler ve
+giderler üzerindeki tetikleyicilerle her ekleme/güncelleme/silmede artar; yani
+yazmayı hangi süreç yaparsa yapsın (masaüstü uygulama dahil) önbellek geçersiz olur.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+# Önbellekte tutulacak en fazla sonuç (listeleme sonuçları en fazla 500 satırdır)
+TOOL_CACHE_SIZE = 128
+
+
+def ledger_version(conn) -> int:
+    """Defterin güncel sürüm sayacı"""
+    return conn.execute("SELECT surum FROM defter_surumu WHERE id = 1").fetchone()[0]
+
+
+def _freeze(value) -> Hashable:
+    """Liste/sözlük argümanlarını anahtar olarak kullanılabilir hale getir"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class ToolCache:
+    def __init__(self, max_entries: int = TOOL_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, object]" = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, tool: str, field: str):
+        stats = self._stats.setdefault(tool, {"hit": 0, "miss": 0})
+        stats[field] += 1
+
+    def get_or_compute(self, conn, tool: str, args: tuple, compute: Callable[[], object]):
+        """Sonuç önbellekte ve defter değişmemişse onu, değilse compute() sonucunu döndür"""
+        version = ledger_version(conn)
+        key = (tool, _freeze(args))
+        with self._lock:
+            if version != self._version:
+                # Defter değişti: eski sürümün tüm sonuçları geçersiz
+                self._entries.clear()
+                self._version = version
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                self._count(tool, "hit")
+                return self._entries[key]
+            self._count(tool, "miss")
+
+        result = compute()
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "surum": self._version,
+                "kayit": len(self._entries),
+                "en_fazla": self.max_entries,
+                "tool": {tool: dict(s) for tool, s in self._stats.items()},
+            }
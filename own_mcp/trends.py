@@ -0,0 +1,155 @@
+"""Gün/hafta/ay/yıl dilimlerine bölünmüş gelir-gider zaman serileri.
+
+Seriler ham tablolar yerine gunluk_ozet özet tablosundan SQL ile gruplanarak
+hesaplanır; yani maliyet kayıt sayısına değil gün x kategori sayısına bağlıdır.
+Yanıt sütun (columnar) biçimindedir: her alan dönem sayısı uzunluğunda bir
+listedir. Boş dönemler 0 ile doldurulur, böylece listeler aynı hizadadır.
+
+Denemek için:
+    python own_mcp/trends.py <db_yolu> [ay|hafta|gun|yil] [baslangic] [bitis]
+"""
+import json
+import sqlite3
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from amounts import from_kurus
+from db import date_range_filter
+
+# Dönem -> gunluk_ozet.gun (YYYY-MM-DD) üzerinden dönem etiketi
+PERIODS = {
+    "gun": "gun",
+    # Haftalar pazartesi tarihiyle etiketlenir
+    "hafta": "date(gun, 'weekday 0', '-6 days')",
+    "ay": "substr(gun, 1, 7)",
+    "yil": "substr(gun, 1, 4)",
+}
+_ALIASES = {"gün": "gun", "günlük": "gun", "haftalık": "hafta", "aylık": "ay", "yıl": "yil", "yıllık": "yil"}
+
+# LLM bağlamını şişirmemek için tek yanıttaki en fazla dönem sayısı
+MAX_TREND_BUCKETS = 400
+
+
+def _labels(periyot: str, start: date, end: date) -> List[str]:
+    """start-end aralığını kapsayan tüm dönem etiketleri (boş dönemler dahil)"""
+    labels = []
+    if periyot == "gun":
+        gun = start
+        while gun <= end and len(labels) <= MAX_TREND_BUCKETS:
+            labels.append(gun.isoformat())
+            gun += timedelta(days=1)
+    elif periyot == "hafta":
+        gun = start - timedelta(days=start.weekday())
+        while gun <= end and len(labels) <= MAX_TREND_BUCKETS:
+            labels.append(gun.isoformat())
+            gun += timedelta(days=7)
+    elif periyot == "ay":
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month) and len(labels) <= MAX_TREND_BUCKETS:
+            labels.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    else:
+        labels = [f"{year:04d}" for year in range(start.year, min(end.year, start.year + MAX_TREND_BUCKETS) + 1)]
+    return labels
+
+
+def _deltas(values: List[int]) -> List[Optional[float]]:
+    """Bir önceki döneme göre fark (ilk dönem için None)"""
+    return [None] + [from_kurus(cur - prev) for prev, cur in zip(values, values[1:])]
+
+
+def trend_report(conn: sqlite3.Connection, periyot: str = "ay",
+                 baslangic_tarih: Optional[str] = None, bitis_tarih: Optional[str] = None,
+                 kategori: Optional[str] = None, kategori_bazinda: bool = False) -> Dict:
+    """Dönem bazında gelir, gider, net, kümülatif bakiye ve dönemden döneme değişim.
+
+    Tutarlar TL'dir; hesaplar kuruş cinsinden yapılır. bakiye, başlangıç tarihinden
+    önceki tüm kayıtların netini (acilis_bakiyesi) de içerir.
+    """
+    periyot = _ALIASES.get(periyot, periyot)
+    if periyot not in PERIODS:
+        raise ValueError(f"Geçersiz periyot: {periyot}. Geçerli değerler: {', '.join(PERIODS)}")
+
+    conditions, params = date_range_filter("gun", baslangic_tarih, bitis_tarih)
+    conditions.insert(0, "tur IN ('gelir', 'gider')")
+    if kategori:
+        conditions.append("kategori = ?")
+        params.append(kategori)
+    where = " AND ".join(conditions)
+
+    if baslangic_tarih and bitis_tarih:
+        start, end = date.fromisoformat(baslangic_tarih[:10]), date.fromisoformat(bitis_tarih[:10])
+    else:
+        ilk, son = conn.execute(f"SELECT MIN(gun), MAX(gun) FROM gunluk_ozet WHERE {where} AND adet != 0",
+                                params).fetchone()
+        if ilk is None:
+            ilk = son = date.today().isoformat()
+        start = date.fromisoformat(baslangic_tarih[:10] if baslangic_tarih else ilk)
+        end = date.fromisoformat(bitis_tarih[:10] if bitis_tarih else son)
+    if start > end:
+        raise ValueError("Başlangıç tarihi bitiş tarihinden sonra olamaz")
+
+    labels = _labels(periyot, start, end)
+    if len(labels) > MAX_TREND_BUCKETS:
+        raise ValueError(f"Aralık {MAX_TREND_BUCKETS} dönemden uzun, daha geniş bir periyot veya daha kısa bir aralık seçin")
+    index = {label: i for i, label in enumerate(labels)}
+
+    toplam = {"gelir": [0] * len(labels), "gider": [0] * len(labels)}
+    kategoriler: Dict[str, Dict[str, List[int]]] = {"gelir": {}, "gider": {}}
+    rows = conn.execute(f'''SELECT {PERIODS[periyot]} AS donem, tur, kategori, SUM(toplam_kurus)
+                            FROM gunluk_ozet
+                            WHERE {where}
+                            GROUP BY donem, tur, kategori''', params)
+    for donem, tur, kat, kurus in rows:
+        i = index.get(donem)
+        if i is None:
+            continue
+        toplam[tur][i] += kurus
+        if kategori_bazinda:
+            kategoriler[tur].setdefault(kat, [0] * len(labels))[i] += kurus
+
+    acilis = 0
+    if baslangic_tarih:
+        onceki_kosullar = ["tur IN ('gelir', 'gider')", "gun < ?"]
+        onceki_params = [baslangic_tarih[:10]]
+        if kategori:
+            onceki_kosullar.append("kategori = ?")
+            onceki_params.append(kategori)
+        for tur, kurus in conn.execute(f'''SELECT tur, SUM(toplam_kurus) FROM gunluk_ozet
+                                           WHERE {" AND ".join(onceki_kosullar)}
+                                           GROUP BY tur''', onceki_params):
+            acilis += kurus if tur == "gelir" else -kurus
+
+    net = [g - c for g, c in zip(toplam["gelir"], toplam["gider"])]
+    bakiye, kumulatif = [], acilis
+    for n in net:
+        kumulatif += n
+        bakiye.append(from_kurus(kumulatif))
+
+    sonuc = {
+        "periyot": periyot,
+        "donem": labels,
+        "gelir": [from_kurus(v) for v in toplam["gelir"]],
+        "gider": [from_kurus(v) for v in toplam["gider"]],
+        "net": [from_kurus(v) for v in net],
+        "bakiye": bakiye,
+        "gelir_degisim": _deltas(toplam["gelir"]),
+        "gider_degisim": _deltas(toplam["gider"]),
+        "net_degisim": _deltas(net),
+        "acilis_bakiyesi": from_kurus(acilis),
+    }
+    if kategori_bazinda:
+        sonuc["kategoriler"] = {tur: {kat: [from_kurus(v) for v in seri] for kat, seri in seriler.items()}
+                                for tur, seriler in kategoriler.items()}
+    return sonuc
+
+
+if __name__ == "__main__":
+    from ledger import open_ledger
+
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    conn = open_ledger(sys.argv[1])
+    print(json.dumps(trend_report(conn, *sys.argv[2:5]), ensure_ascii=False))
+    conn.close()
@@ -0,0 +1,249 @@
+"""Basit muhasebe komutları için LLM'siz, kurallı niyet (intent) çözümleyici.
+
+"500 TL gider ekle market", "geçen ayın raporunu getir", "giderleri listele"
+gibi kalıplara tam uyan kısa mesajlar doğrudan MCP tool çağrısına çevrilir.
+Çözümleyici emin olmadığı her durumda (birden fazla tutar, bilinmeyen kelimeler,
+soru ya da birleşik istek) None döndürür ve mesaj agent'a gider.
+
+Denemek için (argümansız çalıştırılırsa örnek mesajlarla öz denetim yapar):
+    python intents.py "500 TL gider ekle market" "mart ayı raporu"
+    python intents.py
+"""
+import re
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Mesaj bundan uzunsa basit komut sayılmaz
+MAX_WORDS = 12
+
+AYLAR = ["ocak", "şubat", "mart", "nisan", "mayıs", "haziran", "temmuz", "ağustos",
+         "eylül", "ekim", "kasım", "aralık"]
+
+_TR_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_ISO_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_TR_DATE = re.compile(r"\b(\d{1,2})[./](\d{1,2})[./](\d{4})\b")
+_AMOUNT = re.compile(r"(?<![\w.,])(\d{1,3}(?:\.\d{3})+|\d+)(?:[,.](\d{1,2}))?(?![\w.,])\s*(tl|lira|₺)?")
+_SON_GUN = re.compile(r"\bson (\d{1,3}) gün\w*")
+_AY_YIL = re.compile(r"\b(" + "|".join(AYLAR) + r")\w*(?: (\d{4}))?")
+# "kategori Market" veya "market kategorisindeki" (önce ilki denenir)
+_KATEGORI = [re.compile(r"\bkategori(?:si|sine|sinde|ye)? (\w+)"), re.compile(r"\b(\w+) kategori\w*")]
+_WORD = re.compile(r"\w+")
+
+# Tür kelimeleri (ekli halleriyle)
+_TUR = {"gelir": re.compile(r"^geli?r\w*$"), "gider": re.compile(r"^gide?r\w*$")}
+EKLE_FIILLERI = {"ekle", "ekler", "kaydet", "gir", "işle", "yaz"}
+LISTELE_FIILLERI = {"listele", "göster", "getir", "sırala"}
+RAPOR_KELIMELERI = {"rapor", "raporu", "raporunu", "raporum", "raporumu", "özet", "özeti", "özetini"}
+# Anlamı değiştirmeyen dolgu kelimeleri
+DOLGU = {"bana", "lütfen", "bir", "yeni", "olarak", "için", "tüm", "bütün", "hepsini", "finansal",
+         "genel", "durum", "durumu", "ver", "göster", "getir", "misin", "mısın", "ayın", "yılın",
+         "haftanın", "ayı", "yılı", "dönemin", "tarihli", "arası", "arasındaki", "ile", "kadar",
+         "den", "dan", "ten", "tan", "itibaren", "tl", "lira"}
+# Bu kelimeler varsa istek basit değildir (soru, karşılaştırma, birleşik istek)
+BELIRSIZ = {"neden", "niye", "nasıl", "karşılaştır", "analiz", "yorumla", "tahmin", "ve", "sonra",
+            "mail", "gönder", "ara", "değil", "sil", "güncelle", "değiştir"}
+
+
+def _lower(text: str) -> str:
+    return text.translate(_TR_LOWER).lower().strip()
+
+
+def _month_range(year: int, month: int) -> Tuple[date, date]:
+    start = date(year, month, 1)
+    end = (date(year + (month == 12), month % 12 + 1, 1)) - timedelta(days=1)
+    return start, end
+
+
+def parse_amount(text: str) -> List[float]:
+    """Metindeki tutarları döndür ("1.250,50 TL" -> 1250.5)"""
+    amounts = []
+    for whole, frac, _ in _AMOUNT.findall(text):
+        value = float(whole.replace(".", "")) + (float(f"0.{frac}") if frac else 0)
+        amounts.append(value)
+    return amounts
+
+
+def parse_date_range(text: str, today: Optional[date] = None) -> Tuple[Optional[Tuple[date, date]], str]:
+    """Türkçe tarih ifadesini (başlangıç, bitiş) aralığına çevir; eşleşen kısmı metinden çıkar.
+
+    Tarih ifadesi yoksa veya geçersizse ("2024-02-30", "son 0 gün") (None, metin) döner;
+    metin değişmediği için çağıran mesajı agent'a bırakır.
+    """
+    today = today or date.today()
+    try:
+        dates = [date(int(y), int(m), int(d)) for y, m, d in _ISO_DATE.findall(text)]
+        dates += [date(int(y), int(m), int(d)) for d, m, y in _TR_DATE.findall(text)]
+    except ValueError:
+        return None, text
+    if dates:
+        text = _TR_DATE.sub(" ", _ISO_DATE.sub(" ", text))
+        return (min(dates), max(dates)), text
+
+    match = _SON_GUN.search(text)
+    if match:
+        days = int(match.group(1))
+        if days < 1:
+            return None, text
+        return (today - timedelta(days=days - 1), today), text.replace(match.group(0), " ")
+
+    relative = {
+        "bugün": (today, today),
+        "dün": (today - timedelta(days=1), today - timedelta(days=1)),
+        "bu hafta": (today - timedelta(days=today.weekday()), today),
+        "geçen hafta": (today - timedelta(days=today.weekday() + 7), today - timedelta(days=today.weekday() + 1)),
+        "bu ay": (today.replace(day=1), today),
+        "geçen ay": _month_range(today.year - (today.month == 1), (today.month - 2) % 12 + 1),
+        "bu yıl": (today.replace(month=1, day=1), today),
+        "bu sene": (today.replace(month=1, day=1), today),
+        "geçen yıl": (date(today.year - 1, 1, 1), date(today.year - 1, 12, 31)),
+        "geçen sene": (date(today.year - 1, 1, 1), date(today.year - 1, 12, 31)),
+    }
+    for phrase, rng in relative.items():
+        match = re.search(rf"\b{phrase}\w*", text)
+        if match:
+            return rng, text.replace(match.group(0), " ")
+
+    match = _AY_YIL.search(text)
+    if match:
+        year = int(match.group(2)) if match.group(2) else today.year
+        return _month_range(year, AYLAR.index(match.group(1)) + 1), text.replace(match.group(0), " ")
+    return None, text
+
+
+def _tur(words: List[str]) -> Optional[str]:
+    turler = {tur for word in words for tur, pattern in _TUR.items() if pattern.match(word)}
+    return turler.pop() if len(turler) == 1 else None
+
+
+def parse_intent(message: str, today: Optional[date] = None) -> Optional[Dict]:
+    """Mesajı {"tool": ..., "args": {...}} çağrısına çevir; emin değilse None döndür"""
+    text = _lower(message)
+    if "?" in text:
+        return None
+    words = _WORD.findall(text)
+    if not words or len(words) > MAX_WORDS or BELIRSIZ & set(words):
+        return None
+
+    # Rapor: "geçen ayın raporu", "2024-01-01 2024-03-31 raporu getir"
+    if RAPOR_KELIMELERI & set(words):
+        rng, rest = parse_date_range(text, today)
+        kalan = [w for w in _WORD.findall(rest) if w not in RAPOR_KELIMELERI and w not in DOLGU]
+        if kalan:
+            return None
+        args = {}
+        if rng:
+            args = {"baslangic_tarih": rng[0].isoformat(), "bitis_tarih": rng[1].isoformat()}
+        return {"tool": "rapor_getir", "args": args}
+
+    tur = _tur(words)
+    if tur is None:
+        return None
+
+    kategori = None
+    for pattern in _KATEGORI:
+        kategori_match = pattern.search(text)
+        if kategori_match:
+            kategori = kategori_match.group(1).capitalize()
+            text = text.replace(kategori_match.group(0), " ")
+            break
+
+    # Ekleme: "500 TL gider ekle market", "maaş geliri kaydet 25.000 TL"
+    if EKLE_FIILLERI & set(words):
+        # Tarihli kayıt ("dün 300 tl gider ekle") bugünün tarihiyle yazılmamalı: agent'a bırakılır
+        if parse_date_range(text, today)[0] is not None:
+            return None
+        amounts = parse_amount(text)
+        if len(amounts) != 1 or amounts[0] <= 0:
+            return None
+        rest = _AMOUNT.sub(" ", text)
+        aciklama = [w for w in _WORD.findall(rest)
+                    if w not in EKLE_FIILLERI and w not in DOLGU and not _TUR[tur].match(w)]
+        if not aciklama:
+            return None
+        args = {"aciklama": " ".join(aciklama), "miktar": amounts[0]}
+        if kategori:
+            args["kategori"] = kategori
+        return {"tool": f"{tur}_ekle", "args": args}
+
+    # Listeleme: "giderleri listele", "kira kategorisindeki giderleri göster"
+    if LISTELE_FIILLERI & set(words):
+        kalan = [w for w in _WORD.findall(text)
+                 if w not in LISTELE_FIILLERI and w not in DOLGU and not _TUR[tur].match(w)
+                 and w not in ("son", "kayıtları", "kayıtlar")]
+        if kalan or parse_amount(text):
+            return None
+        args = {"kategori": kategori} if kategori else {}
+        return {"tool": f"{tur}leri_listele", "args": args}
+    return None
+
+
+def _tl(value) -> str:
+    text = f"{float(value):,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"{text} TL"
+
+
+def format_result(tool: str, result) -> str:
+    """Tool sonucunu kullanıcıya gösterilecek kısa Türkçe metne çevir"""
+    if not isinstance(result, dict):
+        return str(result)
+    if "error" in result:
+        return f"İşlem yapılamadı: {result['error']}"
+    if tool.endswith("_ekle"):
+        tur = "Gelir" if tool.startswith("gelir") else "Gider"
+        return (f"{tur} eklendi: {result['aciklama']} — {_tl(result['miktar'])} "
+                f"({result['kategori']}, {result['tarih']})")
+    if tool == "rapor_getir":
+        aralik = result.get("tarih_araligi", {})
+        lines = [f"Rapor ({aralik.get('baslangic')} – {aralik.get('bitis')})",
+                 f"Toplam gelir: {_tl(result['toplam_gelir'])}",
+                 f"Toplam gider: {_tl(result['toplam_gider'])}",
+                 f"Net durum: {_tl(result['net_durum'])}"]
+        for baslik, anahtar in (("Gelir kategorileri", "gelir_kategorileri"),
+                                ("Gider kategorileri", "gider_kategorileri")):
+            if result.get(anahtar):
+                lines.append(f"{baslik}: " + ", ".join(f"{k}: {_tl(v)}" for k, v in result[anahtar].items()))
+        return "\n".join(lines)
+    if tool.endswith("_listele"):
+        kayitlar = result.get("kayitlar", [])
+        if not kayitlar:
+            return "Kayıt bulunamadı."
+        lines = [f"{k['tarih'][:10]}  {k['aciklama']}  {_tl(k['miktar'])}  ({k['kategori']})" for k in kayitlar]
+        if result.get("sonraki"):
+            lines.append(f"... ilk {len(kayitlar)} kayıt gösterildi")
+        return "\n".join(lines)
+    return str(result)
+
+
+# Öz denetim: (mesaj, beklenen çağrı); None mesajın agent'a gitmesi gerektiğini belirtir
+_ORNEKLER = [
+    ("500 TL gider ekle market", {"tool": "gider_ekle", "args": {"aciklama": "market", "miktar": 500.0}}),
+    ("maaş geliri kaydet 25.000 TL", {"tool": "gelir_ekle", "args": {"aciklama": "maaş", "miktar": 25000.0}}),
+    ("dün 300 tl gider ekle yemek", None),
+    ("2024-03-01 tarihli 300 tl gider ekle yemek", None),
+    ("mart ayında 300 tl gider ekle yemek", None),
+    ("geçen ayın raporunu getir", {"tool": "rapor_getir",
+                                   "args": {"baslangic_tarih": "2024-04-01", "bitis_tarih": "2024-04-30"}}),
+    ("giderleri listele", {"tool": "giderleri_listele", "args": {}}),
+    ("neden bu kadar gider var?", None),
+    ("2024-02-30 raporu", None),
+    ("31.02.2024 raporu getir", None),
+    ("0000-01-01 raporu", None),
+    ("son 0 gün raporu", None),
+    ("son 7 gün raporu", {"tool": "rapor_getir",
+                          "args": {"baslangic_tarih": "2024-05-09", "bitis_tarih": "2024-05-15"}}),
+]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for mesaj in sys.argv[1:]:
+            print(f"{mesaj!r:<45} {parse_intent(mesaj)}")
+    else:
+        hatali = 0
+        for mesaj, beklenen in _ORNEKLER:
+            sonuc = parse_intent(mesaj, today=date(2024, 5, 15))
+            durum = "OK  " if sonuc == beklenen else "HATA"
+            hatali += sonuc != beklenen
+            print(f"{durum} {mesaj!r:<45} {sonuc}")
+        sys.exit(1 if hatali else 0)
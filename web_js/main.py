@@ -1,22 +1,30 @@
 import asyncio
 from contextlib import asynccontextmanager
 from mcp import ClientSession
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
 from langchain_google_genai import ChatGoogleGenerativeAI
 import os
 import logging
 import traceback
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import uvicorn
 import json
+import time
 from typing import Dict, List, Optional
 import uuid
-from langchain_community.chat_message_histories import ChatMessageHistory
 from dotenv import load_dotenv
+from intents import format_result, parse_intent
+from mcp_servers import MCPServerManager
+from memory import MemoryStore
+from prompts import PROMPT_SECTIONS, SYSTEM_PROMPT
+from router import ToolRouter
+from response_cache import LEDGER_WRITE_TOOLS, ResponseCache, context_digest, is_cacheable
+from session_store import create_store
+from scheduler import QUEUED, REJECTED, RequestScheduler
+from telemetry import telemetry
 
 # .env dosyasını yükle
 load_dotenv()
@@ -49,8 +57,6 @@ except Exception as e:
 
 # Global değişken olarak agent tutulacak
 agent = None
-# Oturum bazlı hafıza saklama
-session_memories = {}
 # Aktif bağlantıları saklamak için
 active_connections: Dict[str, WebSocket] = {}
 
@@ -79,107 +85,145 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
-def get_memory_for_session(session_id: str):
-    """Oturum için hafıza döndür, yoksa oluştur"""
-    if session_id not in session_memories:
-        session_memories[session_id] = ChatMessageHistory(session_id=session_id)
-    return session_memories[session_id]
+async def summarize_turns(summary: str, messages: List[dict]) -> str:
+    """Eski konuşma turlarını önceki özetle birleştirip kısa bir özet üret"""
+    konusma = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    response = await model.ainvoke(
+        "Aşağıdaki sohbet özetini ve yeni mesajları, sonraki yanıtlar için gereken "
+        "bilgileri (isimler, tutarlar, tarihler, kullanıcının tercihleri) koruyarak "
+        "kısa bir Türkçe özet halinde birleştir.\n\n"
+        f"Önceki özet:\n{summary or '(yok)'}\n\nYeni mesajlar:\n{konusma}"
+    )
+    return _chunk_text(response.content)
+
+# Oturum bazlı hafıza saklama (token bütçeli, LRU/TTL ile sınırlı)
+# Geçmiş kalıcı depoya (varsayılan: SQLite) tamponlanarak yazılır, yeniden başlatmada korunur
+session_memories = MemoryStore(summarizer=summarize_turns, store=create_store())
+
+# Salt-okunur sorular için yanıt önbelleği (defter yazmalarında temizlenir)
+response_cache = ResponseCache()
+
+def mcp_server_configs() -> Dict[str, dict]:
+    """Agent'ın kullanacağı MCP sunucuları.
+
+    startup_timeout: başlatma süresi sınırı (sn), replicas: çalıştırılacak süreç sayısı
+    """
+    # .env dosyasından API anahtarlarını al
+    tavily_api_key = os.environ.get("TAVILY_API_KEY")
+    gmail_mcp_key = os.environ.get("GMAIL_MCP_KEY")
+    
+    if not tavily_api_key:
+        logger.warning("TAVILY_API_KEY bulunamadı. .env dosyasını kontrol edin.")
+    
+    if not gmail_mcp_key:
+        logger.warning("GMAIL_MCP_KEY bulunamadı. .env dosyasını kontrol edin.")
+    
+    # Muhasebe sunucusu ayrı çalışıyorsa (mcp_server.py --transport sse)
+    # tüm web işçileri ona bağlanır; aksi halde her işçi kendi stdio alt sürecini başlatır
+    muhasebe_url = os.environ.get("MUHASEBE_MCP_URL")
+    if muhasebe_url:
+        custom_mcp = {
+            "url": muhasebe_url,
+            # langchain-mcp-adapters 0.0.7 yalnızca stdio ve sse destekler
+            "transport": "sse",
+            "startup_timeout": 15,
+        }
+    else:
+        custom_mcp = {
+            "command": "python",
+            "args": ["./own_mcp/mcp_server.py"],
+            "transport": "stdio",
+            # Alt süreç varsayılan olarak ortamın yalnızca bir kısmını alır; MUHASEBE_DB_PATH vb. ayarlar aktarılır
+            "env": dict(os.environ),
+            "startup_timeout": 15,
+            # Çok sayıda eşzamanlı oturumda muhasebe tool çağrılarını paylaştırmak için kopya sayısı
+            "replicas": int(os.environ.get("MUHASEBE_MCP_REPLICAS", "1")),
+        }
+    
+    return {
+        "tavily-mcp": {
+            "command": "npx",
+            "args": [
+                "-y",
+                "@smithery/cli@latest",
+                "run",
+                "@tavily-ai/tavily-mcp",
+                "--key",
+                tavily_api_key or "API_KEY_REQUIRED"
+            ],
+            # npx ilk çalıştırmada paketi indirir
+            "startup_timeout": 60,
+        },
+        "server-gmail-autoauth-mcp": {
+            "command": "cmd",
+            "args": [
+                "/c",
+                "npx",
+                "-y",
+                "@smithery/cli@latest",
+                "run",
+                "@gongrzhe/server-gmail-autoauth-mcp",
+                "--key",
+                gmail_mcp_key or "API_KEY_REQUIRED"
+            ],
+            "startup_timeout": 60,
+        },
+        "custom_mcp": custom_mcp,
+    }
+
+router = ToolRouter(PROMPT_SECTIONS)
+
+def build_agent():
+    """Hazır (ve tembel) MCP sunucularının tool'larıyla tam agent'ı oluştur"""
+    global agent
+    tools = mcp_servers.tools()
+    agent = create_react_agent(model, tools, prompt=SYSTEM_PROMPT)
+    # Tool listesi değişti: yönlendirilmiş agent'lar yeniden kurulmalı
+    router.reset_agents()
+    logger.info(f"Agent {len(tools)} tool ile oluşturuldu")
+
+def _build_routed_agent(domains: frozenset) -> tuple:
+    """(o alanların tool'ları ve istem bölümleriyle kurulmuş agent,
+        tam istemin token maliyeti, küçültülmüş istemin token maliyeti)"""
+    tools = mcp_servers.tools(router.servers(domains))
+    routed = create_react_agent(model, tools, prompt=router.prompt(domains))
+    full_tokens = router.cost(SYSTEM_PROMPT, mcp_servers.schemas())
+    routed_tokens = router.cost(router.prompt(domains), mcp_servers.schemas(router.servers(domains)))
+    return routed, full_tokens, routed_tokens
+
+def agent_for(message: str, history: List[dict]):
+    """Mesajın alanlarına göre küçültülmüş tool listesi ve istemle agent döndür"""
+    son_tur = [m["content"] for m in history[-2:] if isinstance(m.get("content"), str)]
+    domains = router.route(message, son_tur)
+    routed = router.agent(domains, _build_routed_agent)
+    router.record(domains, routed[1], routed[2])
+    logger.info(f"Yönlendirme: {sorted(domains) or 'tool yok'} ({routed[2]}/{routed[1]} token)")
+    return routed[0]
+
+async def _tools_changed():
+    # Arka planda başlayan bir sunucu hazır oldu: tool listesini güncelle
+    build_agent()
+
+mcp_servers = MCPServerManager(mcp_server_configs(), on_tools_changed=_tools_changed)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Uygulama başladığında MCP client'ı başlat
-    global agent
+    # Geçmiş yazma ve eski oturum silme döngüsü
+    session_memories.store.start()
+    # Uygulama başladığında MCP sunucularını aynı anda başlat; başlamayanlar atlanır
     try:
-        # .env dosyasından API anahtarlarını al
-        tavily_api_key = os.environ.get("TAVILY_API_KEY")
-        gmail_mcp_key = os.environ.get("GMAIL_MCP_KEY")
-        
-        if not tavily_api_key:
-            logger.warning("TAVILY_API_KEY bulunamadı. .env dosyasını kontrol edin.")
-        
-        if not gmail_mcp_key:
-            logger.warning("GMAIL_MCP_KEY bulunamadı. .env dosyasını kontrol edin.")
-            
-        async with MultiServerMCPClient(
-            {
-                "tavily-mcp": {
-                    "command": "npx",
-                    "args": [
-                        "-y",
-                        "@smithery/cli@latest",
-                        "run",
-                        "@tavily-ai/tavily-mcp",
-                        "--key",
-                        tavily_api_key or "API_KEY_REQUIRED"
-                    ]
-                },
-                "server-gmail-autoauth-mcp": {
-                    "command": "cmd",
-                    "args": [
-                        "/c",
-                        "npx",
-                        "-y",
-                        "@smithery/cli@latest",
-                        "run",
-                        "@gongrzhe/server-gmail-autoauth-mcp",
-                        "--key",
-                        gmail_mcp_key or "API_KEY_REQUIRED"
-                    ]
-                },
-                "custom_mcp": {
-                    "command": "python",
-                    "args": ["./own_mcp/mcp_server.py"],
-                    "transport": "stdio",
-                }
-            }
-        ) as client:
-            logger.info("MCP Client başarıyla başlatıldı")
-            
-            try:
-                # Create the agent with tools
-                agent = create_react_agent(
-                    model, 
-                    client.get_tools(),
-                    prompt="""Ben çok yönlü bir sohbet ve görev asistanıyım. Kullanıcının isteğini doğru anlayarak gerektiğinde aşağıdaki araçları kullanabilirim:
-
-🔎 **Tavily (Web Search & Extract)**  
-- Kullanıcı güncel bilgi, haber veya internetten bir şey araştırmamı isterse  
-- "Ara", "bul", "güncel", "son gelişmeler", "haber", "webden", "internetten", "makale", "konu hakkında bilgi" gibi ifadeler geçiyorsa
-- Hem arama hem içerik çıkarımı gerekiyorsa, "Tavily Search" ve "Tavily Extract" araçlarını beraber kullanırım.
-
-📧 **Gmail Tool**  
-- Kullanıcı e-posta göndermek, taslak oluşturmak, gelen kutusunu okumak veya e-postalarla ilgili bir işlem yapmak isterse  
-- "Mail at", "e-posta gönder", "taslak hazırla", "şunu oku", "şunu sil", "etiketle", "gelen kutusu", "önemli", "şunu ara", "şunu bul" gibi ifadeler kullanılırsa  
-- Uygun Gmail tool fonksiyonlarını çağırarak işlemi yaparım (örn. send_email, read_email, modify_email vs.)
-- Kullanıcı mail istediğinde E-posta gövdesi, başlığı veya ekleri ne gerekiyorsa kendin isteğe göre oluştur ve gönder veya işlemleri yap.
-- Maili yazarken, en uygun formatta kendine göre, kullanıcının rahat okuaycağı formatta yeniden yaz ve gönderirim.
-
-📊 **Muhasebe Sistemi**  
-- Kullanıcı fatura, gelir, gider, kasa, rapor, muhasebe gibi konulara dair bir istekte bulunursa  
-- "Fatura kes", "gider raporu", "muhasebe tablosu", "bakiye", "cari hesap" gibi ifadeler geçiyorsa ilgili muhasebe aracını kullanırım.
-
-🧠 Kullanım Kuralları:
-- Tool'ları **yalnızca gerekli olduğunda** ve kullanıcı isteği **açıkça veya ima yoluyla** bunu belirttiğinde kullanırım.
-- Kullanıcının isteğini analiz edip gereken tool'u **bir kez, birden çok kez veya hiç** kullanmam gerekebilir. Tamamen ihtiyaca bağlıdır.
-- Eğer toollarda opsiyonel olan bir parametre varsa ve kullanıcı bunu belirtmezse varsayılan değeri kullanırım.
-- Kullanıcı bir şey yapmanı istediyse yap. Spesifik değişken vermediyse genel. Sadece çok belirsiz bir durum varsa kullanıcıyı yönlendirmek için kısa bir açıklama yapabilirim.
-- Her durumda, kullanıcının amacını ve bağlamı dikkate alarak en uygun aksiyonu alırım.
-
-Hazırım. Ne yapmamı istersiniz?"""
-                )
-                
-                logger.info("Agent başarıyla oluşturuldu")
-                yield
-                
-            except Exception as e:
-                logger.error(f"Agent oluşturma hatası: {str(e)}")
-                logger.error(f"Hata detayı: {traceback.format_exc()}")
-                yield
-                
+        await mcp_servers.start()
+        build_agent()
     except Exception as e:
-        logger.error(f"MCP Client hatası: {str(e)}")
+        logger.error(f"Agent oluşturma hatası: {str(e)}")
         logger.error(f"Hata detayı: {traceback.format_exc()}")
+    try:
         yield
+    finally:
+        # Kapanışta çalışan istekleri iptal et, tamponlanmış geçmişi diske yaz ve sunucuları durdur
+        await scheduler.shutdown()
+        await session_memories.store.close()
+        await mcp_servers.stop()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -191,86 +235,255 @@ templates = Jinja2Templates(directory="templates")
 async def get_html(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+# Tool sonuçları istemciye gönderilirken kırpılır (tam sonuç zaten agent'a gider)
+TOOL_RESULT_PREVIEW_CHARS = 500
+
+def _chunk_text(content) -> str:
+    """Model çıktı parçasının metnini döndür (Gemini içerik parçalarını liste olarak verebilir)"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return ""
+
+def _preview(value) -> str:
+    text = value.content if hasattr(value, "content") else value
+    text = text if isinstance(text, str) else json.dumps(text, ensure_ascii=False, default=str)
+    if len(text) > TOOL_RESULT_PREVIEW_CHARS:
+        text = text[:TOOL_RESULT_PREVIEW_CHARS] + "..."
+    return text
+
+# Kurallı hızlı yolun kullanıldığı ve agent'a bırakıldığı mesaj sayıları
+fast_path_stats = {"fast_path": 0, "agent": 0}
+
+async def run_fast_path(intent: dict):
+    """Çözümlenmiş muhasebe komutunu LLM'siz, doğrudan MCP tool'u ile çalıştır"""
+    tool, args = intent["tool"], intent["args"]
+    yield {"type": "tool_start", "name": tool, "input": args}
+    raw = await mcp_servers.call_tool("custom_mcp", tool, args)
+    try:
+        result = json.loads(raw) if isinstance(raw, str) else raw
+    except ValueError:
+        # Sunucu kullanılamıyorsa açıklama metni döner
+        result = raw
+    yield {"type": "tool_end", "name": tool, "output": _preview(raw)}
+    if tool in LEDGER_WRITE_TOOLS and not (isinstance(result, dict) and "error" in result):
+        response_cache.invalidate()
+    yield {"type": "final", "message": format_result(tool, result), "cached": False}
+
 async def process_message(message: str, client_id: str):
-    """Mesajı işle ve yanıtı döndür"""
+    """Mesajı işle ve agent olaylarını sırayla üret.
+
+    Üretilen olaylar (WebSocket çerçevesi olarak gönderilir):
+        {"type": "token", "content": ...}          model metin parçası
+        {"type": "tool_start", "name": ..., "input": ...}
+        {"type": "tool_end", "name": ..., "output": ...}
+        {"type": "final", "message": ..., "cached": bool}  nihai yanıt (her zaman son olay)
+    """
     global agent
     
+    # Basit muhasebe komutları ("500 TL gider ekle market") agent'a gitmeden işlenir
+    try:
+        intent = parse_intent(message)
+    except Exception as e:
+        # Çözümleyici hatası mesajı düşürmemeli: agent'a bırak
+        logger.error(f"Niyet çözümleme hatası: {str(e)}")
+        intent = None
+    if intent is not None:
+        fast_path_stats["fast_path"] += 1
+        logger.info(f"Hızlı yol: {intent}")
+        try:
+            telemetry.count("messages", path="fast_path")
+            async for event in run_fast_path(intent):
+                yield event
+            await session_memories.load(client_id)
+            await session_memories.append_turn(client_id, message, event["message"])
+        except Exception as e:
+            logger.error(f"Hızlı yol hatası: {str(e)}")
+            yield {"type": "final", "message": f"Bir hata oluştu: {str(e)}"}
+        return
+    fast_path_stats["agent"] += 1
+    
     if agent is None:
-        return "Sistem henüz hazır değil. Lütfen biraz bekleyin."
+        yield {"type": "final", "message": "Sistem henüz hazır değil. Lütfen biraz bekleyin."}
+        return
         
     try:
         logger.info(f"Mesaj işleniyor: {message}")
         
-        # Mevcut hafızayı kontrol et ve ekrana yazdır
-        history_messages = []
-        if client_id in session_memories:
-            # Hafızadaki mesajları alıp ekrana yazdır
-            messages = session_memories[client_id].messages
-            logger.info(f"Hafızada {len(messages)} mesaj bulundu: {messages}")
-            
-            # Mesajları uygun formata dönüştür
-            for msg in messages:
-                if hasattr(msg, 'type') and msg.type == 'human':
-                    history_messages.append({"role": "user", "content": msg.content})
-                elif hasattr(msg, 'type') and msg.type == 'ai':
-                    history_messages.append({"role": "assistant", "content": msg.content})
+        # Hafızadaki geçmiş: eski turların özeti + bütçeye sığan son mesajlar
+        with telemetry.span("history"):
+            await session_memories.load(client_id)
+            history_messages = session_memories.history(client_id)
+            # Kullanıcının yeni mesajını ekle
+            all_messages = history_messages + [{"role": "user", "content": message}]
+        
+        # Aynı salt-okunur soru aynı defter sürümü ve aynı geçmişle yanıtlandıysa agent'ı çalıştırma
+        cache_key = response_cache.key(message, context_digest(history_messages))
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Yanıt önbellekten verildi")
+            telemetry.count("messages", path="cache")
+            yield {"type": "final", "message": cached, "cached": True}
+            await session_memories.append_turn(client_id, message, cached)
+            return
+        generation = response_cache.generation
         
-        # Kullanıcının yeni mesajını ekle
-        all_messages = history_messages + [{"role": "user", "content": message}]
-        logger.info(f"Agent'a gönderilen mesajlar: {all_messages}")
+        telemetry.count("messages", path="agent")
+        logger.info(f"Hafızada {len(history_messages)} mesaj bulundu")
+        if telemetry.sample_history():
+            logger.info(f"Agent'a gönderilen mesajlar: {all_messages}")
         
-        # Tüm mesaj geçmişiyle birlikte agent'ı çağır
-        response = await agent.ainvoke({"messages": all_messages})
+        # Tüm mesaj geçmişiyle birlikte agent'ı çalıştır ve olayları aktar
+        content = None
+        tools_used = set()
+        # run_id -> LLM çağrısının başlangıcı; ilk token süresi istek başına bir kez ölçülür
+        llm_started = {}
+        request_started = time.perf_counter()
+        first_token = True
+        async for event in agent_for(message, history_messages).astream_events(
+                {"messages": all_messages}, version="v2"):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                text = _chunk_text(event["data"]["chunk"].content)
+                if text:
+                    if first_token:
+                        telemetry.observe("first_token", time.perf_counter() - request_started)
+                        first_token = False
+                    yield {"type": "token", "content": text}
+            elif kind == "on_chat_model_start":
+                llm_started[event["run_id"]] = time.perf_counter()
+            elif kind == "on_chat_model_end":
+                started = llm_started.pop(event["run_id"], None)
+                if started is not None:
+                    telemetry.observe("llm_call", time.perf_counter() - started)
+                usage = getattr(event["data"].get("output"), "usage_metadata", None) or {}
+                for field in ("input_tokens", "output_tokens"):
+                    if usage.get(field):
+                        telemetry.count("llm_tokens", usage[field], kind=field.split("_")[0])
+            elif kind == "on_tool_start":
+                tools_used.add(event["name"])
+                yield {"type": "tool_start", "name": event["name"],
+                       "input": event["data"].get("input")}
+            elif kind == "on_tool_end":
+                if event["name"] in LEDGER_WRITE_TOOLS:
+                    response_cache.invalidate()
+                yield {"type": "tool_end", "name": event["name"],
+                       "output": _preview(event["data"].get("output", ""))}
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # En üst seviye graf çalışması bitti: nihai durum
+                output = event["data"].get("output")
+                if isinstance(output, dict) and output.get("messages"):
+                    content = _chunk_text(output["messages"][-1].content)
         
-        if response and isinstance(response, dict):
-            if 'messages' in response and response['messages']:
-                content = response['messages'][-1].content
-                logger.info("Mesaj başarıyla işlendi")
-                
-                # Mesaj başarıyla işlendikten sonra hafızaya ekle
-                if client_id not in session_memories:
-                    session_memories[client_id] = ChatMessageHistory(session_id=client_id)
-                session_memories[client_id].add_user_message(message)
-                session_memories[client_id].add_ai_message(content)
-                
-                # Güncellenmiş hafızayı yazdır
-                logger.info(f"Güncellenmiş hafıza: {session_memories[client_id].messages}")
-                
-                return content
+        if content is not None:
+            logger.info("Mesaj başarıyla işlendi")
+            
+            yield {"type": "final", "message": content, "cached": False}
+            
+            if is_cacheable(tools_used):
+                await response_cache.put(cache_key, content, generation)
+            
+            # Yanıt gönderildikten sonra hafızaya ekle (gerekirse eski turlar özetlenir)
+            await session_memories.append_turn(client_id, message, content)
+            return
         
         logger.warning("Beklenmeyen yanıt formatı")
-        return "Yanıt alınamadı. Lütfen tekrar deneyin."
+        yield {"type": "final", "message": "Yanıt alınamadı. Lütfen tekrar deneyin."}
             
     except Exception as e:
         logger.error(f"Mesaj işlenirken hata: {str(e)}")
         logger.error(f"Hata detayı: {traceback.format_exc()}")
-        return f"Bir hata oluştu: {str(e)}"
+        yield {"type": "final", "message": f"Bir hata oluştu: {str(e)}"}
+
+async def _send_frame(client_id: str, timestamp: str, event: dict):
+    frame = {"sender": "assistant", "timestamp": timestamp, **event}
+    with telemetry.span("ws_send"):
+        await manager.send_message(json.dumps(frame, ensure_ascii=False, default=str), client_id)
+
+async def handle_message(client_id: str, message_data: dict):
+    """Zamanlayıcının sıradaki mesaj için çağırdığı işleyici: olayları geldikçe gönder"""
+    timestamp = message_data.get("timestamp", "")
+    received = message_data.pop("_received", None)
+    if received is not None:
+        telemetry.observe("queue_wait", time.perf_counter() - received)
+    with telemetry.span("request"):
+        async for event in process_message(message_data.get("message", ""), client_id):
+            await _send_frame(client_id, timestamp, event)
+
+scheduler = RequestScheduler(handle_message)
+
+telemetry.gauge("scheduler", scheduler.metrics)
+telemetry.gauge("memory", session_memories.metrics)
+telemetry.gauge("cache", response_cache.metrics)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metin biçiminde gecikme yüzdelikleri, token ve tool sayaçları"""
+    return PlainTextResponse(telemetry.prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/scheduler")
+async def scheduler_metrics():
+    """Eşzamanlılık ve kuyruk derinliği metrikleri"""
+    return scheduler.metrics()
+
+@app.get("/api/mcp")
+async def mcp_status():
+    """MCP sunucularının durumu ve başlatma süreleri"""
+    return mcp_servers.status()
+
+@app.get("/api/router")
+async def router_metrics():
+    """Yönlendiricinin alan dağılımı, istem token tasarrufu ve hızlı yol sayaçları"""
+    return {**router.metrics(), **fast_path_stats}
+
+@app.get("/api/cache")
+async def cache_metrics():
+    """Yanıt önbelleği isabet oranları"""
+    return response_cache.metrics()
+
+@app.get("/api/memory")
+async def memory_metrics():
+    """Bellekteki oturum hafızalarının boyut metrikleri"""
+    return session_memories.metrics()
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     await manager.connect(websocket, client_id)
+    # Oturum en son başka bir işçide kullanılmış olabilir; ilk mesajda depodan yeniden yüklenir
+    session_memories.forget(client_id)
     try:
+        # Alma döngüsü yalnızca kuyruğa ekler; işleme oturumun işçi görevinde yapılır
         while True:
             data = await websocket.receive_text()
-            message_data = json.loads(data)
-            user_message = message_data.get("message", "")
-            
-            # Mesajı işle (client_id ile oturum kontrolü)
-            response = await process_message(user_message, client_id)
-            
-            # Yanıtı gönder
-            await manager.send_message(json.dumps({
-                "sender": "assistant",
-                "message": response,
-                "timestamp": message_data.get("timestamp", "")
-            }), client_id)
+            with telemetry.span("ws_receive"):
+                message_data = json.loads(data)
+                timestamp = message_data.get("timestamp", "")
+                # Kuyrukta bekleme süresi handle_message'da ölçülür
+                message_data["_received"] = time.perf_counter()
+                durum = scheduler.submit(client_id, message_data)
+            if durum == REJECTED:
+                await _send_frame(client_id, timestamp, {
+                    "type": "busy", "status": "rejected",
+                    "message": "Çok fazla bekleyen mesajınız var. Lütfen yanıtları bekleyip tekrar deneyin."})
+            elif durum == QUEUED:
+                await _send_frame(client_id, timestamp, {
+                    "type": "busy", "status": "queued",
+                    "position": scheduler.queue_depth(client_id)})
             
     except WebSocketDisconnect:
-        manager.disconnect(client_id)
+        logger.info(f"İstemci ayrıldı: {client_id}")
     except Exception as e:
         logger.error(f"WebSocket hatası: {str(e)}")
         logger.error(f"Hata detayı: {traceback.format_exc()}")
+    finally:
+        # Kopan istemcinin bekleyen ve çalışan işlerini iptal et
         manager.disconnect(client_id)
+        await scheduler.cancel_session(client_id)
 
 if __name__ == "__main__":
     
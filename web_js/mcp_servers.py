@@ -0,0 +1,332 @@
+"""MCP tool sunucularının paralel başlatılması, denetlenmesi (supervision) ve çoğaltılması.
+
+Her sunucu süreci (ServerHandle) kendi görevinde, kendi MultiServerMCPClient
+bağlamıyla çalışır; böylece sunucular aynı anda başlar, biri yavaş açılır ya da
+hiç açılmazsa diğerleri etkilenmez. Denetleyici görev süreci HEALTH_INTERVAL
+saniyede bir ping ile yoklar; yanıt alınamazsa veya süreç çökerse üstel artan
+bekleme (backoff) ile yeniden başlatır.
+
+Bir sunucu yapılandırmasında "replicas": N verilirse (ServerGroup) aynı sunucu
+N süreç olarak çalıştırılır ve tool çağrıları en az meşgul hazır kopyaya
+dağıtılır. Agent'a her zaman vekil (proxy) tool'lar verilir: vekil, çağrı anında
+hazır bir kopya seçer, bu yüzden yeniden başlatmalar agent'ı etkilemez.
+
+Tool tanımları MCP_TOOL_SCHEMA_CACHE dosyasında saklanır. Tembel sunucular
+(MCP_LAZY_SERVERS) açılışta başlatılmaz; tanımları biliniyorsa ilk tool
+çağrısında, bilinmiyorsa açılışı bekletmeden arka planda başlatılır. Yeni tool
+tanımları öğrenildiğinde on_tools_changed çağrılır.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from telemetry import telemetry
+
+logger = logging.getLogger(__name__)
+
+# Sunucu yapılandırmasında belirtilmezse kullanılacak başlatma süresi sınırı (sn)
+DEFAULT_STARTUP_TIMEOUT = float(os.environ.get("MCP_STARTUP_TIMEOUT", "30"))
+# Virgülle ayrılmış, ilk kullanımda başlatılacak sunucu adları
+LAZY_SERVERS = {s.strip() for s in os.environ.get("MCP_LAZY_SERVERS", "").split(",") if s.strip()}
+TOOL_SCHEMA_CACHE = os.environ.get("MCP_TOOL_SCHEMA_CACHE", "mcp_tool_schemas.json")
+
+# Canlılık kontrolü: aralık, ping süre sınırı ve yeniden başlatma için ardışık hata sayısı
+HEALTH_INTERVAL = float(os.environ.get("MCP_HEALTH_INTERVAL", "15"))
+PING_TIMEOUT = 5.0
+MAX_PING_FAILURES = 3
+# Yeniden başlatma beklemesi: RESTART_BACKOFF_MIN'den başlayıp her hatada ikiye katlanır
+RESTART_BACKOFF_MIN = 1.0
+RESTART_BACKOFF_MAX = 60.0
+# Bu kadar süre sağlıklı çalışan süreç çökerse bekleme başa döner
+HEALTHY_RESET = 60.0
+
+# Yapılandırmadaki, MultiServerMCPClient'a aktarılmayan anahtarlar
+_OWN_KEYS = ("startup_timeout", "replicas")
+
+
+class ServerHandle:
+    """Tek bir MCP sunucu sürecinin denetlenen yaşam döngüsü"""
+
+    def __init__(self, name: str, server: str, config: dict, timeout: float,
+                 on_change: Callable[[], None]):
+        self.name = name
+        self.server = server
+        self.config = config
+        self.timeout = timeout
+        self.on_change = on_change
+        self.state = "stopped"
+        self.error: Optional[str] = None
+        self.startup_seconds: Optional[float] = None
+        self.restarts = 0
+        self.calls = 0
+        self.inflight = 0
+        self.tools: Dict[str, BaseTool] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def launch(self):
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._supervise())
+
+    async def _supervise(self):
+        backoff = RESTART_BACKOFF_MIN
+        while not self._stop.is_set():
+            self.state = "starting"
+            started = time.monotonic()
+            try:
+                await self._run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.error = str(e) or type(e).__name__
+                logger.error(f"MCP sunucusu {self.name} durdu: {self.error}")
+            if self._stop.is_set():
+                break
+            if time.monotonic() - started > HEALTHY_RESET:
+                backoff = RESTART_BACKOFF_MIN
+            self.state = "restarting"
+            self.on_change()
+            try:
+                await asyncio.wait_for(self._stop.wait(), backoff)
+                break
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, RESTART_BACKOFF_MAX)
+            self.restarts += 1
+            logger.info(f"MCP sunucusu {self.name} yeniden başlatılıyor ({self.restarts}. kez)")
+        self.state = "stopped"
+        self.on_change()
+
+    async def _run_once(self):
+        started = time.perf_counter()
+        # Bağlam bu görevde açılıp kapanmalı (stdio istemcisi anyio kapsamları kullanır)
+        async with AsyncExitStack() as stack:
+            async with asyncio.timeout(self.timeout):
+                client = await stack.enter_async_context(MultiServerMCPClient({self.server: self.config}))
+            session = client.sessions[self.server]
+            self.tools = {tool.name: tool for tool in client.get_tools()}
+            self.startup_seconds = time.perf_counter() - started
+            self.error = None
+            self.state = "ready"
+            logger.info(f"MCP sunucusu hazır: {self.name} ({self.startup_seconds:.2f} sn, {len(self.tools)} tool)")
+            self.on_change()
+            try:
+                await self._health_loop(session)
+            finally:
+                self.state = "starting"
+                self.tools = {}
+
+    async def _health_loop(self, session):
+        failures = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._stop.wait(), HEALTH_INTERVAL)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                async with asyncio.timeout(PING_TIMEOUT):
+                    await session.send_ping()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                logger.warning(f"MCP sunucusu {self.name} ping'e yanıt vermedi ({failures}/{MAX_PING_FAILURES})")
+                if failures >= MAX_PING_FAILURES:
+                    raise RuntimeError(f"ping yanıtsız: {str(e) or type(e).__name__}")
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task is None:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(task, PING_TIMEOUT)
+        except (asyncio.CancelledError, Exception):
+            pass
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "startup_seconds": round(self.startup_seconds, 3) if self.startup_seconds is not None else None,
+            "tools": len(self.tools),
+            "restarts": self.restarts,
+            "calls": self.calls,
+            "inflight": self.inflight,
+            "error": self.error,
+        }
+
+
+class ServerGroup:
+    """Aynı sunucunun bir veya daha fazla kopyası; çağrılar en az meşgul hazır kopyaya gider"""
+
+    def __init__(self, name: str, config: dict, on_ready: Callable[["ServerGroup"], None]):
+        self.name = name
+        self.timeout = config.get("startup_timeout", DEFAULT_STARTUP_TIMEOUT)
+        replicas = max(1, int(config.get("replicas", 1)))
+        client_config = {k: v for k, v in config.items() if k not in _OWN_KEYS}
+        self.handles = [
+            ServerHandle(f"{name}#{i + 1}" if replicas > 1 else name, name, client_config,
+                         self.timeout, self._handle_changed)
+            for i in range(replicas)
+        ]
+        self.on_ready = on_ready
+        self._changed = asyncio.Event()
+
+    @property
+    def started(self) -> bool:
+        return any(h._task is not None for h in self.handles)
+
+    def ready_handles(self) -> List[ServerHandle]:
+        return [h for h in self.handles if h.ready]
+
+    def _handle_changed(self):
+        self._changed.set()
+        if self.ready_handles():
+            self.on_ready(self)
+
+    def launch(self):
+        for handle in self.handles:
+            handle.launch()
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """En az bir kopya hazır olana kadar en fazla timeout saniye bekle"""
+        try:
+            async with asyncio.timeout(timeout):
+                while True:
+                    self._changed.clear()
+                    if self.ready_handles():
+                        return True
+                    await self._changed.wait()
+        except TimeoutError:
+            return False
+
+    async def start(self) -> bool:
+        self.launch()
+        if await self.wait_ready(self.timeout):
+            return True
+        logger.error(f"MCP sunucusu {self.timeout:g} sn içinde başlamadı, arka planda denenmeye devam edilecek: "
+                     f"{self.name}: {self.handles[0].error}")
+        return False
+
+    def tools(self) -> List[BaseTool]:
+        ready = self.ready_handles()
+        return list(ready[0].tools.values()) if ready else []
+
+    async def call(self, tool_name: str, kwargs: dict):
+        if not self.started:
+            self.launch()
+        if not await self.wait_ready(self.timeout):
+            return f"{self.name} sunucusu şu anda kullanılamıyor: {self.handles[0].error}"
+        handle = min(self.ready_handles(), key=lambda h: h.inflight)
+        tool = handle.tools.get(tool_name)
+        if tool is None:
+            return f"{tool_name} tool'u {self.name} sunucusunda bulunamadı"
+        handle.calls += 1
+        handle.inflight += 1
+        telemetry.count("tool_calls", server=self.name, tool=tool_name)
+        try:
+            with telemetry.span("mcp_tool", server=self.name, tool=tool_name):
+                return await tool.ainvoke(kwargs)
+        finally:
+            handle.inflight -= 1
+
+    async def stop(self):
+        await asyncio.gather(*(handle.stop() for handle in self.handles))
+
+    def status(self) -> dict:
+        return {"replicas": {h.name: h.status() for h in self.handles}}
+
+
+class MCPServerManager:
+    def __init__(self, configs: Dict[str, dict], lazy: Optional[set] = None,
+                 on_tools_changed: Optional[Callable[[], Awaitable[None]]] = None,
+                 schema_cache: str = TOOL_SCHEMA_CACHE):
+        self.groups = {name: ServerGroup(name, config, self._group_ready) for name, config in configs.items()}
+        self.lazy = set(lazy if lazy is not None else LAZY_SERVERS) & set(configs)
+        self.on_tools_changed = on_tools_changed
+        self.schema_cache = schema_cache
+        self._schemas = self._load_schemas()
+        self._background: List[asyncio.Task] = []
+
+    def _load_schemas(self) -> Dict[str, List[dict]]:
+        try:
+            with open(self.schema_cache, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _group_ready(self, group: ServerGroup):
+        schemas = [
+            {"name": t.name, "description": t.description,
+             "args_schema": t.args_schema if isinstance(t.args_schema, dict) else t.args_schema.model_json_schema()}
+            for t in group.tools()
+        ]
+        if self._schemas.get(group.name) == schemas:
+            return
+        self._schemas[group.name] = schemas
+        try:
+            with open(self.schema_cache, "w", encoding="utf-8") as f:
+                json.dump(self._schemas, f, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"Tool tanımları kaydedilemedi: {str(e)}")
+        if self.on_tools_changed is not None:
+            # Tool listesi değişti (yeni sunucu veya sürüm): agent yeniden kurulmalı
+            self._background.append(asyncio.create_task(self.on_tools_changed()))
+
+    async def start(self):
+        """Tembel olmayan sunucuları aynı anda başlat; her biri kendi süre sınırıyla beklenir"""
+        started = time.perf_counter()
+        eager = [group for name, group in self.groups.items() if name not in self.lazy]
+        for name in self.lazy:
+            if name not in self._schemas:
+                # Tool tanımları bilinmiyor: açılışı bekletmeden öğren
+                self.groups[name].launch()
+        await asyncio.gather(*(group.start() for group in eager))
+        logger.info(f"MCP sunucuları {time.perf_counter() - started:.2f} sn içinde başlatıldı: "
+                    f"{json.dumps(self.status(), ensure_ascii=False)}")
+
+    def _proxy(self, group: ServerGroup, schema: dict) -> BaseTool:
+        tool_name = schema["name"]
+
+        async def call(**kwargs):
+            return await group.call(tool_name, kwargs)
+
+        return StructuredTool(name=tool_name, description=schema["description"],
+                              args_schema=schema["args_schema"], coroutine=call)
+
+    def tools(self, servers: Optional[Iterable[str]] = None) -> List[BaseTool]:
+        """Agent'a verilecek vekil tool'lar (tanımı bilinen sunucular; servers verilirse yalnızca onlar)"""
+        names = self.groups if servers is None else [n for n in servers if n in self.groups]
+        return [self._proxy(self.groups[name], schema)
+                for name in names
+                for schema in self._schemas.get(name, [])]
+
+    async def call_tool(self, server: str, tool_name: str, args: dict):
+        """Tool'u agent'sız, doğrudan çağır (kurallı hızlı yol için)"""
+        return await self.groups[server].call(tool_name, args)
+
+    def schemas(self, servers: Optional[Iterable[str]] = None) -> List[dict]:
+        """Tool tanımları (istem maliyeti ölçümü için)"""
+        names = self.groups if servers is None else servers
+        return [schema for name in names for schema in self._schemas.get(name, [])]
+
+    def status(self) -> Dict[str, dict]:
+        return {name: {**group.status(), "lazy": name in self.lazy}
+                for name, group in self.groups.items()}
+
+    async def stop(self):
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*(group.stop() for group in self.groups.values()))
@@ -0,0 +1,202 @@
+"""Oturum bazlı, token bütçeli sohbet hafızası.
+
+Her oturum son mesajları olduğu gibi, daha eskilerini ise tek bir özet metni
+olarak tutar. Mesajların tahmini token sayısı MEMORY_TOKEN_BUDGET'ı aşınca en
+eski turlar özetleyiciye verilir ve özetle birleştirilir; böylece agent'a giden
+geçmiş konuşma uzadıkça büyümez. Boşta kalan oturumlar TTL ile, oturum sayısı
+MAX_SESSIONS'ı aşınca da en az kullanılan (LRU) oturumdan başlanarak silinir.
+
+Bir SessionStore verilirse bellekteki oturumlar onun önbelleğidir: her yeni
+mesaj ve özet depoya da yazılır, önbellekte olmayan oturum depodan yüklenir.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+# Bir oturumda özet dışında tutulacak mesajların token bütçesi
+MEMORY_TOKEN_BUDGET = int(os.environ.get("CHAT_MEMORY_TOKEN_BUDGET", "2000"))
+# Özetin kendisi için üst sınır (aşarsa baştan kırpılır)
+SUMMARY_TOKEN_BUDGET = int(os.environ.get("CHAT_SUMMARY_TOKEN_BUDGET", "500"))
+# Özetlemeden sonra bile her zaman olduğu gibi tutulan son mesaj sayısı
+KEEP_RECENT_MESSAGES = 4
+# Bellekte tutulacak en fazla oturum ve boşta kalma süresi (sn)
+MAX_SESSIONS = int(os.environ.get("CHAT_MAX_SESSIONS", "1000"))
+SESSION_TTL = int(os.environ.get("CHAT_SESSION_TTL", str(60 * 60)))
+
+# Özetleyici: (önceki özet, özetlenecek mesajlar) -> yeni özet
+Summarizer = Callable[[str, List[dict]], Awaitable[str]]
+
+
+def estimate_tokens(text: str) -> int:
+    """Kaba token tahmini (~4 karakter/token); tokenizer çağrısı gerektirmez"""
+    return len(text) // 4 + 1
+
+
+def _trim_to_tokens(text: str, budget: int) -> str:
+    """Metni baştan kırparak bütçeye sığdır (özetin en yeni kısmı korunur)"""
+    max_chars = budget * 4
+    return text if len(text) <= max_chars else "..." + text[-max_chars:]
+
+
+async def truncating_summarizer(summary: str, messages: List[dict]) -> str:
+    """LLM olmadan çalışan yedek özetleyici: mesajları kısaltıp özete ekler"""
+    lines = [f"{m['role']}: {m['content'][:200]}" for m in messages]
+    return "\n".join(filter(None, [summary] + lines))
+
+
+class SessionMemory:
+    """Tek bir oturumun özeti ve son mesajları"""
+
+    __slots__ = ("summary", "messages", "tokens", "seq", "last_access")
+
+    def __init__(self):
+        self.summary = ""
+        self.messages: List[dict] = []
+        self.tokens = 0
+        # Bir sonraki mesajın sıra numarası (özete katılanlar dahil)
+        self.seq = 0
+        self.last_access = time.monotonic()
+
+    def add(self, role: str, content: str) -> dict:
+        message = {"role": role, "content": content}
+        self.messages.append(message)
+        self.tokens += estimate_tokens(content)
+        self.seq += 1
+        return message
+
+    def history(self) -> List[dict]:
+        """Agent'a verilecek mesaj listesi (özet varsa başta ayrı bir mesaj olarak)"""
+        if not self.summary:
+            return list(self.messages)
+        # Gemini ikinci bir sistem mesajını kabul etmediği için özet kullanıcı mesajı olarak verilir
+        ozet = {"role": "user", "content": f"Önceki konuşmanın özeti:\n{self.summary}"}
+        return [ozet] + self.messages
+
+    def chars(self) -> int:
+        return len(self.summary) + sum(len(m["content"]) for m in self.messages)
+
+
+class MemoryStore:
+    """Oturum hafızalarını LRU/TTL ile sınırlayan ve gerektiğinde özetleyen depo"""
+
+    def __init__(self, summarizer: Optional[Summarizer] = None,
+                 token_budget: int = MEMORY_TOKEN_BUDGET,
+                 max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL,
+                 store: Optional[SessionStore] = None):
+        self.summarizer = summarizer or truncating_summarizer
+        self.store = store or SessionStore()
+        self.token_budget = token_budget
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self._stats = {"summarized": 0, "summary_failures": 0, "evicted_ttl": 0, "evicted_lru": 0,
+                       "store_loads": 0}
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> SessionMemory:
+        """Oturum hafızasını döndür (yoksa oluştur) ve en son kullanılan olarak işaretle"""
+        self.evict_idle()
+        memory = self._sessions.get(session_id)
+        if memory is None:
+            memory = self._sessions[session_id] = SessionMemory()
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._stats["evicted_lru"] += 1
+        else:
+            self._sessions.move_to_end(session_id)
+        memory.last_access = time.monotonic()
+        return memory
+
+    async def load(self, session_id: str):
+        """Oturum önbellekte yoksa depodan yükle"""
+        if session_id in self._sessions:
+            return
+        data = await self.store.load(session_id)
+        if data is None or session_id in self._sessions:
+            return
+        summary, rows = data
+        memory = self.get(session_id)
+        memory.summary = summary
+        for seq, message in rows:
+            memory.add(message["role"], message["content"])
+        memory.seq = rows[-1][0] + 1 if rows else 0
+        self._stats["store_loads"] += 1
+
+    def forget(self, session_id: str):
+        """Önbellekteki kopyayı at (oturum başka bir işçide güncellenmiş olabilir)"""
+        self._sessions.pop(session_id, None)
+
+    def history(self, session_id: str) -> List[dict]:
+        if session_id not in self._sessions:
+            return []
+        return self.get(session_id).history()
+
+    async def append_turn(self, session_id: str, user_message: str, ai_message: str):
+        """Tamamlanan bir turu ekle; bütçe aşıldıysa eski turları özetle.
+
+        Oturum agent çalışırken önbellekten atılmış olabilir; boş oturumla devam edilirse
+        sıra numaraları 0'dan başlar ve depodaki mesajların üzerine yazılır, önce yüklenir.
+        """
+        await self.load(session_id)
+        memory = self.get(session_id)
+        for role, content in (("user", user_message), ("assistant", ai_message)):
+            message = memory.add(role, content)
+            self.store.append(session_id, memory.seq - 1, message)
+        if memory.tokens > self.token_budget:
+            await self._compact(session_id, memory)
+
+    async def _compact(self, session_id: str, memory: SessionMemory):
+        # En az KEEP_RECENT_MESSAGES mesajı bırakarak bütçeye inene kadar en eski
+        # turları (kullanıcı + asistan çifti) ayır
+        cut, tokens = 0, memory.tokens
+        while tokens > self.token_budget and len(memory.messages) - cut > KEEP_RECENT_MESSAGES:
+            for m in memory.messages[cut:cut + 2]:
+                tokens -= estimate_tokens(m["content"])
+            cut += 2
+        if cut == 0:
+            return
+        eski = memory.messages[:cut]
+        try:
+            summary = await self.summarizer(memory.summary, eski)
+            self._stats["summarized"] += 1
+        except Exception as e:
+            logger.warning(f"Hafıza özetlenemedi, kısaltılarak saklanıyor: {str(e)}")
+            summary = await truncating_summarizer(memory.summary, eski)
+            self._stats["summary_failures"] += 1
+        memory.summary = _trim_to_tokens(summary, SUMMARY_TOKEN_BUDGET)
+        del memory.messages[:cut]
+        memory.tokens = tokens
+        self.store.set_summary(session_id, memory.summary, memory.seq - len(memory.messages))
+
+    def evict_idle(self):
+        """TTL süresince kullanılmayan oturumları sil (en eski kullanılan baştadır)"""
+        sinir = time.monotonic() - self.ttl
+        while self._sessions:
+            session_id, memory = next(iter(self._sessions.items()))
+            if memory.last_access >= sinir:
+                break
+            del self._sessions[session_id]
+            self._stats["evicted_ttl"] += 1
+
+    def metrics(self) -> Dict:
+        """Bellekte tutulan oturum, mesaj, karakter ve tahmini token toplamları"""
+        self.evict_idle()
+        sessions = self._sessions.values()
+        return {
+            "sessions": len(self._sessions),
+            "messages": sum(len(m.messages) for m in sessions),
+            "summaries": sum(1 for m in sessions if m.summary),
+            "chars": sum(m.chars() for m in sessions),
+            "tokens": sum(m.tokens + estimate_tokens(m.summary) for m in sessions),
+            "token_budget": self.token_budget,
+            "max_sessions": self.max_sessions,
+            **self._stats,
+        }
@@ -0,0 +1,201 @@
+"""Tekrarlanan salt-okunur sorular için agent yanıt önbelleği.
+
+İki katmanlıdır:
+  1. Tam eşleşme: anahtar (defter sürümü, geçmiş özeti, normalize edilmiş mesaj
+     metni) üçlüsüdür. Mesaj küçük harfe çevrilir, noktalama ve fazla boşluk atılır.
+  2. Opsiyonel benzerlik katmanı: CHAT_CACHE_EMBEDDING_MODEL ayarlıysa ve
+     sentence-transformers kuruluysa, yerel embedding'ler arasındaki kosinüs
+     benzerliği CHAT_CACHE_SIMILARITY eşiğini geçen kayıt kullanılır.
+
+Yalnızca salt-okunur muhasebe tool'larını kullanan yanıtlar önbelleğe alınır.
+Defter sürümü defter_surumu tablosundan (own_mcp/migrations.py, geçiş 2) okunur;
+yazmayı hangi süreç yaparsa yapsın (masaüstü uygulama, bulk.py, diğer işçiler)
+sayaç artar ve eski yanıtlar kullanılmaz. Veritabanı bu makineden okunamıyorsa
+(uzak MCP sunucusu) yalnızca bu süreçte görülen yazma tool'ları önbelleği temizler.
+Geçmiş özeti, "peki geçen ay?" gibi önceki turlara bağlı soruların başka bir
+oturumun bağlamında verilmiş yanıtı almasını önler. Kayıtlar ayrıca TTL ile
+eskir ve sayı LRU ile sınırlanır.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = float(os.environ.get("CHAT_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CHAT_CACHE_MAX_ENTRIES", "500"))
+EMBEDDING_MODEL = os.environ.get("CHAT_CACHE_EMBEDDING_MODEL", "")
+SIMILARITY_THRESHOLD = float(os.environ.get("CHAT_CACHE_SIMILARITY", "0.92"))
+# Muhasebe MCP sunucusuyla aynı varsayılan (own_mcp/ledger.py DB_PATH)
+LEDGER_DB_PATH = os.environ.get("MUHASEBE_DB_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "muhasebe.db")
+
+# Yanıtı önbelleğe alınabilecek (defteri değiştirmeyen) tool'lar
+READ_ONLY_TOOLS = {"rapor_getir", "trend_raporu", "gelirleri_listele", "giderleri_listele", "kayitlarda_ara"}
+# Çağrıldığında önbelleği geçersiz kılan tool'lar
+LEDGER_WRITE_TOOLS = {"gelir_ekle", "gider_ekle", "gelir_toplu_ekle", "gider_toplu_ekle",
+                      "dosyadan_ice_aktar"}
+
+_TR_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """Türkçe büyük/küçük harf kurallarıyla küçült, noktalama ve fazla boşlukları at"""
+    text = text.translate(_TR_LOWER).lower()
+    return _SPACES.sub(" ", _PUNCT.sub(" ", text)).strip()
+
+
+def context_digest(history: List[dict]) -> str:
+    """Agent'a verilen geçmişin kısa özeti (boş geçmiş için "")"""
+    if not history:
+        return ""
+    digest = hashlib.sha256()
+    for message in history:
+        digest.update(json.dumps([message.get("role"), message.get("content")],
+                                 ensure_ascii=False, default=str).encode())
+    return digest.hexdigest()[:16]
+
+
+def is_cacheable(tools_used: Iterable[str]) -> bool:
+    """En az bir tool çağrılmış ve hepsi salt-okunursa yanıt önbelleğe alınabilir"""
+    tools = set(tools_used)
+    return bool(tools) and tools <= READ_ONLY_TOOLS
+
+
+def _load_embedder(model_name: str):
+    if not model_name:
+        return None
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        logger.warning("sentence-transformers kurulu değil, benzerlik önbelleği devre dışı")
+        return None
+    return SentenceTransformer(model_name)
+
+
+class _Entry:
+    __slots__ = ("response", "created", "vector")
+
+    def __init__(self, response: str, vector=None):
+        self.response = response
+        self.created = time.monotonic()
+        self.vector = vector
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES,
+                 embedding_model: str = EMBEDDING_MODEL,
+                 similarity_threshold: float = SIMILARITY_THRESHOLD,
+                 db_path: Optional[str] = LEDGER_DB_PATH):
+        self.ttl = ttl
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self._embedder = _load_embedder(embedding_model)
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        # Her geçersiz kılmada artar; eski nesilde başlayan çalışmaların sonucu saklanmaz
+        self.generation = 0
+        self._stats = {"hits_exact": 0, "hits_semantic": 0, "misses": 0, "stores": 0,
+                       "invalidations": 0, "evicted_ttl": 0, "evicted_lru": 0}
+
+    def _ledger_version(self) -> Optional[int]:
+        """defter_surumu sayacı; veritabanı okunamıyorsa None"""
+        if not self.db_path or not os.path.exists(self.db_path):
+            return None
+        try:
+            if self._conn is None:
+                self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True,
+                                             timeout=1, check_same_thread=False)
+            return self._conn.execute("SELECT surum FROM defter_surumu WHERE id = 1").fetchone()[0]
+        except sqlite3.Error:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            return None
+
+    def key(self, message: str, context: str = "") -> Tuple:
+        """Önbellek anahtarı: (defter sürümü, geçmiş özeti, normalize edilmiş mesaj)"""
+        version = self._ledger_version()
+        if version != self._version:
+            # Defter başka bir süreçte değişti: eski sürümün yanıtları artık kullanılmaz
+            if self._entries:
+                self.invalidate()
+            self._version = version
+        return version, context, normalize(message)
+
+    async def _embed(self, text: str):
+        if self._embedder is None:
+            return None
+        return await asyncio.to_thread(self._embedder.encode, text, normalize_embeddings=True)
+
+    def _expired(self, entry: _Entry) -> bool:
+        return time.monotonic() - entry.created > self.ttl
+
+    async def get(self, key: Tuple) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if not self._expired(entry):
+                self._entries.move_to_end(key)
+                self._stats["hits_exact"] += 1
+                return entry.response
+            del self._entries[key]
+            self._stats["evicted_ttl"] += 1
+
+        if self._embedder is not None and self._entries:
+            vector = await self._embed(key[2])
+            best_key, best_score = None, self.similarity_threshold
+            for other_key, other in self._entries.items():
+                # Benzerlik yalnızca aynı sürüm ve aynı geçmişle verilmiş yanıtlar arasında aranır
+                if other_key[:2] != key[:2] or other.vector is None or self._expired(other):
+                    continue
+                score = float(vector @ other.vector)
+                if score >= best_score:
+                    best_key, best_score = other_key, score
+            if best_key is not None:
+                self._entries.move_to_end(best_key)
+                self._stats["hits_semantic"] += 1
+                return self._entries[best_key].response
+
+        self._stats["misses"] += 1
+        return None
+
+    async def put(self, key: Tuple, response: str, generation: int):
+        """Yanıtı key() ile alınmış anahtarla sakla; çalışma sırasında önbellek geçersiz kılındıysa hiçbir şey yapma"""
+        vector = await self._embed(key[2])
+        if generation != self.generation:
+            return
+        self._entries[key] = _Entry(response, vector)
+        self._entries.move_to_end(key)
+        self._stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evicted_lru"] += 1
+
+    def invalidate(self):
+        self._entries.clear()
+        self.generation += 1
+        self._stats["invalidations"] += 1
+
+    def metrics(self) -> Dict:
+        hits = self._stats["hits_exact"] + self._stats["hits_semantic"]
+        lookups = hits + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "semantic": self._embedder is not None,
+            "ledger_version": self._version,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self._stats,
+        }
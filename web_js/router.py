@@ -0,0 +1,162 @@
+"""Mesaja göre agent'a verilecek tool alt kümesini ve sistem istemi bölümlerini seçen yerel yönlendirici.
+
+Her alan (web araması, e-posta, muhasebe) sistem istemindeki tetikleyici
+ifadelere dayanan anahtar kelimelerle tanınır. Eşleşen alanların tool'ları ve
+istem bölümleri agent'a verilir. Hiçbir alan eşleşmezse mesaj yalnızca
+selamlaşma/teşekkür gibi sohbet kelimelerinden oluşuyorsa agent tool'suz ve kısa
+istemle çalışır; aksi halde ("bu ay ne kadar harcadım") tüm alanlar verilir. Bu, her istekte gönderilen istem ve tool şeması
+token'larını azaltır; tasarruf record() ile ölçülür ve metrics() ile raporlanır.
+
+Bağlamın kopmaması için son konuşma turu da yönlendirmeye dahil edilir
+("evet, gönder" gibi devam mesajları önceki turun alanını korur).
+
+Ölçüm için komut satırı (tool tanımları mcp_servers tanım önbelleğinden okunur):
+    python router.py "bu ayın raporunu getir" "merhaba" ...
+"""
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from memory import estimate_tokens
+from response_cache import normalize
+
+# Alan -> MCP sunucu adı ve normalize edilmiş anahtar kelime önekleri
+DOMAINS: Dict[str, Dict] = {
+    "tavily": {
+        "server": "tavily-mcp",
+        "keywords": ["ara", "araştır", "bul", "güncel", "son gelişme", "haber", "web", "internet",
+                     "makale", "hakkında bilgi", "kimdir", "nedir", "fiyatı", "hava durumu"],
+    },
+    "gmail": {
+        "server": "server-gmail-autoauth-mcp",
+        "keywords": ["mail", "e posta", "eposta", "gmail", "taslak", "gelen kutu", "etiket",
+                     "ileti", "gönder", "yanıtla", "önemli"],
+    },
+    "muhasebe": {
+        "server": "custom_mcp",
+        "keywords": ["fatura", "gelir", "gider", "kasa", "rapor", "muhasebe", "bakiye", "cari",
+                     "harca", "masraf", "öde", "tahsilat", "kazan", "bütçe", "kategori", "para", "ne kadar",
+                     "listele", "tutar", "lira", "tl", "ekstre", "içe aktar", "dışa aktar", "kayıt",
+                     "trend", "eğilim", "aylık", "haftalık", "yıllık", "parquet", "csv"],
+    },
+}
+
+
+# Yalnızca bu kelimelerden oluşan mesajlar tool gerektirmeyen sohbet sayılır
+SOHBET_KELIMELERI = {"merhaba", "selam", "selamlar", "günaydın", "iyi", "akşamlar", "geceler", "günler",
+                     "teşekkür", "teşekkürler", "ederim", "sağ", "ol", "olun", "sağol", "nasılsın",
+                     "naber", "tamam", "peki", "evet", "hayır", "hoşça", "kal", "görüşürüz",
+                     "eyvallah", "ok", "harika", "süper", "sen", "kimsin"}
+
+
+def _matches(text: str, words: List[str], keyword: str) -> bool:
+    if " " in keyword:
+        return keyword in text
+    # Türkçe ekler için önek eşleşmesi: "giderleri", "raporunu"
+    return any(word.startswith(keyword) for word in words)
+
+
+class ToolRouter:
+    def __init__(self, sections: Dict[str, str], domains: Dict[str, Dict] = DOMAINS):
+        """sections: "giris", her alan adı ve "kurallar" anahtarlı sistem istemi bölümleri"""
+        self.sections = sections
+        self.domains = domains
+        self._stats = {"requests": 0, "full_tokens": 0, "routed_tokens": 0,
+                       "by_domain": {name: 0 for name in domains}, "no_tools": 0}
+        # Alan kümesi -> o alanlar için kurulmuş agent (kurulum main.py'de)
+        self._agents: Dict[FrozenSet[str], Any] = {}
+
+    def route(self, message: str, context: Iterable[str] = ()) -> FrozenSet[str]:
+        """Mesajın (ve varsa son turun) ilgilendiği alanları döndür"""
+        secilen = set()
+        for i, text in enumerate([message, *context]):
+            text = normalize(text)
+            words = text.split()
+            for name, domain in self.domains.items():
+                if any(_matches(text, words, k) for k in domain["keywords"]):
+                    secilen.add(name)
+            # Mesajın kendisi bir alan belirtiyorsa bağlama bakılmaz
+            if i == 0 and secilen:
+                break
+        if not secilen and not self.is_small_talk(message):
+            # Anahtar kelime tutmadı ama soru sohbet değil: tool'suz bırakmak yerine tüm alanlar
+            return frozenset(self.domains)
+        return frozenset(secilen)
+
+    @staticmethod
+    def is_small_talk(message: str) -> bool:
+        words = normalize(message).split()
+        return bool(words) and all(word in SOHBET_KELIMELERI for word in words)
+
+    def servers(self, domains: FrozenSet[str]) -> List[str]:
+        return [self.domains[name]["server"] for name in domains]
+
+    def prompt(self, domains: Optional[FrozenSet[str]] = None) -> str:
+        """Seçilen alanların bölümleriyle sistem istemi (None: tam istem)"""
+        names = [name for name in self.domains if domains is None or name in domains]
+        parts = [self.sections["giris"]] + [self.sections[name] for name in names]
+        if names:
+            parts.append(self.sections["kurallar"])
+        parts.append(self.sections["kapanis"])
+        return "\n\n".join(parts)
+
+    def agent(self, domains: FrozenSet[str], build: Callable[[FrozenSet[str]], Any]):
+        """Alan kümesi için kurulmuş agent'ı döndür; yoksa build(domains) ile kurup sakla"""
+        routed = self._agents.get(domains)
+        if routed is None:
+            routed = self._agents[domains] = build(domains)
+        return routed
+
+    def reset_agents(self):
+        """Tool listesi değiştiğinde çağrılır: agent'lar bir sonraki istekte güncel tool'larla yeniden kurulur"""
+        self._agents.clear()
+
+    @staticmethod
+    def cost(prompt: str, tool_schemas: Iterable[dict]) -> int:
+        """İstem ve tool tanımlarının tahmini token sayısı"""
+        return estimate_tokens(prompt) + sum(estimate_tokens(json.dumps(s, ensure_ascii=False))
+                                             for s in tool_schemas)
+
+    def record(self, domains: FrozenSet[str], full_tokens: int, routed_tokens: int):
+        self._stats["requests"] += 1
+        self._stats["full_tokens"] += full_tokens
+        self._stats["routed_tokens"] += routed_tokens
+        for name in domains:
+            self._stats["by_domain"][name] += 1
+        if not domains:
+            self._stats["no_tools"] += 1
+
+    def metrics(self) -> Dict:
+        full = self._stats["full_tokens"]
+        saved = full - self._stats["routed_tokens"]
+        return {**self._stats, "saved_tokens": saved,
+                "saved_ratio": round(saved / full, 4) if full else 0.0}
+
+
+if __name__ == "__main__":
+    from prompts import PROMPT_SECTIONS
+
+    # mcp_servers langchain gerektirir; ölçüm için yalnızca tanım dosyası okunur
+    TOOL_SCHEMA_CACHE = os.environ.get("MCP_TOOL_SCHEMA_CACHE", "mcp_tool_schemas.json")
+
+    try:
+        with open(TOOL_SCHEMA_CACHE, encoding="utf-8") as f:
+            schemas = json.load(f)
+    except OSError:
+        schemas = {}
+        print(f"{TOOL_SCHEMA_CACHE} bulunamadı, yalnızca istem token'ları ölçülüyor", file=sys.stderr)
+
+    router = ToolRouter(PROMPT_SECTIONS)
+
+    all_schemas = [s for server in schemas.values() for s in server]
+    full = router.cost(router.prompt(), all_schemas)
+    for message in sys.argv[1:] or ["merhaba", "bu ayın raporunu getir", "yapay zeka haberlerini ara",
+                                    "ahmet'e toplantı maili gönder", "bu ay ne kadar harcadım",
+                                    "geçen ay markete ne kadar verdim", "bugün ne yapsam"]:
+        domains = router.route(message)
+        routed_schemas = [s for server in router.servers(domains) for s in schemas.get(server, [])]
+        routed = router.cost(router.prompt(domains), routed_schemas)
+        router.record(domains, full, routed)
+        print(f"{message!r:<40} {sorted(domains)!s:<22} {routed:>6} / {full} token")
+    print(json.dumps(router.metrics(), ensure_ascii=False))
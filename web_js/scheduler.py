@@ -0,0 +1,131 @@
+"""WebSocket mesajları için oturum bazlı sıralı kuyruklar ve global eşzamanlılık sınırı.
+
+Her oturumun (client_id) kendi kuyruğu ve tek bir işçi görevi vardır; böylece
+bir oturumun mesajları geliş sırasıyla işlenir. Tüm oturumlardaki işçiler aynı
+semaforu paylaşır: aynı anda en fazla MAX_CONCURRENT_REQUESTS agent çalışması
+yapılır (LLM kotası ve MCP alt süreçleri sınırlı). Kuyruk doluysa yeni mesaj
+reddedilir; istemci kopunca kuyruk boşaltılır ve çalışan iş iptal edilir.
+"""
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# Aynı anda çalışabilecek en fazla agent isteği (tüm oturumlar toplamı)
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("CHAT_MAX_CONCURRENT_REQUESTS", "4"))
+# Bir oturumda işlenmeyi bekleyebilecek en fazla mesaj
+SESSION_QUEUE_SIZE = int(os.environ.get("CHAT_SESSION_QUEUE_SIZE", "3"))
+
+# submit() sonuçları
+ACCEPTED = "accepted"   # hemen işlenecek
+QUEUED = "queued"       # sırada bekleyecek (oturumda önceki iş var veya sistem dolu)
+REJECTED = "rejected"   # oturum kuyruğu dolu, mesaj alınmadı
+
+
+class RequestScheduler:
+    """Oturum kuyruklarını ve global eşzamanlılık sınırını yöneten zamanlayıcı.
+
+    handler(client_id, payload) her mesaj için bir kez, semafor alındıktan sonra
+    çağrılır. İptal edilen işler handler içinde CancelledError olarak görülür.
+    """
+
+    def __init__(self, handler: Callable[[str, dict], Awaitable[None]],
+                 max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+                 queue_size: int = SESSION_QUEUE_SIZE):
+        self.handler = handler
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._running: Dict[str, int] = {}
+        self._stats = {"accepted": 0, "queued": 0, "rejected": 0,
+                       "completed": 0, "failed": 0, "cancelled": 0}
+
+    @property
+    def active(self) -> int:
+        """Şu anda semaforu tutan (çalışan) istek sayısı"""
+        return sum(self._running.values())
+
+    def saturated(self) -> bool:
+        return self.active >= self.max_concurrent
+
+    def submit(self, client_id: str, payload: dict) -> str:
+        """Mesajı oturum kuyruğuna ekle; ACCEPTED, QUEUED veya REJECTED döndür"""
+        queue = self._queues.get(client_id)
+        if queue is None:
+            queue = self._queues[client_id] = asyncio.Queue(maxsize=self.queue_size)
+            self._workers[client_id] = asyncio.create_task(self._worker(client_id, queue))
+
+        busy_session = self._running.get(client_id, 0) > 0 or not queue.empty()
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self._stats["rejected"] += 1
+            logger.warning(f"Oturum kuyruğu dolu, mesaj reddedildi: {client_id}")
+            return REJECTED
+
+        if busy_session or self.saturated():
+            self._stats["queued"] += 1
+            return QUEUED
+        self._stats["accepted"] += 1
+        return ACCEPTED
+
+    def queue_depth(self, client_id: str) -> int:
+        queue = self._queues.get(client_id)
+        return queue.qsize() if queue is not None else 0
+
+    async def _worker(self, client_id: str, queue: asyncio.Queue):
+        while True:
+            payload = await queue.get()
+            try:
+                async with self._semaphore:
+                    self._running[client_id] = 1
+                    try:
+                        await self.handler(client_id, payload)
+                        self._stats["completed"] += 1
+                    finally:
+                        self._running.pop(client_id, None)
+            except asyncio.CancelledError:
+                self._stats["cancelled"] += 1
+                raise
+            except Exception as e:
+                # Bir mesajın hatası oturumun sonraki mesajlarını engellememeli
+                self._stats["failed"] += 1
+                logger.error(f"İstek işlenirken hata ({client_id}): {str(e)}")
+            finally:
+                queue.task_done()
+
+    async def cancel_session(self, client_id: str):
+        """Oturumun bekleyen mesajlarını at ve çalışan işini iptal et"""
+        queue = self._queues.pop(client_id, None)
+        worker = self._workers.pop(client_id, None)
+        if queue is not None:
+            dropped = queue.qsize()
+            self._stats["cancelled"] += dropped
+        if worker is not None:
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+        self._running.pop(client_id, None)
+
+    async def shutdown(self):
+        for client_id in list(self._workers):
+            await self.cancel_session(client_id)
+
+    def metrics(self) -> dict:
+        """Kuyruk derinlikleri ve sayaçlar"""
+        depths = {cid: q.qsize() for cid, q in self._queues.items()}
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.active,
+            "sessions": len(self._queues),
+            "queued_total": sum(depths.values()),
+            "max_queue_depth": max(depths.values(), default=0),
+            "queue_depths": depths,
+            **self._stats,
+        }
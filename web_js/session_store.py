@@ -0,0 +1,226 @@
+"""Sohbet geçmişinin kalıcı saklanması (SQLite, WAL) ve yazma-arkası (write-behind) tampon.
+
+Yeni mesajlar ve özet güncellemeleri önce bellekteki tampona eklenir; arka plan
+görevi tamponu FLUSH_INTERVAL saniyede bir (veya FLUSH_BATCH işleme ulaşınca)
+tek bir işlemde executemany ile yazar. Böylece sıcak yolda (mesaj başına) disk
+senkronizasyonu yapılmaz; çökme durumunda en fazla son FLUSH_INTERVAL'lık
+geçmiş kaybolur. Veritabanı WAL kipinde olduğu için birden fazla uvicorn
+işçisi aynı dosyayı paylaşabilir.
+
+Aynı arka plan görevi PRUNE_INTERVAL saniyede bir, CHAT_SESSION_MAX_AGE
+saniyedir güncellenmeyen oturumları siler; böylece sessions.db sınırsız büyümez.
+
+Arka uç CHAT_SESSION_STORE ile seçilir: "sqlite" (varsayılan) veya "memory"
+(kalıcılık yok, eski davranış).
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORE = os.environ.get("CHAT_SESSION_STORE", "sqlite")
+SESSION_DB_PATH = os.environ.get("CHAT_SESSION_DB", "sessions.db")
+# Tampon en geç bu aralıkla (sn) veya bu kadar işlem birikince yazılır
+FLUSH_INTERVAL = float(os.environ.get("CHAT_SESSION_FLUSH_INTERVAL", "1.0"))
+FLUSH_BATCH = 500
+# Bu kadar saniyedir güncellenmeyen oturumlar silinir (0: hiç silinmez), varsayılan 30 gün
+SESSION_MAX_AGE = float(os.environ.get("CHAT_SESSION_MAX_AGE", str(30 * 24 * 3600)))
+# Eski oturum silme aralığı (sn)
+PRUNE_INTERVAL = 3600.0
+
+# Rol adları veritabanında tek karakterle saklanır
+_ROLE_CODES = {"user": "u", "assistant": "a"}
+_ROLE_NAMES = {v: k for k, v in _ROLE_CODES.items()}
+
+# load() sonucu: (özet, [(sıra no, mesaj), ...])
+SessionData = Tuple[str, List[Tuple[int, dict]]]
+
+
+class SessionStore:
+    """Kalıcılık yapmayan arka uç; diğer arka uçlar aynı arayüzü uygular"""
+
+    async def load(self, session_id: str) -> Optional[SessionData]:
+        return None
+
+    def append(self, session_id: str, seq: int, message: dict):
+        """Mesajı sıra numarasıyla kaydet (tamponlanabilir)"""
+
+    def set_summary(self, session_id: str, summary: str, first_seq: int):
+        """Özeti güncelle ve first_seq'ten önceki (özete katılmış) mesajları sil"""
+
+    def start(self):
+        """Arka plan görevlerini başlat (çalışan bir olay döngüsü içinde çağrılır)"""
+
+    async def flush(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    def __init__(self, path: str = SESSION_DB_PATH, flush_interval: float = FLUSH_INTERVAL,
+                 max_age: float = SESSION_MAX_AGE, prune_interval: float = PRUNE_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_age = max_age
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: commit başına fsync yok, yalnızca checkpoint'te
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL DEFAULT '',
+                updated REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS messages (
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (session_id, seq)
+            ) WITHOUT ROWID;
+        ''')
+        self._lock = threading.Lock()
+        self._appends: List[tuple] = []
+        self._summaries = {}
+        self._touched = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def _pending(self) -> int:
+        return len(self._appends) + len(self._summaries)
+
+    def start(self):
+        # Mesaj gelmese de eski oturumlar silinsin diye döngü açılışta başlatılır
+        self._schedule()
+
+    def _schedule(self):
+        if self._flusher is None:
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.create_task(self._flush_loop())
+        if self._pending() >= FLUSH_BATCH:
+            self._wakeup.set()
+
+    def append(self, session_id: str, seq: int, message: dict):
+        self._appends.append((session_id, seq, _ROLE_CODES[message["role"]], message["content"]))
+        self._touched[session_id] = time.time()
+        self._schedule()
+
+    def set_summary(self, session_id: str, summary: str, first_seq: int):
+        self._summaries[session_id] = (summary, first_seq)
+        self._touched[session_id] = time.time()
+        self._schedule()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # Tampon korunur, bir sonraki turda yeniden denenir
+                logger.error(f"Oturum geçmişi yazılamadı: {str(e)}")
+            if self.max_age > 0 and time.monotonic() - self._last_prune >= self.prune_interval:
+                self._last_prune = time.monotonic()
+                try:
+                    silinen = await asyncio.to_thread(self.prune, self.max_age)
+                    if silinen:
+                        logger.info(f"{silinen} eski oturum silindi")
+                except Exception as e:
+                    logger.error(f"Eski oturumlar silinemedi: {str(e)}")
+
+    async def flush(self):
+        if not self._pending() and not self._touched:
+            return
+        appends, summaries, touched = self._appends, self._summaries, self._touched
+        self._appends, self._summaries, self._touched = [], {}, {}
+        try:
+            await asyncio.to_thread(self._write, appends, summaries, touched)
+        except Exception:
+            # Yazılamayanları, bu arada gelenlerin önüne geri koy
+            self._appends = appends + self._appends
+            self._summaries = {**summaries, **self._summaries}
+            self._touched = {**touched, **self._touched}
+            raise
+
+    def _write(self, appends, summaries, touched):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO sessions (id, updated) VALUES (?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET updated = excluded.updated",
+                    touched.items())
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                    appends)
+                # Mesajlar eklendikten sonra: özete katılanlar aynı turda eklenmiş olabilir
+                for session_id, (summary, first_seq) in summaries.items():
+                    self._conn.execute("UPDATE sessions SET summary = ? WHERE id = ?", (summary, session_id))
+                    self._conn.execute("DELETE FROM messages WHERE session_id = ? AND seq < ?",
+                                       (session_id, first_seq))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _read(self, session_id: str) -> Optional[SessionData]:
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT seq, role, content FROM messages WHERE session_id = ? ORDER BY seq",
+                (session_id,)).fetchall()
+        return row[0], [(seq, {"role": _ROLE_NAMES[role], "content": content}) for seq, role, content in rows]
+
+    async def load(self, session_id: str) -> Optional[SessionData]:
+        # Bu oturuma ait tamponlanmış yazmalar varsa önce yaz
+        if session_id in self._touched:
+            await self.flush()
+        return await asyncio.to_thread(self._read, session_id)
+
+    def prune(self, max_age: float) -> int:
+        """max_age saniyedir güncellenmeyen oturumları sil, silinen oturum sayısını döndür"""
+        sinir = time.time() - max_age
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM messages WHERE session_id IN (SELECT id FROM sessions WHERE updated < ?)", (sinir,))
+                count = self._conn.execute("DELETE FROM sessions WHERE updated < ?", (sinir,)).rowcount
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return count
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+def create_store(kind: str = SESSION_STORE) -> SessionStore:
+    if kind == "memory":
+        return SessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore()
+    raise ValueError(f"Geçersiz oturum deposu: {kind!r} ('sqlite' veya 'memory')")
+
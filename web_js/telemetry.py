@@ -0,0 +1,153 @@
+"""Sohbet hattı için süre ölçümleri (span), sayaçlar ve Prometheus metin çıktısı.
+
+span("ad", etiket=değer) bir kod bloğunun süresini ölçer; her (ad, etiketler)
+için son RESERVOIR_SIZE ölçüm tutulur ve /metrics isteğinde p50/p95/p99 olarak
+hesaplanır. count() sayaçları artırır. Dış bağımlılık gerekmez.
+
+OTEL_EXPORTER_OTLP_ENDPOINT ayarlıysa ve opentelemetry-sdk ile
+opentelemetry-exporter-otlp kuruluysa aynı span'lar OpenTelemetry'ye de
+aktarılır (ör. yerel bir collector: http://127.0.0.1:4317).
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Her ölçüm serisi için yüzdelik hesabında kullanılan son örnek sayısı
+RESERVOIR_SIZE = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_PREFIX = "chat"
+
+# Tüm geçmişi loglamanın maliyetli olması nedeniyle yalnızca bu oranda istek loglanır (0-1)
+HISTORY_LOG_SAMPLE = float(os.environ.get("CHAT_LOG_HISTORY_SAMPLE", "0"))
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+def _otel_tracer():
+    if not os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("opentelemetry kurulu değil, OTLP aktarımı devre dışı")
+        return None
+    provider = TracerProvider(resource=Resource.create({"service.name": "langchain-mcp-chat"}))
+    # Uç nokta OTEL_EXPORTER_OTLP_ENDPOINT ortam değişkeninden okunur
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+    return trace.get_tracer(__name__)
+
+
+class Telemetry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[Tuple[str, _Labels], deque] = {}
+        self._sums: Dict[Tuple[str, _Labels], list] = defaultdict(lambda: [0.0, 0])
+        self._counters: Dict[Tuple[str, _Labels], float] = defaultdict(float)
+        self._gauges: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._tracer = _otel_tracer()
+
+    @staticmethod
+    def _key(name: str, labels: Dict) -> Tuple[str, _Labels]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Bir süre ölçümünü kaydet (span dışında ölçülen süreler için)"""
+        key = self._key(name, labels)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=RESERVOIR_SIZE)
+            samples.append(seconds)
+            total = self._sums[key]
+            total[0] += seconds
+            total[1] += 1
+
+    def count(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def gauge(self, name: str, fn: Callable[[], Dict[str, float]]):
+        """/metrics isteğinde fn() ile okunan anlık değerler ({alt_ad: değer})"""
+        self._gauges[name] = fn
+
+    @contextmanager
+    def span(self, name: str, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        if self._tracer is None:
+            try:
+                yield
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+            return
+        with self._tracer.start_as_current_span(name, attributes={k: str(v) for k, v in labels.items()}):
+            try:
+                yield
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+
+    @staticmethod
+    def sample_history() -> bool:
+        """Bu istekte tüm geçmiş loglanmalı mı"""
+        return HISTORY_LOG_SAMPLE > 0 and random.random() < HISTORY_LOG_SAMPLE
+
+    @staticmethod
+    def _format_labels(labels: _Labels, extra: Tuple = ()) -> str:
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+    def prometheus(self) -> str:
+        """Prometheus metin biçiminde tüm metrikler"""
+        with self._lock:
+            samples = {key: sorted(values) for key, values in self._samples.items()}
+            sums = {key: tuple(v) for key, v in self._sums.items()}
+            counters = dict(self._counters)
+
+        lines = []
+        metric = f"{METRIC_PREFIX}_span_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for (name, labels), values in sorted(samples.items()):
+            labels = (("span", name),) + labels
+            for q in QUANTILES:
+                value = values[min(len(values) - 1, int(q * len(values)))]
+                lines.append(f"{metric}{self._format_labels(labels, (('quantile', q),))} {value:.6f}")
+            total, n = sums[(name, labels[1:])]
+            lines.append(f"{metric}_sum{self._format_labels(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{self._format_labels(labels)} {n}")
+
+        seen = set()
+        for (name, labels), value in sorted(counters.items()):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{metric}{self._format_labels(labels)} {value:g}")
+
+        for name, fn in self._gauges.items():
+            try:
+                values = fn()
+            except Exception as e:
+                logger.warning(f"{name} metrikleri okunamadı: {str(e)}")
+                continue
+            for sub, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    metric = f"{METRIC_PREFIX}_{name}_{sub}"
+                    lines.append(f"# TYPE {metric} gauge")
+                    lines.append(f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+telemetry = Telemetry()